@@ -0,0 +1,201 @@
+"""
+    Tasky is a task deadline tracker application
+    Copyright (C) 2022-2025  Abhineet Kelley (AbhiK002)
+
+    This file is part of Tasky.
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+# python -m benchmarks [--sizes 100,1000] [--only timediff] [--output results.json]
+# python -m benchmarks --compare old.json new.json
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+from .fixtures import SIZES
+from .timing import estimate_next, measure
+
+COLD_START_BENCHMARKS = ("import:files.tasky_ops", "import:tasky-console", "import:tasky.pyw", "console_cold_start", "gui_cold_start")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Tasky start-up and backend benchmarks")
+    parser.add_argument("--sizes", default=",".join(map(str, SIZES)), help="comma separated task counts")
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per benchmark and size")
+    parser.add_argument("--budget", type=float, default=60.0,
+                        help="seconds one benchmark may spend on one size; larger sizes that would exceed it are skipped")
+    parser.add_argument("--only", action="append", help="run only this benchmark (repeatable)")
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="compare two result files and exit")
+    return parser.parse_args()
+
+
+def git_revision(root):
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=root, capture_output=True, text=True)
+    except OSError:
+        return None
+    return out.stdout.strip() or None
+
+
+def run_suite(args, home):
+    # Functions and TaskyLog resolve ~/Tasky when they are imported, so nothing from files/ is imported before this
+    from files.tasky_ops import AboutTasky, Functions
+    from . import cold_start
+    from .fixtures import TaskStoreFixture
+    from .micro import MICRO_BENCHMARKS, TARGETS
+
+    sizes = sorted(int(s) for s in args.sizes.split(","))
+    selected = set(args.only or list(MICRO_BENCHMARKS) + list(COLD_START_BENCHMARKS))
+    functions = Functions()
+    results = []
+    history = {}
+    missed = []
+
+    def record(name, size, summary=None, skipped=None):
+        entry = {"name": name, "size": size}
+        if skipped is not None:
+            entry["skipped"] = skipped
+        else:
+            entry.update(summary)
+            history.setdefault(name, []).append((size, summary["min"]))
+        results.append(entry)
+        shown = f"skipped ({skipped})" if skipped else f"median {summary['median'] * 1000:10.2f} ms"
+        target = TARGETS.get(name)
+        if summary is not None and target is not None and summary["median"] > target:
+            entry["over_target"] = target
+            missed.append(f"{name} at {size}")
+            shown += f"  OVER the {target * 1000:g} ms target"
+        print(f"{name:<28} {size:>7}  {shown}", flush=True)
+
+    def over_budget(name, size):
+        if name not in history:
+            return None
+        estimate = estimate_next(history[name], size)
+        if estimate * args.repeat > args.budget:
+            return f"estimated {estimate:.1f}s per run exceeds the {args.budget:g}s budget"
+        return None
+
+    if "import:files.tasky_ops" in selected:
+        record("import:files.tasky_ops", 0, cold_start.module_import_time("files.tasky_ops", home, repeat=args.repeat))
+        eager = cold_start.eager_imports("files.tasky_ops", home)
+        if eager:
+            missed.append(f"import:files.tasky_ops loading {', '.join(eager)}")
+            print(f"{'':<37}  OVER: imports {', '.join(eager)} at module level", flush=True)
+
+    for name in ("import:tasky-console", "import:tasky.pyw"):
+        if name not in selected:
+            continue
+        script = cold_start.CONSOLE_SCRIPT if name.endswith("console") else cold_start.GUI_SCRIPT
+        if script == cold_start.GUI_SCRIPT and not cold_start.has_pyqt():
+            record(name, 0, skipped="PyQt5 not installed")
+            continue
+        record(name, 0, cold_start.import_time(script, home, repeat=args.repeat, QT_QPA_PLATFORM="offscreen"))
+
+    for size in sizes:
+        fixture = TaskStoreFixture(functions, size)
+        for name, bench in MICRO_BENCHMARKS.items():
+            if name not in selected:
+                continue
+            reason = over_budget(name, size)
+            if reason:
+                record(name, size, skipped=reason)
+                continue
+            setup, func = bench(functions, fixture, home)
+            record(name, size, measure(func, setup=setup, repeat=args.repeat, budget=args.budget))
+
+        if "console_cold_start" in selected:
+            reason = over_budget("console_cold_start", size)
+            if reason:
+                record("console_cold_start", size, skipped=reason)
+            else:
+                try:
+                    summary = cold_start.console_cold_start(fixture, home, repeat=args.repeat, timeout=args.budget)
+                    record("console_cold_start", size, summary)
+                except subprocess.TimeoutExpired:
+                    record("console_cold_start", size, skipped=f"one run took over {args.budget:g}s")
+
+        if "gui_cold_start" in selected or "App.refresh_tasks" in selected:
+            reason = None if cold_start.has_pyqt() else "PyQt5 not installed"
+            reason = reason or over_budget("gui_populated", size)
+            if reason:
+                record("gui_cold_start", size, skipped=reason)
+                continue
+            try:
+                for name, summary in cold_start.gui_cold_start(fixture, home, repeat=args.repeat, timeout=args.budget).items():
+                    record(name, size, summary)
+            except subprocess.TimeoutExpired:
+                record("gui_cold_start", size, skipped=f"one run took over {args.budget:g}s")
+
+    return {
+        "meta": {
+            "tasky_version": AboutTasky.version,
+            "revision": git_revision(cold_start.ROOT),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+            "sizes": sizes,
+            "repeat": args.repeat,
+        },
+        "results": results,
+        "missed_targets": missed,
+    }
+
+
+def compare(old_path, new_path):
+    with open(old_path, encoding="utf-8") as f:
+        old = json.load(f)
+    with open(new_path, encoding="utf-8") as f:
+        new = json.load(f)
+
+    old_results = {(r["name"], r["size"]): r for r in old["results"] if "skipped" not in r}
+    print(f"{'benchmark':<28} {'size':>7} {'old ms':>11} {'new ms':>11} {'change':>8}")
+    for r in new["results"]:
+        before = old_results.get((r["name"], r["size"]))
+        if before is None or "skipped" in r:
+            continue
+        ratio = r["median"] / before["median"] if before["median"] else float("inf")
+        print(f"{r['name']:<28} {r['size']:>7} {before['median'] * 1000:11.2f} {r['median'] * 1000:11.2f} {ratio:7.2f}x")
+
+
+def main():
+    args = parse_args()
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    with tempfile.TemporaryDirectory(prefix="tasky-bench-") as tmp:
+        home = Path(tmp)
+        os.environ["HOME"] = os.environ["USERPROFILE"] = str(home)
+        report = run_suite(args, home)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"results written to {args.output}")
+    if report["missed_targets"]:
+        print(f"missed targets: {', '.join(report['missed_targets'])}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
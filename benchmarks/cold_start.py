@@ -0,0 +1,124 @@
+"""
+    Tasky is a task deadline tracker application
+    Copyright (C) 2022-2025  Abhineet Kelley (AbhiK002)
+
+    This file is part of Tasky.
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import importlib.util
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from .timing import measure, summarize
+
+ROOT = Path(__file__).resolve().parent.parent
+CONSOLE_SCRIPT = ROOT / "tasky-console.py"
+GUI_SCRIPT = ROOT / "tasky.pyw"
+
+# executes an entry script as a plain module (its __main__ block does not run) in a fresh interpreter
+IMPORT_SNIPPET = """
+import importlib.machinery, importlib.util, sys, time
+start = time.perf_counter()
+loader = importlib.machinery.SourceFileLoader("tasky_entry", sys.argv[1])
+spec = importlib.util.spec_from_loader("tasky_entry", loader)
+loader.exec_module(importlib.util.module_from_spec(spec))
+print(time.perf_counter() - start)
+"""
+# imports one module by name, e.g. the backend both entry points start with
+MODULE_SNIPPET = """
+import importlib, sys, time
+start = time.perf_counter()
+importlib.import_module(sys.argv[1])
+print(time.perf_counter() - start)
+"""
+# which of the given modules importing the first one loads
+LOADED_SNIPPET = """
+import importlib, sys
+importlib.import_module(sys.argv[1])
+print(" ".join(name for name in sys.argv[2:] if name in sys.modules))
+"""
+# stdlib modules the backend only needs once a feature is used (time zones, history,
+# archive, backups, recurrence, dependencies, export); loading one at import time
+# costs every start-up a few ms, which the timing target alone is too noisy to catch
+DEFERRED_MODULES = ("calendar", "csv", "gzip", "hashlib", "heapq", "json", "subprocess", "uuid", "zlib", "zoneinfo")
+
+
+def has_pyqt():
+    return importlib.util.find_spec("PyQt5") is not None
+
+
+def child_env(home, **extra):
+    env = dict(os.environ, HOME=str(home), USERPROFILE=str(home), TERM="dumb")
+    env.update(extra)
+    return env
+
+
+def import_time(script, home, repeat=5, snippet=IMPORT_SNIPPET, **extra_env):
+    timings = []
+    for _ in range(repeat):
+        out = subprocess.run(
+            [sys.executable, "-c", snippet, str(script)],
+            cwd=ROOT, env=child_env(home, **extra_env), capture_output=True, text=True, check=True,
+        )
+        timings.append(float(out.stdout.strip().splitlines()[-1]))
+    return summarize(timings)
+
+
+def module_import_time(module, home, repeat=5):
+    return import_time(module, home, repeat=repeat, snippet=MODULE_SNIPPET)
+
+
+def eager_imports(module, home, deferred=DEFERRED_MODULES):
+    out = subprocess.run(
+        [sys.executable, "-c", LOADED_SNIPPET, module, *deferred],
+        cwd=ROOT, env=child_env(home), capture_output=True, text=True, check=True,
+    )
+    return out.stdout.split()
+
+
+def console_cold_start(fixture, home, repeat=5, timeout=None):
+    # start-up, first task list and exit: the console reads every task before its first prompt
+    def run():
+        subprocess.run(
+            [sys.executable, str(CONSOLE_SCRIPT)], input="quit\n", cwd=ROOT, env=child_env(home),
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, text=True, check=True, timeout=timeout,
+        )
+    return measure(run, setup=fixture.reset, repeat=repeat)
+
+
+def gui_cold_start(fixture, home, repeat=5, refreshes=5, timeout=None):
+    shown, populated, refresh = [], [], []
+    for _ in range(repeat):
+        fixture.reset()
+        t0 = time.time()
+        out = subprocess.run(
+            [sys.executable, "-m", "benchmarks.gui_driver", "--t0", repr(t0), "--refresh", str(refreshes)],
+            cwd=ROOT, env=child_env(home, QT_QPA_PLATFORM="offscreen"), capture_output=True, text=True, check=True,
+            timeout=timeout,
+        )
+        marks = json.loads(out.stdout.strip().splitlines()[-1])
+        shown.append(marks["window_shown"])
+        populated.append(marks["populated"])
+        refresh.extend(marks["refresh"])
+    return {
+        "gui_window_shown": summarize(shown),
+        "gui_populated": summarize(populated),
+        "App.refresh_tasks": summarize(refresh),
+    }
@@ -0,0 +1,73 @@
+"""
+    Tasky is a task deadline tracker application
+    Copyright (C) 2022-2025  Abhineet Kelley (AbhiK002)
+
+    This file is part of Tasky.
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import datetime
+import random
+
+from files.zone_ops import format_epoch
+
+CATEGORIES = ("General", "Work", "Study", "Health", "Personal", "Research")
+PRIORITIES = ("Low", "Medium", "High", "Critical")
+SIZES = (100, 1000, 10000, 100000)
+
+
+def synthetic_tasks(count, seed=0, now=None):
+    # deterministic for a given (count, seed) so runs on different versions stay comparable
+    rng = random.Random(seed)
+    now = (now or datetime.datetime.now()).replace(second=0, microsecond=0)
+    tasks, meta_map = [], {}
+    for i in range(count):
+        deadline = now + datetime.timedelta(minutes=rng.randint(30, 365 * 24 * 60))
+        ttime = format_epoch(deadline.timestamp())
+        name = f"Task {i}"
+        desc = f"synthetic task {i} for benchmarking" if rng.random() < 0.7 else ""
+        tasks.append(f"{ttime}\t{name}\t{desc}")
+        meta_map[f"{ttime}\t{name}"] = {
+            "id": f"{i:012x}",
+            "category": rng.choice(CATEGORIES),
+            "priority": rng.choice(PRIORITIES),
+            "source": "manual",
+            "status": "todo",
+        }
+    return tasks, meta_map
+
+
+class TaskStoreFixture:
+    # writes a synthetic store through the real backend so the format always matches
+    def __init__(self, functions, count, seed=0):
+        self.functions = functions
+        self.count = count
+        self.tasks, self.meta_map = synthetic_tasks(count, seed)
+        self.tasks_text = "\n".join(self.tasks)
+
+    def reset(self):
+        # read_and_sort_tasks_file caps the file at 100 tasks, so every timed call starts from here
+        with open(self.functions.tasks_path, "w", encoding="utf-8") as f:
+            f.write(self.tasks_text)
+        self.functions.write_meta_map({key: dict(meta) for key, meta in self.meta_map.items()})
+
+    def write_csv(self, path):
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            f.write("name,deadline,description,category,priority\n")
+            for task in self.tasks:
+                ttime, name, desc = task.split("\t", 2)
+                meta = self.meta_map[f"{ttime}\t{name}"]
+                deadline = datetime.datetime.fromtimestamp(int(ttime)).strftime("%Y-%m-%d %H:%M")
+                f.write(f"{name},{deadline},{desc},{meta['category']},{meta['priority']}\n")
@@ -0,0 +1,87 @@
+"""
+    Tasky is a task deadline tracker application
+    Copyright (C) 2022-2025  Abhineet Kelley (AbhiK002)
+
+    This file is part of Tasky.
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+# run by cold_start.gui_cold_start in its own interpreter:
+#   QT_QPA_PLATFORM=offscreen python -m benchmarks.gui_driver --t0 <time.time() before launch>
+
+import argparse
+import importlib.machinery
+import importlib.util
+import json
+import time
+
+from .cold_start import GUI_SCRIPT
+
+
+def load_gui():
+    loader = importlib.machinery.SourceFileLoader("tasky_gui", str(GUI_SCRIPT))
+    module = importlib.util.module_from_spec(importlib.util.spec_from_loader("tasky_gui", loader))
+    loader.exec_module(module)
+    return module
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--t0", type=float, required=True)
+    parser.add_argument("--refresh", type=int, default=5)
+    args = parser.parse_args()
+
+    gui = load_gui()
+    backend = gui.TBackEnd
+    # the first load trims the store to 100 tasks, put the full fixture back before every timed refresh
+    tasks_text, meta_text = backend.read_tasks_file(), backend.read_meta_tasks_file()
+    marks = {"refresh": []}
+
+    class BenchApp(gui.App):
+        def finish_startup(self):
+            marks["window_shown"] = time.time() - args.t0
+            super().finish_startup()
+
+        def refresh_gui(self):
+            pass
+
+        def apply_snapshot(self, snapshot):
+            super().apply_snapshot(snapshot)
+            if "populated" not in marks:
+                marks["populated"] = time.time() - args.t0
+            else:
+                marks["refresh"].append(time.perf_counter() - self.refresh_started)
+
+            if len(marks["refresh"]) < args.refresh:
+                with open(backend.tasks_path, "w", encoding="utf-8") as f:
+                    f.write(tasks_text)
+                with open(backend.meta_tasks_path, "w", encoding="utf-8") as f:
+                    f.write(meta_text)
+                self.refresh_started = time.perf_counter()
+                self.refresh_tasks()
+            else:
+                self.io_thread.quit()
+                self.io_thread.wait()
+                gui.QApplication.instance().quit()
+
+    try:
+        BenchApp()
+    except SystemExit:
+        pass
+    print(json.dumps(marks))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+    Tasky is a task deadline tracker application
+    Copyright (C) 2022-2025  Abhineet Kelley (AbhiK002)
+
+    This file is part of Tasky.
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+from files.search_ops import SearchIndex
+
+SEARCH_CJK_WORDS = ("项目", "会议", "部署")
+SEARCH_TOPICS = ("deploy", "deployment", "deployed", "review", "report")
+
+
+def bench_read_and_sort(functions, fixture, workdir):
+    return fixture.reset, functions.read_and_sort_tasks_file
+
+
+def bench_is_valid_task(functions, fixture, workdir):
+    def run():
+        for task in fixture.tasks:
+            functions.is_valid_task(task)
+    return None, run
+
+
+def bench_timediff(functions, fixture, workdir):
+    ttimes = [task.split("\t", 1)[0] for task in fixture.tasks]
+
+    def run():
+        for ttime in ttimes:
+            functions.timediff(ttime)
+    return None, run
+
+
+def bench_remove_duplicates(functions, fixture, workdir):
+    tasks = sorted(fixture.tasks)
+    return None, lambda: functions.remove_duplicates(tasks)
+
+
+def bench_sync_meta(functions, fixture, workdir):
+    # steady state: every task already has a meta row, so this is the read + parse path
+    return fixture.reset, lambda: functions.sync_meta_with_tasks(fixture.tasks)
+
+
+def bench_import_csv(functions, fixture, workdir):
+    csv_path = workdir / f"import_{fixture.count}.csv"
+    fixture.write_csv(csv_path)
+    return functions.clear_tasks, lambda: functions.import_tasks_from_csv(csv_path)
+
+
+def search_documents(fixture):
+    # the synthetic names are all Latin, every task gets a CJK word and a topic so mixed
+    # queries have common terms on both sides
+    documents = {}
+    for i, task in enumerate(fixture.tasks):
+        ttime, name, desc = task.split("\t", 2)
+        key = f"{ttime}\t{name}"
+        documents[key] = (
+            f"{SEARCH_CJK_WORDS[i % len(SEARCH_CJK_WORDS)]}{name}",
+            f"{desc} {SEARCH_TOPICS[i % len(SEARCH_TOPICS)]}",
+            fixture.meta_map[key]["category"],
+        )
+    return documents
+
+
+def bench_search_build(functions, fixture, workdir):
+    documents = search_documents(fixture)
+    return None, lambda: SearchIndex().sync(documents)
+
+
+def bench_search_mixed_query(functions, fixture, workdir):
+    index = SearchIndex()
+    index.sync(search_documents(fixture))
+    return None, lambda: index.matching("项目 deploy")
+
+
+MICRO_BENCHMARKS = {
+    "read_and_sort_tasks_file": bench_read_and_sort,
+    "is_valid_task": bench_is_valid_task,
+    "timediff": bench_timediff,
+    "remove_duplicates": bench_remove_duplicates,
+    "sync_meta_with_tasks": bench_sync_meta,
+    "import_tasks_from_csv": bench_import_csv,
+    "search_index_build": bench_search_build,
+    "search_mixed_query": bench_search_mixed_query,
+}
+
+# median seconds a benchmark must stay under at every size, checked by python -m benchmarks
+TARGETS = {
+    "import:files.tasky_ops": 0.035,
+    "search_mixed_query": 0.010,
+}
@@ -0,0 +1,58 @@
+"""
+    Tasky is a task deadline tracker application
+    Copyright (C) 2022-2025  Abhineet Kelley (AbhiK002)
+
+    This file is part of Tasky.
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import math
+import statistics
+import time
+
+
+def summarize(timings):
+    return {
+        "repeats": len(timings),
+        "min": min(timings),
+        "median": statistics.median(timings),
+        "mean": statistics.fmean(timings),
+        "max": max(timings),
+    }
+
+
+def measure(func, setup=None, repeat=5, budget=None):
+    # setup runs outside the timed region; stop early once the time budget is used up
+    timings = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+        if budget is not None and sum(timings) > budget:
+            break
+    return summarize(timings)
+
+
+def estimate_next(previous, size):
+    # previous: [(size, seconds)], extrapolates with the growth exponent seen so far
+    (last_size, last_time) = previous[-1]
+    exponent = 1.0
+    if len(previous) > 1:
+        (prev_size, prev_time) = previous[-2]
+        if prev_time > 0 and last_time > 0 and last_size != prev_size:
+            exponent = max(1.0, math.log(last_time / prev_time) / math.log(last_size / prev_size))
+    return last_time * (size / last_size) ** exponent
@@ -0,0 +1,294 @@
+"""
+    Tasky is a task deadline tracker application
+    Copyright (C) 2022-2025  Abhineet Kelley (AbhiK002)
+
+    This file is part of Tasky.
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+# python -m benchmarks.workload generate --home /tmp/load --count 5000 --distribution front --cjk-rate 0.3
+# python -m benchmarks.workload replay --home /tmp/load --ops 2000 --rate 50 --mix add=2,edit=3,delete=1,read=4
+
+import argparse
+import datetime
+import json
+import os
+import random
+import shutil
+import sys
+import time
+from pathlib import Path
+
+from .fixtures import CATEGORIES, PRIORITIES
+from files.zone_ops import LEGACY_DEADLINE_FORMAT, format_epoch
+
+DISTRIBUTIONS = ("uniform", "front", "clustered")
+OPERATIONS = ("add", "edit", "delete", "read")
+LATIN_NAMES = (
+    "Write report", "Review pull request", "Submit assignment", "Gym session", "Read paper",
+    "Prepare slides", "Pay rent", "Call dentist", "Grade exams", "Plan sprint", "Fix bug", "Water plants",
+)
+CJK_NAMES = (
+    "写报告", "复习数学", "提交作业", "健身", "读论文", "准备答辩", "交房租",
+    "会議の準備", "レポート提出", "회의 준비", "보고서 작성",
+)
+
+
+def parse_weights(text, allowed=None):
+    # "Work=3,Study=1" -> {"Work": 3.0, "Study": 1.0}
+    weights = {}
+    for part in text.replace(" ", "").split(","):
+        if not part:
+            continue
+        name, _, weight = part.partition("=")
+        if allowed is not None and name not in allowed:
+            raise ValueError(f"unknown name in weights: {name}")
+        weights[name] = float(weight or 1)
+    return weights
+
+
+def percentiles(values, points=(50, 90, 99)):
+    ordered = sorted(values)
+    result = {}
+    for p in points:
+        # nearest rank
+        rank = max(1, -(-p * len(ordered) // 100))
+        result[f"p{p}"] = ordered[rank - 1]
+    result["max"] = ordered[-1]
+    result["count"] = len(ordered)
+    return result
+
+
+class WorkloadGenerator:
+    def __init__(self, count=100, seed=0, distribution="uniform", horizon_days=90, expired_rate=0.0,
+                 duplicate_rate=0.0, cjk_rate=0.0, desc_rate=0.7, categories=None, priorities=None, now=None):
+        if distribution not in DISTRIBUTIONS:
+            raise ValueError(f"unknown deadline distribution: {distribution}")
+        self.count = count
+        self.rng = random.Random(seed)
+        self.distribution = distribution
+        self.horizon = datetime.timedelta(days=horizon_days)
+        self.expired_rate = expired_rate
+        self.duplicate_rate = duplicate_rate
+        self.cjk_rate = cjk_rate
+        self.desc_rate = desc_rate
+        self.categories = categories or {c: 1.0 for c in CATEGORIES}
+        self.priorities = priorities or {p: 1.0 for p in PRIORITIES}
+        self.now = (now or datetime.datetime.now()).replace(second=0, microsecond=0)
+        self.clusters = [self.now + self.rng.random() * self.horizon for _ in range(5)]
+        self.serial = 0
+
+    def deadline(self):
+        rng = self.rng
+        if rng.random() < self.expired_rate:
+            return self.now - rng.random() * datetime.timedelta(days=30)
+        if self.distribution == "front":
+            # most deadlines land in the next few days, a long tail up to the horizon
+            offset = min(rng.expovariate(1 / (self.horizon / 10).total_seconds()), self.horizon.total_seconds())
+            return self.now + datetime.timedelta(seconds=offset, minutes=30)
+        if self.distribution == "clustered":
+            centre = rng.choice(self.clusters)
+            return max(self.now + datetime.timedelta(minutes=30), centre + datetime.timedelta(hours=rng.gauss(0, 12)))
+        return self.now + datetime.timedelta(minutes=30) + rng.random() * self.horizon
+
+    def name(self):
+        self.serial += 1
+        pool = CJK_NAMES if self.rng.random() < self.cjk_rate else LATIN_NAMES
+        return f"{self.rng.choice(pool)} {self.serial}"[:30]
+
+    def task(self):
+        ttime = format_epoch(self.deadline().timestamp())
+        name = self.name()
+        desc = f"{name} ({ttime})" if self.rng.random() < self.desc_rate else ""
+        meta = {
+            "category": self.rng.choices(list(self.categories), weights=list(self.categories.values()))[0],
+            "priority": self.rng.choices(list(self.priorities), weights=list(self.priorities.values()))[0],
+            "source": "manual",
+            "status": "todo",
+        }
+        return f"{ttime}\t{name}\t{desc}", meta
+
+    def generate(self):
+        tasks, meta_map = [], {}
+        for _ in range(self.count):
+            if tasks and self.rng.random() < self.duplicate_rate:
+                # same deadline and name, sometimes with another description: remove_duplicates has to merge it
+                ttime, name, desc = self.rng.choice(tasks).split("\t", 2)
+                tasks.append(f"{ttime}\t{name}\t{desc if self.rng.random() < 0.5 else 'duplicate'}")
+                continue
+            task, meta = self.task()
+            tasks.append(task)
+            ttime, name, _ = task.split("\t", 2)
+            meta_map[f"{ttime}\t{name}"] = meta
+        self.rng.shuffle(tasks)
+        return tasks, meta_map
+
+    def legacy_tasks(self, count):
+        # tasks.txt from before v2: "deadline=name" or "deadline=name=description" per line
+        lines = []
+        for _ in range(count):
+            ttime, name, desc = self.task()[0].split("\t", 2)
+            ttime = datetime.datetime.fromtimestamp(int(ttime)).strftime(LEGACY_DEADLINE_FORMAT)
+            lines.append(f"{ttime}={name}={desc}" if desc else f"{ttime}={name}")
+        return lines
+
+    def write(self, functions, legacy=0):
+        functions.check_tasks_txt()
+        tasks, meta_map = self.generate()
+        with open(functions.tasks_path, "w", encoding="utf-8") as f:
+            f.write("\n".join(tasks))
+        functions.write_meta_map(meta_map)
+        with open(functions.old_tasks_path, "w", encoding="utf-8") as f:
+            f.write("\n".join(self.legacy_tasks(legacy)))
+        if legacy:
+            # old_checked marks the legacy file as merged, drop it so the next read merges again
+            shutil.rmtree(functions.taskymain_path / "old_checked", ignore_errors=True)
+        return len(tasks), len(meta_map)
+
+
+class Replayer:
+    # drives the backend the way the GUI and console do: adds and edits are staged in an
+    # EditSession and committed, deletes go through remove(), reads load the list with its meta
+    def __init__(self, functions, generator, mix=None, seed=0):
+        self.functions = functions
+        self.generator = generator
+        self.mix = mix or {"add": 1.0, "edit": 1.0, "delete": 1.0, "read": 2.0}
+        self.rng = random.Random(seed)
+
+    def op_read(self):
+        tasks = self.functions.read_and_sort_tasks_file()
+        self.functions.return_deadlines_with_meta(tasks)
+
+    def op_add(self):
+        f = self.functions
+        session = f.edit_session(f.read_and_sort_tasks_file())
+        task, meta = self.generator.task()
+        session.add(task)
+        session.update_meta(task, category=meta["category"], priority=meta["priority"], source="manual", status="todo")
+        session.commit()
+
+    def op_edit(self):
+        f = self.functions
+        tasks = f.read_and_sort_tasks_file()
+        if not tasks:
+            return self.op_add()
+        i = self.rng.randrange(len(tasks))
+        ttime, name, _ = tasks[i].split("\t", 2)
+        if self.rng.random() < 0.5:
+            # moving the deadline changes the task key, so the meta row has to follow it
+            ttime = format_epoch(self.generator.deadline().timestamp())
+        new_task = f"{ttime}\t{name}\tedited {self.rng.randrange(10 ** 6)}"
+        session = f.edit_session(tasks)
+        session.replace(i, new_task)
+        session.commit()
+
+    def op_delete(self):
+        f = self.functions
+        tasks = f.read_and_sort_tasks_file()
+        if tasks:
+            f.remove(self.rng.randrange(len(tasks)) + 1, tasks)
+
+    def run(self, ops, rate=0.0):
+        names = [name for name in OPERATIONS if self.mix.get(name)]
+        weights = [self.mix[name] for name in names]
+        latencies = {name: [] for name in names}
+        interval = 1 / rate if rate else 0.0
+        start = time.perf_counter()
+        for i in range(ops):
+            if interval:
+                # open loop: op i is due at start + i / rate, a slow op does not push the schedule back
+                delay = start + i * interval - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            name = self.rng.choices(names, weights=weights)[0]
+            t = time.perf_counter()
+            getattr(self, f"op_{name}")()
+            latencies[name].append(time.perf_counter() - t)
+        elapsed = time.perf_counter() - start
+        all_ops = [v for values in latencies.values() for v in values]
+        return {
+            "ops": ops,
+            "elapsed": elapsed,
+            "target_rate": rate,
+            "achieved_rate": ops / elapsed if elapsed else 0.0,
+            "latency": percentiles(all_ops) if all_ops else {},
+            "by_operation": {name: percentiles(values) for name, values in latencies.items() if values},
+        }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.workload", description="Tasky workload generator and replay")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    def common(p):
+        p.add_argument("--home", required=True, help="directory used as HOME, the store is written to HOME/Tasky")
+        p.add_argument("--seed", type=int, default=0)
+        p.add_argument("--distribution", choices=DISTRIBUTIONS, default="uniform")
+        p.add_argument("--horizon-days", type=float, default=90)
+        p.add_argument("--expired-rate", type=float, default=0.0, help="fraction of deadlines already passed")
+        p.add_argument("--cjk-rate", type=float, default=0.0, help="fraction of CJK task names")
+        p.add_argument("--desc-rate", type=float, default=0.7, help="fraction of tasks with a description")
+        p.add_argument("--categories", help="weights, e.g. Work=3,Study=1")
+        p.add_argument("--priorities", help="weights, e.g. High=1,Medium=4")
+
+    gen = sub.add_parser("generate", help="write newtasks.txt, tasks_meta.txt and optionally a legacy tasks.txt")
+    common(gen)
+    gen.add_argument("--count", type=int, default=100)
+    gen.add_argument("--duplicate-rate", type=float, default=0.0, help="fraction of lines repeating an earlier task")
+    gen.add_argument("--legacy", type=int, default=0, help="number of tasks.txt lines in the old '=' format")
+
+    rep = sub.add_parser("replay", help="run add/edit/delete/read operations against the store and report latency")
+    common(rep)
+    rep.add_argument("--ops", type=int, default=1000)
+    rep.add_argument("--rate", type=float, default=0.0, help="target operations per second (0 = as fast as possible)")
+    rep.add_argument("--mix", default="add=1,edit=1,delete=1,read=2", help="operation weights")
+    rep.add_argument("--json", metavar="FILE", help="also write the report as JSON")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    home = Path(args.home).resolve()
+    home.mkdir(parents=True, exist_ok=True)
+    # Functions and TaskyLog resolve ~/Tasky when they are imported
+    os.environ["HOME"] = os.environ["USERPROFILE"] = str(home)
+    from files.tasky_ops import Functions
+
+    functions = Functions()
+    generator = WorkloadGenerator(
+        count=getattr(args, "count", 0), seed=args.seed, distribution=args.distribution,
+        horizon_days=args.horizon_days, expired_rate=args.expired_rate,
+        duplicate_rate=getattr(args, "duplicate_rate", 0.0), cjk_rate=args.cjk_rate, desc_rate=args.desc_rate,
+        categories=parse_weights(args.categories, CATEGORIES) if args.categories else None,
+        priorities=parse_weights(args.priorities, PRIORITIES) if args.priorities else None,
+    )
+
+    if args.command == "generate":
+        lines, unique = generator.write(functions, legacy=args.legacy)
+        print(f"wrote {lines} task lines ({unique} unique) and {args.legacy} legacy lines to {functions.taskymain_path}")
+        return
+
+    report = Replayer(functions, generator, parse_weights(args.mix, OPERATIONS), seed=args.seed).run(args.ops, args.rate)
+    print(f"{report['ops']} ops in {report['elapsed']:.2f}s ({report['achieved_rate']:.1f} ops/s)")
+    for name, stats in [("all", report["latency"])] + list(report["by_operation"].items()):
+        print(f"  {name:<7} n={stats['count']:<6} " + "  ".join(
+            f"{k} {stats[k] * 1000:8.2f} ms" for k in ("p50", "p90", "p99", "max")))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,62 @@
+"""
+    Tasky is a task deadline tracker application
+    Copyright (C) 2022-2025  Abhineet Kelley (AbhiK002)
+
+    This file is part of Tasky.
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import datetime
+
+DEFAULT_RETENTION_DAYS = 7
+ARCHIVE_FIELDS = ("archived_at", "id", "ttime", "name", "desc", "category", "priority", "source", "outcome")
+
+
+class ArchiveStore:
+    # append-only gzip file of finished tasks: each append adds one gzip member and
+    # readers see the members as a single stream, so nothing is ever rewritten.
+    # Nothing is read until a history view asks for it.
+    def __init__(self, path):
+        self.path = path
+
+    def append(self, rows):
+        import gzip
+
+        if not rows:
+            return 0
+        now = datetime.datetime.now().strftime("%Y-%m-%d %H:%M")
+        with gzip.open(self.path, "at", encoding="utf-8") as f:
+            for row in rows:
+                values = dict(row, archived_at=row.get("archived_at") or now)
+                f.write("\t".join(str(values.get(field, "")).replace("\t", " ") for field in ARCHIVE_FIELDS) + "\n")
+        return len(rows)
+
+    def read(self, limit=None):
+        # newest first
+        import gzip
+
+        try:
+            with gzip.open(self.path, "rt", encoding="utf-8") as f:
+                lines = f.read().splitlines()
+        except FileNotFoundError:
+            return []
+        rows = []
+        for line in reversed(lines):
+            values = line.split("\t")
+            if len(values) == len(ARCHIVE_FIELDS):
+                rows.append(dict(zip(ARCHIVE_FIELDS, values)))
+                if limit is not None and len(rows) >= limit:
+                    break
+        return rows
@@ -0,0 +1,101 @@
+"""
+    Tasky is a task deadline tracker application
+    Copyright (C) 2022-2025  Abhineet Kelley (AbhiK002)
+
+    This file is part of Tasky.
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import datetime
+import os
+
+DEFAULT_BACKUP_INTERVAL = 60
+DEFAULT_KEEP_LAST = 20
+DEFAULT_KEEP_DAILY = 14
+
+
+class SnapshotStore:
+    # point-in-time copies of the task and meta files: each file's content is stored
+    # once under its sha256 (zlib compressed) in objects/, and snapshots.txt lists
+    # "<taken at>\t<tasks hash>\t<meta hash>" per snapshot, oldest first
+    def __init__(self, folder):
+        self.folder = folder
+        self.objects = folder / "objects"
+        self.manifest = folder / "snapshots.txt"
+
+    def entries(self):
+        try:
+            with open(self.manifest, encoding="utf-8") as f:
+                return [line.split("\t") for line in f.read().splitlines() if line.count("\t") == 2]
+        except OSError:
+            return []
+
+    def put_object(self, data):
+        import hashlib
+        import zlib
+
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.objects / digest
+        if not path.exists():
+            self.objects.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(".tmp")
+            with open(tmp, "wb") as f:
+                f.write(zlib.compress(data, 9))
+            os.replace(tmp, path)
+        return digest
+
+    def get_object(self, digest):
+        import zlib
+
+        with open(self.objects / digest, "rb") as f:
+            return zlib.decompress(f.read())
+
+    def snapshot(self, tasks_data, meta_data):
+        # returns the new entry, or None when the store equals the latest snapshot
+        tasks_hash, meta_hash = self.put_object(tasks_data), self.put_object(meta_data)
+        entries = self.entries()
+        if entries and entries[-1][1:] == [tasks_hash, meta_hash]:
+            return None
+        entry = [datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"), tasks_hash, meta_hash]
+        with open(self.manifest, "a", encoding="utf-8") as f:
+            f.write("\t".join(entry) + "\n")
+        return entry
+
+    def restore(self, entry):
+        return self.get_object(entry[1]), self.get_object(entry[2])
+
+    def prune(self, keep_last=DEFAULT_KEEP_LAST, keep_daily=DEFAULT_KEEP_DAILY):
+        # keeps the newest keep_last snapshots plus the last one of each of the
+        # latest keep_daily days, then drops objects no snapshot refers to
+        entries = self.entries()
+        keep = set(range(max(0, len(entries) - keep_last), len(entries)))
+        days = {}
+        for i, entry in enumerate(entries):
+            days[entry[0][:10]] = i
+        keep.update(sorted(days.values())[-keep_daily:] if keep_daily > 0 else [])
+        if len(keep) == len(entries):
+            return 0
+
+        kept = [entries[i] for i in sorted(keep)]
+        tmp = self.manifest.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write("".join("\t".join(entry) + "\n" for entry in kept))
+        os.replace(tmp, self.manifest)
+
+        referenced = {h for entry in kept for h in entry[1:]}
+        for path in self.objects.iterdir():
+            if path.name not in referenced:
+                path.unlink()
+        return len(entries) - len(kept)
@@ -18,31 +18,141 @@
     along with this program.  If not, see <https://www.gnu.org/licenses/>.
 """
 
-from .tasky_ops import Functions, OSFunctions
+import datetime
+import time
+
+from .screen_ops import ScreenRenderer
+from .recur_ops import describe_rule, parse_rule
+from .search_ops import SearchIndex
+from .tasky_ops import Functions, OSFunctions, PERF
+from .workspace_ops import DEFAULT_WORKSPACE, RecentWorkspaces, is_valid_workspace, list_workspaces
+from .zone_ops import MAX_DEADLINE_YEAR, is_valid_zone
 from textwrap import wrap
 if OSFunctions.is_linux_system():
     import readline
 
 
 class ConsoleFunctions(Functions):
+    def __init__(self, workspace=None):
+        super(ConsoleFunctions, self).__init__(workspace)
+        self.search_index = SearchIndex()
+        self.screen = ScreenRenderer()
+        self.session_tasks = None
+        self.session_meta = None
+        self.session_stamp = None
+        self.open_session = None
+        self.recent_workspaces = RecentWorkspaces()
+        self.next_backup = 0
+
     def clear_window(self):
-        OSFunctions.clear_terminal()
+        self.screen.render([])
         self.TL.function(f"output screen cleared")
 
+    def current_tasks(self):
+        # the files are only re-read (and re-sorted) when a stat shows they changed,
+        # read_and_sort_tasks_file may write them back so the stamp is taken afterwards
+        if self.session_tasks is None or self.stat_files() != self.session_stamp:
+            self.session_tasks = self.read_and_sort_tasks_file()
+            self.session_meta = self.read_meta_map()
+            self.session_stamp = self.stat_files()
+            self.TL.info(f"task files changed, reloaded {len(self.session_tasks)} tasks")
+        return self.session_tasks.copy()
+
+    def current_meta(self):
+        # meta map loaded with current_tasks() and guarded by the same stamp, read-only
+        self.current_tasks()
+        return self.session_meta
+
+    def switch_workspace(self, name):
+        # the workspace being left keeps its parsed list, current_tasks re-validates it by stat
+        self.recent_workspaces.put(self.workspace, (self.session_tasks, self.session_meta, self.session_stamp))
+        self.set_workspace(name)
+        self.session_tasks, self.session_meta, self.session_stamp = self.recent_workspaces.pop(name) or (None, None, None)
+
+    def workspace_command(self, args):
+        if not args:
+            self.info_bar("viewing workspaces")
+            print(f"{' WORKSPACES '.center(60, '~')}\n")
+            for name in list_workspaces(self.taskymain_path):
+                print(f"{'*' if name == self.workspace else ' '} {name}")
+            print("\n(switch to or create one with 'workspace NAME')")
+            return
+        name = args[0]
+        if not is_valid_workspace(name):
+            self.TL.error(f"invalid workspace name: {name}")
+            self.info_bar("workspace names use letters, digits, '-' and '_'")
+            return
+        self.switch_workspace(name)
+        self.TL.info(f"switched to workspace {name}")
+        self.info_bar(f"workspace: {name}")
+
+    def sync_command(self):
+        from .sync_ops import SyncEngine
+
+        engine = SyncEngine.from_settings(self)
+        if engine is None:
+            self.info_bar("set dir=<shared folder> in ~/Tasky/sync.txt first")
+            return
+        try:
+            sent, received = engine.sync()
+        except OSError as e:
+            self.TL.error(f"sync failed: {e}")
+            self.info_bar("sync failed, check the shared folder")
+            return
+        self.info_bar(f"synced: sent {sent}, received {received} changes")
+
+    def backup_if_due(self):
+        settings = self.backup_settings()
+        if not settings["enabled"] or time.monotonic() < self.next_backup:
+            return
+        self.next_backup = time.monotonic() + settings["interval"] * 60
+        try:
+            self.backup_now()
+        except OSError as e:
+            self.TL.error(f"backup failed: {e}")
+
+    def show_backups(self):
+        entries = self.list_backups()
+        print(f"\n{' BACKUPS '.center(60, '~')}\n")
+        if not entries:
+            print("(No backups yet)".center(60), end='\n\n')
+            return
+        for i, entry in enumerate(entries, 1):
+            print(f"{('(' + str(i) + ')').rjust(4)} {entry[0]}")
+        print("\n(restore one with 'restore N')\n")
+
+    def restore_command(self, num):
+        entries = self.list_backups()
+        if num not in range(1, len(entries) + 1):
+            self.info_bar("invalid backup number, see 'backups'")
+            return
+        entry = entries[num - 1]
+        if not self.is_confirmed(f"\nReplace all current tasks with the backup from {entry[0]}? (enter y/n):  ", None):
+            self.info_bar("restore cancelled")
+            return
+        self.restore_backup(entry)
+        self.info_bar(f"restored the backup from {entry[0]}")
+
+    def ask(self, prompt):
+        self.screen.note_input(prompt)
+        return input(prompt)
+
     def info_bar(self, data, clear_console=True):
         data = str(data)
+        frame = self.status_lines() + [f"<< {data.center(54)} >>", ""]
         if clear_console:
-            self.clear_window()
-        self.status()
-        print(f"<< {data.center(54)} >>\n")
+            self.screen.render(frame)
+        else:
+            # printed below other output, the next frame has to start from a clear screen
+            print(*frame, sep="\n")
+            self.screen.invalidate()
         self.TL.info("refreshed output screen")
         self.TL.info(f"status bar: {data}")
 
     def is_confirmed(self, msg, last):
         self.TL.waiting("for confirmation from user")
         while True:
-            self.write_tasks(last)
-            choice = input(msg).strip().lower()
+            choice = self.ask(msg).strip().lower()
             if choice == 'y':
                 self.TL.info("input: 'y', confirmed")
                 return True
@@ -56,33 +166,44 @@ class ConsoleFunctions(Functions):
                 self.info_bar("please enter y/n")
 
     def status(self):
-        self.TL.function(f"starts -> status()")
+        print(*self.status_lines(), sep="\n")
+
+    def status_lines(self):
+        self.TL.function(f"starts -> status_lines()")
 
-        print(f"\n{' TASKS REMAINING '.center(60, '~')}\n")
+        title = ' TASKS REMAINING ' if self.workspace == DEFAULT_WORKSPACE else f' TASKS REMAINING [{self.workspace}] '
+        lines = ["", title.center(60, '~'), ""]
 
-        task_list = self.read_and_sort_tasks_file()
+        # an open edit session shows its staged, not yet written, tasks
+        task_list = self.open_session.tasks if self.open_session else self.current_tasks()
         self.TL.info(f"stored current tasks in 'task_list'")
 
         if not task_list:  # no tasks
-            print("(No tasks to display yet)".center(60), "Add a task using 'add' or 'new'".center(60), sep='\n', end='\n\n\n')
+            lines += ["(No tasks to display yet)".center(60), "Add a task using 'add' or 'new'".center(60), "", ""]
             self.TL.info("no tasks available to display")
-            return
+            return lines
 
-        outputs = list(map(
-            lambda task: f"{f'({task[0]})'.rjust(4)} {task[1]} >>>  {task[2]}",
-            self.return_deadlines(task_list)
-        ))
-        # task = [("[TASK NUMBER]", "[TASK DEADLINE]", "[TASK NAME]", "[TASK DESCRIPTION]"), (...) ... ]
+        outputs = []
+        for task in self.staged_details(task_list):
+            # tasks waiting on a prerequisite that is still in the list are marked
+            blocked = " [blocked]" if task.get("blocked") else ""
+            outputs.append(f"{('(' + task['num'] + ')').rjust(4)} {task['deadline_text']} >>>  {task['name']}{blocked}")
 
         self.TL.info('outputs created from the tasks list')
         self.TL.info(outputs)
 
-        status_output = "\n".join(outputs) + "\n"
-        print(status_output)
-        self.TL.info(f"all task details printed on output screen")
-        self.TL.info(f"\n{status_output}")
+        lines += outputs + [""]
+        self.TL.info(f"all task details added to the output screen")
+        self.TL.info("\n" + "\n".join(outputs))
+
+        self.TL.function(f"ends -> status_lines()")
+        return lines
 
-        self.TL.function(f"ends -> status()")
+    def staged_details(self, task_list):
+        # an open edit session is shown with its in-memory meta, only commit writes tasks_meta.txt;
+        # otherwise the cached meta map, so a repaint reads no file unless a stat shows a change
+        meta_map = self.open_session.meta() if self.open_session else self.current_meta()
+        return self.apply_task_graph([self.task_details(i + 1, task, meta_map) for i, task in enumerate(task_list)])
 
     def view_task(self, num, tlist):
         self.TL.function(f"starts -> view_task({num})")
@@ -99,18 +220,33 @@ class ConsoleFunctions(Functions):
         self.TL.info(f"target task : {target_task}")
 
         dt, t_name, t_desc = target_task.split("\t", 2)
+        details = self.staged_details(task_list)[num - 1]
+        rule, zone = details["recur"], details["zone"]
+        # prerequisites still in the list block the task, the chain is its critical path
+        graph_lines = []
+        if details.get("blocked_by"):
+            graph_lines.append(f'{"BLOCKED BY : ".rjust(30)}{", ".join(details["blocked_by"])}')
+        if details.get("blocks"):
+            graph_lines.append(f'{"BLOCKS : ".rjust(30)}{", ".join(details["blocks"])}')
+        if len(details.get("critical_path", ())) > 1:
+            graph_lines.append(f'{"CRITICAL PATH : ".rjust(30)}{" -> ".join(details["critical_path"])}')
+        if details.get("due_by", dt) < dt:
+            # a task it blocks is due before this task's own deadline
+            graph_lines.append(f'{"NEEDED IN : ".rjust(30)}{self.timediff(details["due_by"]).strip()}')
+        if details.get("urgency", 0) > details["risk"]:
+            graph_lines.append(f'{"INHERITED RISK : ".rjust(30)}{details["urgency"]} (was {details["risk"]})')
 
         if not t_desc.strip():
             t_desc = "(Empty)"
 
-        tYY, tMM, tDD, tHH, tmm = dt.split(":")
+        # shown in the viewer's local zone, the task's own zone gets its own line
+        tYY, tMM, tDD, tHH, tmm = self.parse_deadline_to_datetime(dt).strftime("%Y %m %d %H %M").split()
 
-        tYY = 2000 + int(tYY)
         prevMM = str((int(tMM) - 1) % 12).zfill(2)
         if prevMM == "00":
             prevMM = "12"
         tMM = self.month_names[int(tMM)]
-        self.TL.info(f"changed year to YYYY form and month number to Name")
+        self.TL.info(f"changed month number to Name")
 
         tt12h = int(tHH) % 12
         ttampm = ("AM", "PM")[int(tHH) // 12 == 1]
@@ -135,6 +271,9 @@ class ConsoleFunctions(Functions):
             f'{"DATE : ".rjust(30)}{tDD} {tMM.title()}, {tYY}',
             f'{"TIME : ".rjust(30)}{tt12h}:{tmm} {ttampm}',
             f'{"DEADLINE : ".rjust(30)}{self.timediff(dt).strip()}',
+            *([f'{"REPEATS : ".rjust(30)}{describe_rule(rule)}'] if rule else []),
+            *([f'{"IN ZONE : ".rjust(30)}{self.parse_deadline_to_datetime(dt, zone).strftime("%d %B, %Y %H:%M")} ({zone})'] if zone else []),
+            *graph_lines,
             f'\n{"TASK DESCRIPTION : ".rjust(30)}{desc_first_line}', *desc_remaining,
             "-" * width
         )
@@ -143,17 +282,96 @@ class ConsoleFunctions(Functions):
 
         self.TL.function(f"ends -> view_task({num})")
 
+    def search_tasks(self, query, tlist):
+        self.TL.function(f"starts -> search_tasks({query})")
+
+        meta_map = self.open_session.meta() if self.open_session else self.current_meta()
+        positions = {}
+        documents = {}
+        for i, task in enumerate(tlist):
+            key = self.task_identity(task)
+            _, tname, tdesc = task.split("\t", 2)
+            positions[key] = i
+            documents[key] = (tname, tdesc, meta_map.get(key, {}).get("category", "General"))
+        self.search_index.sync(documents)
+        self.TL.info(f"search index synced with {len(documents)} tasks")
+
+        keys = self.search_index.search(query)
+        print(f"\n{f' SEARCH: {query} '.center(60, '~')}\n")
+        if not keys:
+            print("(No matching tasks)".center(60), end='\n\n')
+            self.TL.info("no tasks matched the search")
+            return
+
+        for key in keys:
+            task = self.task_details(positions[key] + 1, tlist[positions[key]], meta_map)
+            print(f"{('(' + task['num'] + ')').rjust(4)} {task['deadline_text']} >>>  {task['name']}  [{task['category']}]")
+        print()
+        self.TL.info(f"{len(keys)} tasks matched the search")
+
+        self.TL.function(f"ends -> search_tasks({query})")
+
+    def show_history(self, limit):
+        self.TL.function(f"starts -> show_history({limit})")
+
+        rows = self.read_archive(limit)
+        print(f"\n{' ARCHIVE '.center(60, '~')}\n")
+        if not rows:
+            print("(No archived tasks)".center(60), end='\n\n')
+            return
+        for row in rows:
+            outcome = "DONE" if row["outcome"] == "done" else "EXPIRED"
+            print(f"{row['archived_at']}  {outcome.ljust(7)}  {row['name']}  [{row['category']}]")
+        print()
+        self.TL.info(f"displayed {len(rows)} archived tasks")
+
+        self.TL.function(f"ends -> show_history({limit})")
+
+    def perf_command(self, args):
+        # tasky-debug perf [on|off|report|reset|quiet|profile]
+        action = args[0] if args else ("off" if PERF.enabled else "on")
+        self.TL.function(f"starts -> perf_command({action})")
+
+        if action in ("on", "off"):
+            PERF.enabled = action == "on"
+            self.info_bar(f"performance timings {action}")
+        elif action == "report":
+            self.info_bar("performance timings")
+            print(PERF.format_report() if PERF.stats else "(no timings recorded, enable with 'tasky-debug perf on')")
+            self.TL.writelog("perf", "\n" + PERF.format_report())
+        elif action == "reset":
+            PERF.reset()
+            self.info_bar("performance timings reset")
+        elif action == "quiet":
+            self.TL.quiet = not self.TL.quiet
+            self.info_bar(f"quiet log {'on' if self.TL.quiet else 'off'}")
+        elif action == "profile":
+            if PERF.profiler is None:
+                PERF.start_profile()
+                self.info_bar("profiling, run 'tasky-debug perf profile' again to stop")
+            else:
+                path = self.TL.filepath / f"profile_{datetime.datetime.now():%Y_%m_%d__%H%M%S}.pstats"
+                summary = PERF.stop_profile(path)
+                self.info_bar(f"profile saved to {path}")
+                print(summary)
+        else:
+            self.TL.error(f"unknown perf action: {action}")
+            self.info_bar("try 'tasky-debug perf on / off / report / reset / quiet / profile'")
+
+        self.TL.function(f"ends -> perf_command({action})")
+
     def edit_task(self, num, last_copy):
         self.TL.function(f"starts -> edit_task({num})")
 
-        last = last_copy
-        self.write_tasks(last)
-        self.TL.info(f"stored current tasks list as 'last'")
+        session = self.open_session = self.edit_session(last_copy)
+        last = session.tasks
+        self.TL.info(f"opened edit session, changes are written on exit")
 
         task_ind = int(num) - 1
         target_task = last[int(num) - 1]
 
         ttask_time, ttask_name, ttask_desc = target_task.split("\t", 2)
+        ttask_zone = session.meta().get(self.task_identity(target_task), {}).get("zone", "")
         self.TL.info(f"original values of task: {ttask_time}, {ttask_name} and {ttask_desc}")
 
         edit_task_help = (
@@ -162,7 +380,9 @@ class ConsoleFunctions(Functions):
             "1. DATE-TIME",
             "2. TASK NAME",
             "3. TASK DESCRIPTION",
-            "4. EXIT EDIT MODE"
+            "4. REPEAT",
+            "5. PREREQUISITES",
+            "6. EXIT EDIT MODE"
         )
         self.info_bar(f"edit mode for task {num}")
         print(*edit_task_help, sep='\n', end='\n\n')
@@ -173,11 +393,10 @@ class ConsoleFunctions(Functions):
                 exited = False
 
                 self.TL.waiting(f"FOR 'choice' INPUT")
-                edit_choice = int(input("> "))
+                edit_choice = int(self.ask("> "))
 
                 self.TL.info(f"received 'choice': {edit_choice}")
 
-                self.write_tasks(last)
                 if edit_choice == 1:
                     self.TL.info(f"user input 1 to edit date-time only")
 
@@ -185,16 +404,16 @@ class ConsoleFunctions(Functions):
                     print(*edit_task_help[:2], sep='\n', end='\n\n')
 
                     mn, hr, dt, mth, yr = self.new_task_time()
+                    zone = self.new_task_zone() if (mn, hr, dt, mth, yr) != (0, 0, 0, 0, 0) else "/cancel"
 
-                    if (mn, hr, dt, mth, yr) != (0, 0, 0, 0, 0):
-                        ttask_time = f"{yr}:{mth}:{dt}:{hr}:{mn}"
+                    if zone != "/cancel":
+                        ttask_time = self.deadline_from_parts(mn, hr, dt, mth, yr, zone)
+                        ttask_zone = zone
                         self.TL.info(f"updated task details saved")
 
                         edited = True
 
                     else:
-                        self.write_tasks(last)
-
                         self.info_bar(f"edit mode for task {num}")
                         print(*edit_task_help, sep='\n', end='\n\n')
 
@@ -211,7 +430,6 @@ class ConsoleFunctions(Functions):
                         edited = True
 
                     else:
-                        self.write_tasks(last)
                         self.info_bar(f"edit mode for task {num}")
                         print(*edit_task_help, sep='\n', end='\n\n')
 
@@ -228,20 +446,49 @@ class ConsoleFunctions(Functions):
                         edited = True
 
                     else:
-                        self.write_tasks(last)
                         self.info_bar(f"edit mode for task {num}")
                         print(*edit_task_help, sep='\n', end='\n\n')
 
                 elif edit_choice == 4:
-                    self.TL.info(f"user input 4 to exit edit-mode for task number {num}")
+                    self.TL.info(f"user input 4 to edit task repetition")
+
+                    self.info_bar(f"task {num} edit: type '/cancel' to cancel")
+                    print(*edit_task_help[:2], sep='\n', end='\n\n')
+
+                    rule = self.new_task_repeat(self.parse_deadline_to_datetime(ttask_time, ttask_zone))
+
+                    if rule != "/cancel":
+                        session.update_meta(last[task_ind], recur=rule)
+                        self.TL.info(f"staged repeat rule '{rule}' in the edit session")
+                        self.info_bar("requested edit successful")
+                    else:
+                        self.info_bar(f"edit mode for task {num}")
+                    print(*edit_task_help, sep='\n', end='\n\n')
+
+                elif edit_choice == 5:
+                    self.TL.info(f"user input 5 to edit task prerequisites")
+
+                    self.info_bar(f"task {num} edit: type '/cancel' to cancel")
+                    print(*edit_task_help[:2], sep='\n', end='\n\n')
+
+                    depends = self.new_task_prerequisites(last[task_ind], last, session.meta())
+
+                    if depends != "/cancel":
+                        session.update_meta(last[task_ind], depends=depends)
+                        self.TL.info(f"staged prerequisites '{depends}' in the edit session")
+                        self.info_bar("requested edit successful")
+                    else:
+                        self.info_bar(f"edit mode for task {num}")
+                    print(*edit_task_help, sep='\n', end='\n\n')
+
+                elif edit_choice == 6:
+                    self.TL.info(f"user input 6 to exit edit-mode for task number {num}")
                     exited = True
 
                 else:
                     self.TL.error(f"invalid value entered in edit mode: {edit_choice}")
 
-                    self.write_tasks(last)
-
-                    self.info_bar("choose out of 1, 2, 3, 4 only")
+                    self.info_bar("choose out of 1, 2, 3, 4, 5, 6 only")
                     print(*edit_task_help, sep='\n', end='\n\n')
 
                 if edited:
@@ -249,27 +496,25 @@ class ConsoleFunctions(Functions):
                     edited_task = f"{ttask_time}\t{ttask_name}\t{ttask_desc}"
                     self.TL.info(f"new task: {edited_task}")
 
-                    last[task_ind] = edited_task
-                    self.TL.info(f"replaced old task in 'last' with edited task")
-
-                    self.write_tasks(last)
-                    self.TL.info(last)
+                    session.replace(task_ind, edited_task)
+                    if session.meta().get(self.task_identity(edited_task), {}).get("zone", "") != ttask_zone:
+                        session.update_meta(edited_task, zone=ttask_zone)
+                    self.TL.info(f"staged edited task in the edit session")
 
                     self.info_bar("requested edit successful")
                     print(*edit_task_help, sep='\n', end='\n\n')
 
                 if exited:
                     self.TL.info(f"exiting edit mode for task {num}")
-                    self.info_bar(f"exited edit mode for task {num}")
-                    self.write_tasks(last)
+                    self.open_session = None
+                    saved = session.commit()
+                    self.info_bar(f"{'saved changes and ' if saved else ''}exited edit mode for task {num}")
                     break
 
             except ValueError:
                 self.TL.error("user typed something that's not numbers... it wasn't very effective")
 
-                self.write_tasks(last)
-
-                self.info_bar("numbers 1, 2, 3, 4 allowed only")
+                self.info_bar("numbers 1, 2, 3, 4, 5, 6 allowed only")
                 print(*edit_task_help, sep='\n', end='\n\n')
 
         self.TL.function(f"ends -> edit_task({num})")
@@ -279,7 +524,7 @@ class ConsoleFunctions(Functions):
 
         while True:
             self.TL.waiting(f"for task name input")
-            taskname = input(f"{'New Task Name (30 chars)'.ljust(27)}:  ").strip().replace('\t', ' ')
+            taskname = self.ask(f"{'New Task Name (30 chars)'.ljust(27)}:  ").strip().replace('\t', ' ')
 
             self.TL.info(f"task name input: {taskname}")
 
@@ -308,7 +553,7 @@ class ConsoleFunctions(Functions):
 
         while True:
             self.TL.waiting("for task description")
-            task_desc = input(f"\n{'Description (Optional)'.ljust(27)}:  ").strip().replace('\t', ' ')
+            task_desc = self.ask(f"\n{'Description (Optional)'.ljust(27)}:  ").strip().replace('\t', ' ')
 
             if len(task_desc) > 168:
                 print("Task Description cannot be more than 168 characters\n")
@@ -321,6 +566,73 @@ class ConsoleFunctions(Functions):
                 self.TL.info("task description valid and returned")
                 return task_desc
 
+    def new_task_repeat(self, first):
+        self.TL.function("starts -> new_task_repeat()")
+
+        while True:
+            self.TL.waiting("for repeat rule")
+            text = self.ask(f"{'Repeat (Optional)'.ljust(27)}:  ").strip()
+            if text.lower() == "/cancel":
+                self.TL.info("user chose to cancel task edition/addition")
+                return "/cancel"
+
+            rule = parse_rule(text, first)
+            if rule is None:
+                print("Try: daily, weekly, monthly, weekdays, every 3 days, every 2 weeks (or leave empty)\n")
+                self.TL.error(f"invalid repeat rule: {text}")
+                continue
+            self.TL.info(f"repeat rule: '{rule}'")
+            return rule
+
+    def new_task_prerequisites(self, task, tasks, meta_map):
+        self.TL.function("starts -> new_task_prerequisites()")
+
+        while True:
+            self.TL.waiting("for prerequisite task numbers")
+            text = self.ask(f"{'Done after tasks (e.g. 2, 5)'.ljust(27)}:  ").strip()
+            if text.lower() == "/cancel":
+                self.TL.info("user chose to cancel task edition")
+                return "/cancel"
+
+            nums = text.replace(",", " ").split()
+            if not all(n.isdecimal() and int(n) in range(1, len(tasks) + 1) for n in nums):
+                print(f"Enter task numbers between 1 and {len(tasks)} (or leave empty for none)\n")
+                self.TL.error(f"invalid prerequisite numbers: {text}")
+                continue
+
+            prerequisites = [tasks[int(n) - 1] for n in nums]
+            error = self.dependency_error(task, prerequisites, meta_map)
+            if error is not None:
+                print(f"{error.capitalize()}\n")
+                self.TL.error(f"rejected prerequisites {nums}: {error}")
+                continue
+            depends = ",".join(sorted({meta_map[self.task_identity(p)]["id"] for p in prerequisites}))
+            self.TL.info(f"prerequisites: '{depends}'")
+            return depends
+
+    def new_task_zone(self):
+        self.TL.function("starts -> new_task_zone()")
+
+        while True:
+            self.TL.waiting("for time zone")
+            zone = self.ask(f"{'Time Zone (Optional)'.ljust(27)}:  ").strip()
+            if zone.lower() == "/cancel":
+                self.TL.info("user chose to cancel task edition/addition")
+                return "/cancel"
+            if zone.lower() == "local":
+                zone = ""
+
+            if not is_valid_zone(zone):
+                print("Enter an IANA time zone like Europe/London or America/New_York (or leave empty for local time)\n")
+                self.TL.error(f"unknown time zone: {zone}")
+                continue
+            self.TL.info(f"time zone: '{zone}'")
+            return zone
+
+    def deadline_from_parts(self, tmin, thour, tdate, tmonth, tyear, zone=""):
+        wall = datetime.datetime(int(tyear), int(tmonth), int(tdate), int(thour), int(tmin))
+        return self.deadline_from_datetime(wall, zone)
+
     def new_task_time(self):
         self.TL.function(f"starts -> new_task_time()")
 
@@ -328,7 +640,7 @@ class ConsoleFunctions(Functions):
 
             while True:  # ask for date
                 self.TL.waiting(f"for date input")
-                tdate = input(f"{'Date (DD)'.ljust(27)}:  ").strip()
+                tdate = self.ask(f"{'Date (DD)'.ljust(27)}:  ").strip()
 
                 self.TL.info(f"date input: {tdate}")
 
@@ -351,7 +663,7 @@ class ConsoleFunctions(Functions):
 
             while True:  # ask for month
                 self.TL.waiting(f"for month input (num/words)")
-                tmonth = input(f"{'Month (MM/Name)'.ljust(27)}:  ").lower().strip()
+                tmonth = self.ask(f"{'Month (MM/Name)'.ljust(27)}:  ").lower().strip()
 
                 self.TL.info(f"month input: {tmonth}")
 
@@ -410,9 +722,9 @@ class ConsoleFunctions(Functions):
 
                 while True:  # ask for year
                     yr_curr = self.current_year
-                    yr_limit = 2099
+                    yr_limit = MAX_DEADLINE_YEAR
                     self.TL.waiting(f"for year input")
-                    tyear = input(f"{f'Year (YYYY) ({yr_curr}-{yr_limit})'.ljust(27)}:  ").strip()
+                    tyear = self.ask(f"{f'Year (YYYY) ({yr_curr}-{yr_limit})'.ljust(27)}:  ").strip()
 
                     self.TL.info(f"year input: {tyear}")
 
@@ -428,8 +740,7 @@ class ConsoleFunctions(Functions):
                             self.TL.info(f"entered year is confirmed leap year: {tyear}")
 
                             valid_date = True
-                            tyear = tyear[-2:]
-                            self.TL.info(f"last 2 digits of input year stored: {tyear}")
+                            self.TL.info(f"year stored: {tyear}")
                             break
 
                         elif special_feb_case and not self.is_leap(tyear):
@@ -440,8 +751,7 @@ class ConsoleFunctions(Functions):
                             break
 
                         else:
-                            tyear = tyear[-2:]
-                            self.TL.info(f"last 2 digits of input year stored: {tyear}")
+                            self.TL.info(f"year stored: {tyear}")
                             break
                     else:
                         self.TL.error(f"invalid year received: {tyear}")
@@ -452,7 +762,7 @@ class ConsoleFunctions(Functions):
 
         while True:  # ask for hours
             self.TL.waiting(f"for hours input")
-            thour = input(f"{'Hours (HH)(24h)'.ljust(27)}:  ").strip()
+            thour = self.ask(f"{'Hours (HH)(24h)'.ljust(27)}:  ").strip()
 
             self.TL.info(f"received hour input: {thour}")
 
@@ -474,7 +784,7 @@ class ConsoleFunctions(Functions):
 
         while True:  # ask for minutes
             self.TL.waiting(f"for minutes input")
-            tmin = input(f"{'Minutes (mm)'.ljust(27)}:  ").strip()
+            tmin = self.ask(f"{'Minutes (mm)'.ljust(27)}:  ").strip()
 
             self.TL.info(f"minute input received: {tmin}")
 
@@ -502,31 +812,44 @@ class ConsoleFunctions(Functions):
     def new_task(self, last_copy):
         self.TL.function(f"starts -> new_task()")
 
-        self.write_tasks(last_copy)
+        session = self.edit_session(last_copy)
 
         taskname = self.new_task_name()
         if taskname == "/cancel":
-            self.write_tasks(last_copy)
+            session.discard()
             self.info_bar("task addition cancelled")
             return
 
         tmin, thour, tdate, tmonth, tyear = self.new_task_time()
         if (tmin, thour, tdate, tmonth, tyear) == (0, 0, 0, 0, 0):
-            self.write_tasks(last_copy)
+            session.discard()
+            self.info_bar("task addition cancelled")
+            return
+
+        zone = self.new_task_zone()
+        if zone == '/cancel':
+            session.discard()
             self.info_bar("task addition cancelled")
             return
 
         taskdesc = self.new_task_description()
         if taskdesc == '/cancel':
-            self.write_tasks(last_copy)
+            session.discard()
             self.info_bar("task addition cancelled")
+            return
+
+        taskcell = f"{self.deadline_from_parts(tmin, thour, tdate, tmonth, tyear, zone)}\t{taskname}\t{taskdesc}"
 
-        taskcell = f"{tyear}:{tmonth}:{tdate}:{thour}:{tmin}\t{taskname}\t{taskdesc}"
+        rule = self.new_task_repeat(self.parse_deadline_to_datetime(taskcell.split("\t", 1)[0], zone))
+        if rule == '/cancel':
+            session.discard()
+            self.info_bar("task addition cancelled")
+            return
         self.TL.info(f"combined values of new_task_name(), new_task_time() and new_task_description()")
         self.TL.info(f"{taskcell}")
 
-        last_copy.append(taskcell)
-        self.write_tasks(last_copy)
+        session.add(taskcell, **{field: value for field, value in (("recur", rule), ("zone", zone)) if value})
+        session.commit()
         self.info_bar("new task added")
 
         self.TL.function(f"ends -> new_task()")
@@ -0,0 +1,192 @@
+"""
+    Tasky is a task deadline tracker application
+    Copyright (C) 2022-2025  Abhineet Kelley (AbhiK002)
+
+    This file is part of Tasky.
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import heapq
+import itertools
+import time
+
+from .tasky_ops import Functions
+
+# every risk band edge from calculate_risk_score, plus the deadline itself (expiry)
+THRESHOLD_HOURS = tuple(hours for hours, _ in Functions.RISK_BANDS) + (0,)
+
+
+class DeadlineQueue:
+    # two heaps with lazy deletion: one ordered by deadline for "next due",
+    # one ordered by the moment each task enters its next risk band; every time
+    # is UTC epoch seconds, like the stored deadlines, so DST never shifts a band
+    def __init__(self, thresholds=THRESHOLD_HOURS, now=time.time):
+        self.thresholds = sorted(set(thresholds), reverse=True)
+        self.now = now
+        self.deadlines = {}
+        self.live_seq = {}
+        self.due_heap = []
+        self.event_heap = []
+        self.counter = itertools.count()
+
+    @classmethod
+    def from_tasks(cls, tasks, **kwargs):
+        queue = cls(**kwargs)
+        for task in tasks:
+            queue.push(Functions.task_identity(task), Functions.parse_deadline_to_epoch(task.split("\t", 1)[0]))
+        return queue
+
+    def __len__(self):
+        return len(self.deadlines)
+
+    def __contains__(self, key):
+        return key in self.deadlines
+
+    def is_live(self, seq, key):
+        return self.live_seq.get(key) == seq
+
+    def push(self, key, deadline):
+        if key in self.deadlines:
+            self.remove(key)
+
+        seq = next(self.counter)
+        self.deadlines[key] = deadline
+        self.live_seq[key] = seq
+        now = self.now()
+
+        if deadline > now:
+            heapq.heappush(self.due_heap, (deadline, seq, key))
+        for hours in self.thresholds:
+            when = deadline - hours * 3600
+            if when > now:
+                heapq.heappush(self.event_heap, (when, seq, key, hours))
+
+        self.compact()
+
+    def remove(self, key):
+        self.live_seq.pop(key, None)
+        return self.deadlines.pop(key, None)
+
+    def compact(self):
+        # stale entries are only dropped when they reach the top, rebuild once they dominate
+        live = len(self.live_seq)
+        if len(self.event_heap) > 2 * live * len(self.thresholds) + 64:
+            self.event_heap = [e for e in self.event_heap if self.is_live(e[1], e[2])]
+            heapq.heapify(self.event_heap)
+        if len(self.due_heap) > 2 * live + 64:
+            self.due_heap = [e for e in self.due_heap if self.is_live(e[1], e[2])]
+            heapq.heapify(self.due_heap)
+
+    def next_due(self):
+        now = self.now()
+        heap = self.due_heap
+        while heap and (not self.is_live(heap[0][1], heap[0][2]) or heap[0][0] <= now):
+            heapq.heappop(heap)
+        if not heap:
+            return None
+        deadline, _, key = heap[0]
+        return key, deadline
+
+    def next_crossing(self):
+        heap = self.event_heap
+        while heap and not self.is_live(heap[0][1], heap[0][2]):
+            heapq.heappop(heap)
+        if not heap:
+            return None
+        when, _, key, hours = heap[0]
+        return when, key, hours
+
+    def seconds_until_next_crossing(self):
+        crossing = self.next_crossing()
+        if crossing is None:
+            return None
+        return max(0.0, crossing[0] - self.now())
+
+    def advance(self, now=None):
+        # pops and returns every (when, key, hours) crossing that has happened by now
+        now = self.now() if now is None else now
+        crossed = []
+        heap = self.event_heap
+        while heap and heap[0][0] <= now:
+            when, seq, key, hours = heapq.heappop(heap)
+            if self.is_live(seq, key):
+                crossed.append((when, key, hours))
+        return crossed
+
+
+class UserStateTracker(DeadlineQueue):
+    # running overdue / high-risk counts for analyze_user_state: a task's risk only
+    # changes when it crosses a RISK_BANDS edge, so a task is re-scored per crossing
+    # (or when it is pushed again), never per refresh
+    def __init__(self, **kwargs):
+        super(UserStateTracker, self).__init__(**kwargs)
+        self.priorities = {}
+        self.flags = {}
+        self.overdue = 0
+        self.high_risk = 0
+
+    @classmethod
+    def from_tasks(cls, tasks, priorities=None, **kwargs):
+        tracker = cls(**kwargs)
+        tracker.sync(tracker.items_for(tasks, priorities or {}))
+        return tracker
+
+    @staticmethod
+    def items_for(tasks, priorities):
+        # priorities: {task key: priority}, e.g. built from the meta map
+        items = {}
+        for task in tasks:
+            key = Functions.task_identity(task)
+            items[key] = (Functions.parse_deadline_to_epoch(task.split("\t", 1)[0]), priorities.get(key, "Medium"))
+        return items
+
+    def evaluate(self, key, now):
+        hours_left = (self.deadlines[key] - now) / 3600
+        overdue = hours_left <= 0
+        high_risk = Functions.risk_for_hours(hours_left, self.priorities[key]) >= Functions.HIGH_RISK_SCORE
+        old_overdue, old_high_risk = self.flags.get(key, (False, False))
+        self.overdue += overdue - old_overdue
+        self.high_risk += high_risk - old_high_risk
+        self.flags[key] = (overdue, high_risk)
+
+    def push(self, key, deadline, priority="Medium"):
+        super(UserStateTracker, self).push(key, deadline)
+        self.priorities[key] = priority
+        self.evaluate(key, self.now())
+
+    def remove(self, key):
+        overdue, high_risk = self.flags.pop(key, (False, False))
+        self.overdue -= overdue
+        self.high_risk -= high_risk
+        self.priorities.pop(key, None)
+        return super(UserStateTracker, self).remove(key)
+
+    def sync(self, items):
+        # items: {key: (deadline, priority)}, only new or changed tasks are re-scored
+        for key in self.deadlines.keys() - items.keys():
+            self.remove(key)
+        for key, (deadline, priority) in items.items():
+            if self.deadlines.get(key) != deadline or self.priorities.get(key) != priority:
+                self.push(key, deadline, priority)
+
+    def advance(self, now=None):
+        now = self.now() if now is None else now
+        crossed = super(UserStateTracker, self).advance(now)
+        for _, key, _ in crossed:
+            self.evaluate(key, now)
+        return crossed
+
+    def state(self):
+        return Functions.summarize_user_state(len(self.deadlines), self.overdue, self.high_risk)
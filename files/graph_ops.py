@@ -0,0 +1,163 @@
+"""
+    Tasky is a task deadline tracker application
+    Copyright (C) 2022-2025  Abhineet Kelley (AbhiK002)
+
+    This file is part of Tasky.
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+
+def parse_depends(text):
+    # "depends" meta column: comma separated ids of the tasks that must be done first
+    return tuple(sorted({tid.strip() for tid in str(text).split(",") if tid.strip()}))
+
+
+class TaskGraph:
+    # prerequisite DAG over task ids; sync() diffs the nodes and recomputes only the
+    # changed ones plus what they block (chains) or what blocks them (inherited urgency)
+    def __init__(self):
+        self.nodes = {}
+        self.dependents = {}
+        self.order = None
+        self.rank = {}
+        self.cyclic = set()
+        self.chain = {}
+        self.urgency = {}
+        self.due_by = {}
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def prerequisites(self, tid):
+        # finished tasks leave the list, so only prerequisites still in it block
+        return [p for p in self.nodes[tid][2] if p in self.nodes and p != tid]
+
+    def blocks(self, tid):
+        return sorted(d for d in self.dependents.get(tid, ()) if d in self.nodes)
+
+    def link(self, tid, prerequisites, linked):
+        for p in prerequisites:
+            deps = self.dependents.setdefault(p, set())
+            if linked:
+                deps.add(tid)
+            else:
+                deps.discard(tid)
+                if not deps:
+                    del self.dependents[p]
+
+    def sync(self, items):
+        # items: {task id: (deadline epoch, risk, prerequisite ids)}
+        upstream, downstream = set(), set()
+        structure = False
+        for tid in self.nodes.keys() - items.keys():
+            _, _, prerequisites = self.nodes.pop(tid)
+            self.link(tid, prerequisites, False)
+            upstream.update(prerequisites)
+            downstream.update(self.dependents.get(tid, ()))
+            for table in (self.chain, self.urgency, self.due_by):
+                table.pop(tid, None)
+            structure = True
+
+        for tid, node in items.items():
+            old = self.nodes.get(tid)
+            if old == node:
+                continue
+            if old is None or old[2] != node[2]:
+                if old is not None:
+                    self.link(tid, old[2], False)
+                    upstream.update(old[2])
+                self.link(tid, node[2], True)
+                downstream.update(self.dependents.get(tid, ()))
+                structure = True
+            self.nodes[tid] = node
+            upstream.add(tid)
+            downstream.add(tid)
+
+        if structure:
+            self.order = None
+        if upstream or downstream:
+            self.update(upstream & self.nodes.keys(), downstream & self.nodes.keys())
+
+    def topological_order(self):
+        # Kahn's algorithm, ready tasks are taken earliest deadline first; tasks on a
+        # cycle (e.g. from a hand edited meta file) are left out of it and ranked last
+        if self.order is not None:
+            return self.order
+        import heapq
+
+        waiting = {tid: len(self.prerequisites(tid)) for tid in self.nodes}
+        ready = [(self.nodes[tid][0], tid) for tid, count in waiting.items() if not count]
+        heapq.heapify(ready)
+        order = []
+        while ready:
+            _, tid = heapq.heappop(ready)
+            order.append(tid)
+            for d in self.blocks(tid):
+                waiting[d] -= 1
+                if not waiting[d]:
+                    heapq.heappush(ready, (self.nodes[d][0], d))
+        self.cyclic = self.nodes.keys() - set(order)
+        self.order = order
+        self.rank = {tid: i for i, tid in enumerate(order + sorted(self.cyclic, key=lambda t: self.nodes[t][0]))}
+        return order
+
+    def closure(self, seeds, step):
+        seen, stack = set(seeds), list(seeds)
+        while stack:
+            for other in step(stack.pop()):
+                if other not in seen:
+                    seen.add(other)
+                    stack.append(other)
+        return seen
+
+    def update(self, upstream, downstream):
+        self.topological_order()
+        # longest chain of prerequisites ending at each task, the later deadline wins ties
+        downstream = self.closure(downstream, self.blocks)
+        for tid in sorted(downstream, key=self.rank.get):
+            best = (1, None)
+            if tid not in self.cyclic:
+                for p in self.prerequisites(tid):
+                    length = self.chain[p][0] + 1
+                    if length > best[0] or (length == best[0] and self.nodes[p][0] > self.nodes[best[1]][0]):
+                        best = (length, p)
+            self.chain[tid] = best
+
+        # a blocker is as urgent as the most urgent task waiting on it, and is due by the
+        # earliest deadline among them
+        upstream = self.closure(upstream, self.prerequisites)
+        for tid in sorted(upstream, key=self.rank.get, reverse=True):
+            deadline, risk, _ = self.nodes[tid]
+            for d in self.blocks(tid):
+                if d not in self.cyclic and tid not in self.cyclic:
+                    risk = max(risk, self.urgency[d])
+                    deadline = min(deadline, self.due_by[d])
+            self.urgency[tid] = risk
+            self.due_by[tid] = deadline
+
+    def critical_path(self, tid):
+        # prerequisite ids from the start of the longest chain up to the task itself
+        path = []
+        while tid is not None:
+            path.append(tid)
+            tid = self.chain[tid][1]
+        return path[::-1]
+
+    def creates_cycle(self, tid, prerequisites):
+        # True when tid depending on prerequisites would make it (indirectly) its own prerequisite
+        if tid in prerequisites:
+            return True
+        reachable = self.closure([p for p in prerequisites if p in self.nodes], self.prerequisites)
+        return tid in reachable
@@ -0,0 +1,132 @@
+"""
+    Tasky is a task deadline tracker application
+    Copyright (C) 2022-2025  Abhineet Kelley (AbhiK002)
+
+    This file is part of Tasky.
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import os
+
+HISTORY_LIMIT = 50
+
+
+class OperationLog:
+    # bounded undo/redo stacks of task changes, persisted as an append-only log:
+    #   +<json>  a new change {"op", "removed", "added"} where removed/added hold
+    #            only the [task, meta] rows the change touched
+    #   u / r    undo / redo of the latest change
+    # replaying the log rebuilds both stacks; it is compacted once it grows past
+    # a few times the limit, and nothing is read until a change is recorded,
+    # undone or redone (record() needs the stacks and the line count for that).
+    # several processes share the log, so it is replayed again whenever its
+    # size or mtime no longer match what this process last read or wrote
+    def __init__(self, path, limit=HISTORY_LIMIT):
+        self.path = path
+        self.limit = limit
+        self.undo_stack = None
+        self.redo_stack = None
+        self.log_lines = 0
+        self.stamp = None
+
+    def file_stamp(self):
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def load(self):
+        stamp = self.file_stamp()
+        if self.undo_stack is not None and stamp == self.stamp:
+            return
+        import json
+
+        self.undo_stack, self.redo_stack = [], []
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                lines = f.read().splitlines()
+        except OSError:
+            lines = []
+        for line in lines:
+            if line.startswith("+"):
+                try:
+                    self.push(json.loads(line[1:]))
+                except ValueError:
+                    continue
+            elif line == "u" and self.undo_stack:
+                self.redo_stack.append(self.undo_stack.pop())
+            elif line == "r" and self.redo_stack:
+                self.undo_stack.append(self.redo_stack.pop())
+        self.log_lines = len(lines)
+        self.stamp = stamp
+
+    def push(self, entry):
+        self.undo_stack.append(entry)
+        del self.undo_stack[:-self.limit]
+        self.redo_stack.clear()
+
+    def append_line(self, line):
+        fresh = self.file_stamp() == self.stamp
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+        self.log_lines += 1
+        # lines another process appended since load() are picked up by the next replay
+        self.stamp = self.file_stamp() if fresh else None
+        if self.log_lines >= 4 * self.limit:
+            self.compact()
+
+    def compact(self):
+        # same stacks, written as: every entry once, then enough undos to move the redo ones back;
+        # rebuilt from the file so lines appended by other processes are kept
+        import json
+
+        self.undo_stack = None
+        self.load()
+        entries = self.undo_stack + self.redo_stack[::-1]
+        lines = ["+" + json.dumps(e, ensure_ascii=False, separators=(",", ":")) for e in entries]
+        lines += ["u"] * len(self.redo_stack)
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.write("".join(line + "\n" for line in lines))
+        self.log_lines = len(lines)
+        self.stamp = self.file_stamp()
+
+    def record(self, op, removed, added):
+        if not removed and not added:
+            return
+        import json
+
+        self.load()
+        entry = {"op": op, "removed": removed, "added": added}
+        self.push(entry)
+        self.append_line("+" + json.dumps(entry, ensure_ascii=False, separators=(",", ":")))
+
+    def undo(self):
+        self.load()
+        if not self.undo_stack:
+            return None
+        entry = self.undo_stack.pop()
+        self.redo_stack.append(entry)
+        self.append_line("u")
+        return entry
+
+    def redo(self):
+        self.load()
+        if not self.redo_stack:
+            return None
+        entry = self.redo_stack.pop()
+        self.undo_stack.append(entry)
+        self.append_line("r")
+        return entry
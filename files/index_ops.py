@@ -0,0 +1,132 @@
+"""
+    Tasky is a task deadline tracker application
+    Copyright (C) 2022-2025  Abhineet Kelley (AbhiK002)
+
+    This file is part of Tasky.
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import bisect
+import heapq
+import itertools
+
+from .tasky_ops import Functions
+
+
+def priority_rank(priority):
+    # Critical first, unknown priorities rank with Medium (same as the old sort key)
+    return -Functions.PRIORITY_SCORES.get(str(priority).lower(), 2)
+
+
+class TaskIndex:
+    # every bucket is a list of (ttime, key) kept sorted with bisect, so a
+    # filtered or grouped view is a walk over the matching buckets only
+    def __init__(self):
+        self.records = {}
+        self.by_time = []
+        self.by_category = {}
+        self.by_priority = {}
+        self.by_status = {}
+        self.by_category_priority = {}
+
+    @staticmethod
+    def record_of(task_data):
+        return (
+            task_data["ttime"],
+            task_data.get("category", "General"),
+            task_data.get("priority", "Medium"),
+            task_data.get("status", "todo"),
+        )
+
+    def __len__(self):
+        return len(self.records)
+
+    def __contains__(self, key):
+        return key in self.records
+
+    def buckets_for(self, record):
+        ttime, category, priority, status = record
+        return (
+            self.by_time,
+            self.by_category.setdefault(category, []),
+            self.by_priority.setdefault(priority, []),
+            self.by_status.setdefault(status, []),
+            self.by_category_priority.setdefault((category, priority), []),
+        )
+
+    def add(self, key, record):
+        if self.records.get(key) == record:
+            return
+        self.remove(key)
+        self.records[key] = record
+        entry = (record[0], key)
+        for bucket in self.buckets_for(record):
+            bucket.insert(bisect.bisect_left(bucket, entry), entry)
+
+    def remove(self, key):
+        record = self.records.pop(key, None)
+        if record is None:
+            return
+        entry = (record[0], key)
+        for bucket in self.buckets_for(record):
+            i = bisect.bisect_left(bucket, entry)
+            if i < len(bucket) and bucket[i] == entry:
+                del bucket[i]
+
+    def sync(self, items):
+        # items: {key: record}, only records that actually changed are re-inserted
+        for key in self.records.keys() - items.keys():
+            self.remove(key)
+        for key, record in items.items():
+            self.add(key, record)
+
+    def keys(self, category=None, priority=None, status=None, order="time"):
+        if category is not None and priority is not None:
+            groups = [[self.by_category_priority.get((category, priority), [])]]
+        elif order == "category" and category is None:
+            groups = [[self.by_category[c]] for c in sorted(self.by_category)]
+            if priority is not None:
+                groups = [[self.by_category_priority.get((c, priority), [])] for c in sorted(self.by_category)]
+        elif order == "priority" and priority is None:
+            ranked = sorted(self.by_priority, key=priority_rank)
+            if category is not None:
+                buckets = {p: self.by_category_priority.get((category, p), []) for p in ranked}
+            else:
+                buckets = self.by_priority
+            groups = [[buckets[p] for p in same] for _, same in itertools.groupby(ranked, key=priority_rank)]
+        elif category is not None:
+            groups = [[self.by_category.get(category, [])]]
+        elif priority is not None:
+            groups = [[self.by_priority.get(priority, [])]]
+        elif status is not None:
+            groups = [[self.by_status.get(status, [])]]
+        else:
+            groups = [[self.by_time]]
+
+        result = []
+        for group in groups:
+            entries = group[0] if len(group) == 1 else heapq.merge(*group)
+            result.extend(key for _, key in entries)
+
+        if status is not None:
+            result = [key for key in result if self.records[key][3] == status]
+        return result
+
+    def counts(self):
+        return {
+            "category": {c: len(b) for c, b in self.by_category.items() if b},
+            "priority": {p: len(b) for p, b in self.by_priority.items() if b},
+            "status": {s: len(b) for s, b in self.by_status.items() if b},
+        }
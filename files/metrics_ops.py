@@ -0,0 +1,198 @@
+"""
+    Tasky is a task deadline tracker application
+    Copyright (C) 2022-2025  Abhineet Kelley (AbhiK002)
+
+    This file is part of Tasky.
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import bisect
+import http.server
+import os
+import threading
+import time
+
+from .tasky_ops import AboutTasky, Functions, IO_STATS
+from .taskylog import TaskyLog
+
+DEFAULT_METRICS_HOST = "127.0.0.1"
+DEFAULT_METRICS_PORT = 47322
+DEFAULT_INTERVAL = 30
+REFRESH_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+def escape_label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def lines(self, name):
+        cumulative = 0
+        for bound, count in zip(self.buckets + ("+Inf",), self.counts):
+            cumulative += count
+            yield f'{name}_bucket{{le="{bound}"}} {cumulative}'
+        yield f"{name}_sum {self.sum}"
+        yield f"{name}_count {self.count}"
+
+
+class TaskyMetrics:
+    # Prometheus text format, written to a node-exporter textfile and/or served on /metrics
+    def __init__(self, textfile=None, port=None, host=DEFAULT_METRICS_HOST, interval=DEFAULT_INTERVAL, log=None):
+        self.textfile = textfile
+        self.port = port
+        self.host = host
+        self.interval = interval
+        self.TL = log
+        self.lock = threading.Lock()
+        self.started = time.time()
+        self.task_counts = {"category": {}, "priority": {}, "status": {}}
+        self.tasks = 0
+        self.overdue = 0
+        self.high_risk = 0
+        self.focus_score = None
+        self.overdue_ratio = 0.0
+        self.refresh = Histogram(REFRESH_BUCKETS)
+        self.server = None
+
+    @classmethod
+    def from_settings(cls, functions):
+        # opt-in: ~/Tasky/metrics.txt with "textfile=/path/tasky.prom" and/or "port=47322"
+        settings = functions.read_settings_file(functions.taskymain_path / "metrics.txt")
+        if settings.get("enabled", "yes").lower() in ("no", "off", "false", "0"):
+            return None
+        textfile = settings.get("textfile") or None
+        port = settings.get("port") or None
+        if textfile is None and port is None:
+            return None
+        try:
+            port = int(port) if port is not None else None
+            interval = float(settings.get("interval", DEFAULT_INTERVAL))
+        except ValueError as e:
+            functions.TL.error(f"metrics.txt: {e}, metrics disabled")
+            return None
+        return cls(textfile, port, settings.get("host", DEFAULT_METRICS_HOST), interval, log=functions.TL)
+
+    def update_tasks(self, counts, state):
+        # counts: TaskIndex.counts(), state: analyze_user_state / UserStateTracker.state()
+        with self.lock:
+            self.task_counts = {field: dict(counts.get(field, {})) for field in ("category", "priority", "status")}
+            self.tasks = sum(self.task_counts["status"].values())
+            self.overdue = state["overdue_count"]
+            self.high_risk = state["high_risk_count"]
+            self.focus_score = state["focus_score"]
+            self.overdue_ratio = state["overdue_ratio"]
+
+    def observe_refresh(self, seconds):
+        with self.lock:
+            self.refresh.observe(seconds)
+
+    def render(self):
+        lines = []
+
+        def metric(name, kind, help_text, samples):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            lines.extend(samples)
+
+        with self.lock:
+            metric("tasky_info", "gauge", "Tasky version.", [f'tasky_info{{version="{AboutTasky.version}"}} 1'])
+            metric("tasky_start_time_seconds", "gauge", "Unix time the process started.", [f"tasky_start_time_seconds {self.started}"])
+            metric("tasky_tasks", "gauge", "Tasks in the list.", [f"tasky_tasks {self.tasks}"])
+            for field, bucket in self.task_counts.items():
+                metric(f"tasky_tasks_by_{field}", "gauge", f"Tasks per {field}.", [
+                    f'tasky_tasks_by_{field}{{{field}="{escape_label(value)}"}} {count}'
+                    for value, count in sorted(bucket.items())
+                ])
+            metric("tasky_tasks_overdue", "gauge", "Tasks past their deadline.", [f"tasky_tasks_overdue {self.overdue}"])
+            metric("tasky_tasks_high_risk", "gauge", f"Tasks with a risk score of {Functions.HIGH_RISK_SCORE} or more.", [f"tasky_tasks_high_risk {self.high_risk}"])
+            if self.focus_score is not None:
+                metric("tasky_focus_score", "gauge", "Focus score from analyze_user_state.", [f"tasky_focus_score {self.focus_score}"])
+                metric("tasky_overdue_ratio", "gauge", "Share of tasks past their deadline.", [f"tasky_overdue_ratio {self.overdue_ratio}"])
+            metric("tasky_refresh_duration_seconds", "histogram", "Task list refresh latency.",
+                   list(self.refresh.lines("tasky_refresh_duration_seconds")))
+
+        io_counts = dict(IO_STATS.counts)
+        for op, noun, direction in (("read", "read", "from"), ("write", "written", "to")):
+            files = sorted((name, entry) for (kind, name), entry in io_counts.items() if kind == op)
+            metric(f"tasky_file_{op}s_total", "counter", f"Task file {op}s.",
+                   [f'tasky_file_{op}s_total{{file="{escape_label(name)}"}} {entry[0]}' for name, entry in files])
+            metric(f"tasky_file_{noun}_bytes_total", "counter", f"Bytes {noun} {direction} task files.",
+                   [f'tasky_file_{noun}_bytes_total{{file="{escape_label(name)}"}} {entry[1]}' for name, entry in files])
+        metric("tasky_log_lines_total", "counter", "Lines written to taskylogs.", [f"tasky_log_lines_total {TaskyLog.lines_written}"])
+        metric("tasky_log_bytes_total", "counter", "Bytes written to taskylogs.", [f"tasky_log_bytes_total {TaskyLog.bytes_written}"])
+        return "\n".join(lines) + "\n"
+
+    def write_textfile(self):
+        if self.textfile is None:
+            return
+        # node-exporter may read at any moment, so write a temp file and rename it over the old one
+        tmp = f"{self.textfile}.{os.getpid()}.tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(self.render())
+            os.replace(tmp, self.textfile)
+        except OSError as e:
+            if self.TL is not None:
+                self.TL.error(f"metrics textfile {self.textfile}: {e}")
+
+    def serve(self):
+        if self.port is None or self.server is not None:
+            return self.server
+        metrics = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?", 1)[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = metrics.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        try:
+            self.server = http.server.ThreadingHTTPServer((self.host, self.port), Handler)
+        except OSError as e:
+            if self.TL is not None:
+                self.TL.error(f"metrics endpoint {self.host}:{self.port}: {e}")
+            return None
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, name="tasky-metrics", daemon=True).start()
+        if self.TL is not None:
+            self.TL.info(f"metrics served on http://{self.host}:{self.port}/metrics")
+        return self.server
+
+    def close(self):
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+        self.write_textfile()
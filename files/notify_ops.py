@@ -0,0 +1,247 @@
+"""
+    Tasky is a task deadline tracker application
+    Copyright (C) 2022-2025  Abhineet Kelley (AbhiK002)
+
+    This file is part of Tasky.
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import datetime
+import shutil
+import subprocess
+import sys
+import threading
+import time
+
+from .tasky_ops import Functions, OSFunctions
+
+DEFAULT_OFFSETS = "1d,1h,10m"
+DEFAULT_SINKS = "desktop"
+OFFSET_UNITS = {"w": 604800, "d": 86400, "h": 3600, "m": 60, "s": 1}
+
+
+def parse_offsets(text):
+    offsets = set()
+    for part in text.replace(" ", "").split(","):
+        if not part:
+            continue
+        unit = part[-1].lower()
+        if unit not in OFFSET_UNITS or not part[:-1].isdecimal():
+            raise ValueError(f"invalid reminder offset: {part}")
+        offsets.add(int(part[:-1]) * OFFSET_UNITS[unit])
+    return sorted(offsets, reverse=True)
+
+
+def describe_offset(seconds):
+    for unit, size in OFFSET_UNITS.items():
+        if seconds and seconds % size == 0:
+            return f"{seconds // size}{unit}"
+    return f"{seconds}s"
+
+
+class TimerWheel:
+    # hashed timer wheel, scheduling and cancelling are O(1) and each tick
+    # only touches the one bucket under the hand
+    def __init__(self, tick=1.0, slots=512, start=None):
+        self.tick = tick
+        self.slots = slots
+        self.buckets = [dict() for _ in range(slots)]
+        self.current_tick = int((time.time() if start is None else start) // tick)
+        self.timers = {}
+        self.next_id = 0
+
+    def __len__(self):
+        return len(self.timers)
+
+    def schedule(self, when, payload):
+        target = max(int(when // self.tick), self.current_tick + 1)
+        self.next_id += 1
+        timer_id = self.next_id
+        self.buckets[target % self.slots][timer_id] = (target, payload)
+        self.timers[timer_id] = target % self.slots
+        return timer_id
+
+    def cancel(self, timer_id):
+        slot = self.timers.pop(timer_id, None)
+        if slot is not None:
+            self.buckets[slot].pop(timer_id, None)
+
+    def advance(self, now=None):
+        now_tick = int((time.time() if now is None else now) // self.tick)
+        fired = []
+        # after a long sleep there is no point walking more than one full turn
+        start = max(self.current_tick + 1, now_tick - self.slots + 1)
+        for tick in range(start, now_tick + 1):
+            bucket = self.buckets[tick % self.slots]
+            for timer_id, (target, payload) in list(bucket.items()):
+                if target <= now_tick:
+                    del bucket[timer_id]
+                    del self.timers[timer_id]
+                    fired.append(payload)
+        self.current_tick = max(self.current_tick, now_tick)
+        return fired
+
+
+class StdoutSink:
+    # write: where the text goes instead of print, e.g. ScreenRenderer.notice in the console
+    def __init__(self, write=None):
+        self.write = write
+
+    def send(self, title, message):
+        if self.write is not None:
+            self.write(f"\n[{title}] {message}\n")
+            return
+        print(f"\n[{title}] {message}", flush=True)
+
+
+class FileSink:
+    def __init__(self, path):
+        self.path = path
+
+    def send(self, title, message):
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(f"{datetime.datetime.now():%Y-%m-%d %H:%M} [{title}] {message}\n")
+
+
+class DesktopSink:
+    def __init__(self, fallback=None):
+        self.fallback = fallback if fallback is not None else StdoutSink()
+        self.notify_send = shutil.which("notify-send") if OSFunctions.is_linux_system() else None
+
+    def send(self, title, message):
+        try:
+            if self.notify_send:
+                subprocess.Popen([self.notify_send, "-a", "Tasky", title, message])
+                return
+            if OSFunctions.is_system_mac():
+                # passed as arguments, never spliced into the script source
+                script = ["on run argv", "display notification (item 2 of argv) with title (item 1 of argv)", "end run"]
+                subprocess.Popen(["osascript", *(arg for line in script for arg in ("-e", line)), title, message])
+                return
+        except OSError:
+            pass
+        self.fallback.send(title, message)
+
+
+class DeadlineNotifier:
+    def __init__(self, sinks, offsets=DEFAULT_OFFSETS, wheel=None, log=None):
+        self.sinks = list(sinks)
+        self.offsets = parse_offsets(offsets) if isinstance(offsets, str) else sorted(set(offsets), reverse=True)
+        self.wheel = wheel if wheel is not None else TimerWheel()
+        self.TL = log
+        self.scheduled = {}
+        self.lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls, functions, desktop_sink=None, stdout_sink=None):
+        settings = cls.read_settings(functions.taskymain_path / "notify.txt")
+        if settings.get("enabled", "yes").lower() in ("no", "off", "false", "0"):
+            return None
+
+        sinks = []
+        for name in settings.get("sinks", DEFAULT_SINKS).replace(" ", "").split(","):
+            if name == "stdout":
+                sinks.append(stdout_sink if stdout_sink is not None else StdoutSink())
+            elif name == "desktop":
+                sinks.append(desktop_sink if desktop_sink is not None else DesktopSink())
+            elif name == "file":
+                sinks.append(FileSink(settings.get("file", str(functions.taskymain_path / "reminders.log"))))
+        try:
+            offsets = parse_offsets(settings.get("offsets", DEFAULT_OFFSETS))
+        except ValueError as e:
+            functions.TL.error(f"notify.txt: {e}, using default offsets")
+            offsets = DEFAULT_OFFSETS
+        return cls(sinks, offsets, log=functions.TL)
+
+    @staticmethod
+    def read_settings(path):
+        # optional key=value file, e.g. "offsets=1d,1h,10m" and "sinks=desktop,file"
+        return Functions.read_settings_file(path)
+
+    def sync_tasks(self, tasks):
+        # only tasks whose identity is new get scheduled, vanished ones get cancelled
+        wanted = {Functions.task_identity(task): task for task in tasks}
+        with self.lock:
+            for key in self.scheduled.keys() - wanted.keys():
+                for timer_id in self.scheduled.pop(key):
+                    self.wheel.cancel(timer_id)
+            for key in wanted.keys() - self.scheduled.keys():
+                self.scheduled[key] = self.schedule_task(wanted[key])
+
+    def schedule_task(self, task):
+        ttime, tname, _ = task.split("\t", 2)
+        try:
+            deadline = int(ttime)
+        except ValueError:
+            return []
+
+        now = time.time()
+        timer_ids = []
+        for offset in [o for o in self.offsets if o] + [0]:
+            when = deadline - offset
+            if when > now:
+                timer_ids.append(self.wheel.schedule(when, (tname.strip(), offset)))
+        return timer_ids
+
+    def tick(self, now=None):
+        with self.lock:
+            fired = self.wheel.advance(now)
+        for name, offset in fired:
+            if offset:
+                message = f"'{name}' is due in {describe_offset(offset)}"
+            else:
+                message = f"'{name}' has reached its deadline"
+            if self.TL is not None:
+                self.TL.info(f"reminder: {message}")
+            for sink in self.sinks:
+                try:
+                    sink.send("Tasky", message)
+                except Exception as e:
+                    if self.TL is not None:
+                        self.TL.error(f"notification sink {type(sink).__name__} failed: {e}")
+        return fired
+
+    def run_in_background(self):
+        stop = threading.Event()
+
+        def loop():
+            while not stop.wait(self.wheel.tick):
+                self.tick()
+
+        threading.Thread(target=loop, name="tasky-notifier", daemon=True).start()
+        return stop
+
+
+if __name__ == "__main__":
+    # headless reminder daemon: python -m files.notify_ops
+    backend = Functions()
+    notifier = DeadlineNotifier.from_settings(backend) or DeadlineNotifier([StdoutSink()], log=backend.TL)
+    notifier.sync_tasks(backend.read_and_sort_tasks_file())
+    # stamped after the load, which may itself rewrite the files
+    last_stat = backend.stat_files()
+    print(f"Tasky reminders running for {len(notifier.scheduled)} tasks (Ctrl+C to stop)")
+    ticks = 0
+    try:
+        while True:
+            time.sleep(notifier.wheel.tick)
+            notifier.tick()
+            ticks += 1
+            if ticks % 60 == 0:
+                # a stat() per minute is enough to notice edits made by the other front-ends
+                if backend.stat_files() != last_stat:
+                    notifier.sync_tasks(backend.read_and_sort_tasks_file())
+                    last_stat = backend.stat_files()
+    except KeyboardInterrupt:
+        sys.exit(0)
@@ -0,0 +1,98 @@
+"""
+    Tasky is a task deadline tracker application
+    Copyright (C) 2022-2025  Abhineet Kelley (AbhiK002)
+
+    This file is part of Tasky.
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import datetime
+import re
+
+# canonical rules stored in the "recur" meta column:
+#   daily, weekly, weekdays, every:N (days), monthly:D (D = day of month to aim for)
+EVERY_DAYS_RE = re.compile(r"^(?:every\s*)?(\d+)\s*(?:d|days?)$")
+EVERY_WEEKS_RE = re.compile(r"^(?:every\s*)?(\d+)\s*(?:w|weeks?)$")
+RULE_NAMES = {
+    "daily": "daily", "day": "daily", "every day": "daily",
+    "weekly": "weekly", "week": "weekly", "every week": "weekly",
+    "weekdays": "weekdays", "business days": "weekdays", "workdays": "weekdays", "business": "weekdays",
+    "monthly": "monthly", "month": "monthly", "every month": "monthly",
+}
+
+
+def parse_rule(text, first):
+    # returns the canonical rule, "" for no repetition, None when the text is not a rule
+    text = " ".join(str(text).lower().split())
+    if text in ("", "none", "never", "no", "once"):
+        return ""
+    name = RULE_NAMES.get(text)
+    if name == "monthly":
+        return f"monthly:{first.day}"
+    if name:
+        return name
+    kind, _, arg = text.partition(":")
+    if kind in ("every", "monthly") and arg.isdecimal() and int(arg) > 0:
+        return text
+    for pattern, days in ((EVERY_DAYS_RE, 1), (EVERY_WEEKS_RE, 7)):
+        match = pattern.match(text)
+        if match and int(match.group(1)) > 0:
+            n = int(match.group(1)) * days
+            return {1: "daily", 7: "weekly"}.get(n, f"every:{n}")
+    return None
+
+
+def describe_rule(rule):
+    kind, _, arg = rule.partition(":")
+    if kind == "every":
+        return f"every {arg} days"
+    return kind
+
+
+def add_months(dt, months, day):
+    import calendar
+
+    year, month = divmod(dt.month - 1 + months, 12)
+    year, month = dt.year + year, month + 1
+    return dt.replace(year=year, month=month, day=min(day, calendar.monthrange(year, month)[1]))
+
+
+def occurrences(rule, first, start=None, end=None):
+    # the series' deadlines from the first one at or after start up to end, generated
+    # on demand: fixed steps jump straight to the window instead of walking to it
+    start = first if start is None or start < first else start
+    kind, _, arg = rule.partition(":")
+    if kind in ("daily", "weekly", "every", "weekdays"):
+        step = datetime.timedelta(days={"daily": 1, "weekly": 7, "weekdays": 1}.get(kind) or int(arg))
+        current = first + -((first - start) // step) * step
+        while end is None or current <= end:
+            if kind != "weekdays" or current.weekday() < 5:
+                yield current
+            current += step
+    elif kind == "monthly":
+        day = int(arg)
+        months = max(0, (start.year - first.year) * 12 + start.month - first.month - 1)
+        while True:
+            current = add_months(first, months, day)
+            if end is not None and current > end:
+                return
+            if current >= start:
+                yield current
+            months += 1
+
+
+def next_occurrence(rule, due, after):
+    # first deadline of the series strictly after `after`
+    return next(occurrences(rule, due, after + datetime.timedelta(microseconds=1)), None)
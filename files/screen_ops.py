@@ -0,0 +1,133 @@
+"""
+    Tasky is a task deadline tracker application
+    Copyright (C) 2022-2025  Abhineet Kelley (AbhiK002)
+
+    This file is part of Tasky.
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import os
+import shutil
+import sys
+import threading
+import unicodedata
+
+CURSOR_HOME = "\x1b[H"
+CLEAR_SCREEN = "\x1b[H\x1b[2J\x1b[3J"
+CLEAR_LINE = "\x1b[2K"
+CLEAR_BELOW = "\x1b[J"
+
+
+def display_width(text):
+    # CJK wide and fullwidth characters take two terminal columns
+    return sum(2 if unicodedata.east_asian_width(c) in "WF" else 1 for c in text)
+
+
+class LineCountingStream:
+    # stands in for sys.stdout so the renderer knows how far output has moved
+    # the cursor since the last frame
+    def __init__(self, stream):
+        self.stream = stream
+        self.lines = 0
+
+    def write(self, text):
+        self.lines += text.count("\n")
+        return self.stream.write(text)
+
+    def __getattr__(self, name):
+        return getattr(self.stream, name)
+
+
+class ScreenRenderer:
+    # redraws the console screen with escape sequences in a single write; when the
+    # previous frame is still on screen at the same rows, only changed lines are rewritten
+    def __init__(self):
+        self.previous = None
+        # background output (reminders) and frames never write at the same time
+        self.lock = threading.RLock()
+        self.enabled = self.enable_ansi()
+        self.output = sys.stdout
+        if self.enabled and not isinstance(sys.stdout, LineCountingStream):
+            self.output = sys.stdout = LineCountingStream(sys.stdout)
+
+    @staticmethod
+    def enable_ansi():
+        if os.environ.get("TERM") == "dumb" or not sys.stdout.isatty():
+            return False
+        if os.name != "nt":
+            return True
+        try:
+            import ctypes
+
+            kernel32 = ctypes.windll.kernel32
+            handle = kernel32.GetStdHandle(-11)
+            mode = ctypes.c_uint32()
+            # ENABLE_VIRTUAL_TERMINAL_PROCESSING
+            return bool(kernel32.GetConsoleMode(handle, ctypes.byref(mode))) and \
+                bool(kernel32.SetConsoleMode(handle, mode.value | 0x0004))
+        except (AttributeError, OSError):
+            return False
+
+    def invalidate(self):
+        self.previous = None
+
+    def notice(self, text):
+        # output from another thread lands wherever the cursor is, so the next frame is
+        # drawn from a clear screen instead of diffed against rows that may have moved
+        with self.lock:
+            self.output.write(text)
+            self.output.flush()
+            self.invalidate()
+
+    def note_input(self, prompt):
+        # readline writes the prompt itself, and the user's enter key moves one line down
+        if self.enabled:
+            self.output.lines += prompt.count("\n") + 1
+
+    def fits_in_place(self, lines, size):
+        if self.previous is None:
+            return False
+        # whatever was printed after the last frame must not have scrolled it off the top
+        if len(self.previous) + self.output.lines >= size.lines or len(lines) >= size.lines:
+            return False
+        return all(display_width(line) < size.columns for line in lines)
+
+    def render(self, lines):
+        with self.lock:
+            self.draw(lines)
+
+    def draw(self, lines):
+        if not self.enabled:
+            from .tasky_ops import OSFunctions
+
+            OSFunctions.clear_terminal()
+            print(*lines, sep="\n")
+            return
+
+        size = shutil.get_terminal_size()
+        if self.fits_in_place(lines, size):
+            out = [CURSOR_HOME]
+            for i, line in enumerate(lines):
+                if i < len(self.previous) and self.previous[i] == line:
+                    out.append("\n")
+                else:
+                    out.append(f"{CLEAR_LINE}{line}\n")
+            out.append(CLEAR_BELOW)
+        else:
+            out = [CLEAR_SCREEN, *(f"{line}\n" for line in lines)]
+        self.output.stream.write("".join(out))
+        self.output.stream.flush()
+        self.output.lines = 0
+        self.previous = list(lines)
@@ -0,0 +1,243 @@
+"""
+    Tasky is a task deadline tracker application
+    Copyright (C) 2022-2025  Abhineet Kelley (AbhiK002)
+
+    This file is part of Tasky.
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import bisect
+import gc
+import heapq
+import re
+
+# CJK ideographs, kana and hangul have no spaces between words, they are indexed as
+# single characters plus overlapping bigrams; everything else as lowercased words
+CJK_CHARS = "\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\uf900-\ufaff"
+TOKEN_RE = re.compile(f"([{CJK_CHARS}]+)|([^\\W_{CJK_CHARS}]+)")
+# prefixes up to this length keep their own key sets, they match most of the index
+# and a union over every vocabulary word under them is the slow part of typing
+SHORT_PREFIX = 2
+# a sync changing more documents than this rebuilds the sorted lists and prefix sets
+# once at the end instead of updating them one document at a time
+BULK_SYNC = 32
+# checking a candidate in python costs about this many set entries unioned in C
+CANDIDATE_CHECK_COST = 16
+
+
+def tokenize(text):
+    words, cjk = [], []
+    for cjk_run, word in TOKEN_RE.findall(str(text).lower()):
+        if word:
+            words.append(word)
+        else:
+            cjk.append(cjk_run)
+    return words, cjk
+
+
+def cjk_terms(run):
+    if len(run) == 1:
+        return [run]
+    return [run[i:i + 2] for i in range(len(run) - 1)]
+
+
+class SearchIndex:
+    # inverted index: token -> set of task keys, plus a sorted vocabulary so a
+    # prefix becomes a bisect range instead of a scan over every task
+    def __init__(self):
+        self.postings = {}
+        self.vocabulary = []
+        self.documents = {}
+        self.doc_tokens = {}
+        self.sorted_keys = []
+        self.short_prefixes = {}
+
+    def __len__(self):
+        return len(self.documents)
+
+    def document_tokens(self, text):
+        words, cjk = tokenize(text)
+        tokens = set(words)
+        for run in cjk:
+            tokens.update(run)
+            tokens.update(cjk_terms(run))
+        return tokens
+
+    def add(self, key, name, desc="", category="", bulk=False):
+        document = (name, desc, category)
+        if self.documents.get(key) == document:
+            return
+        self.remove(key, bulk)
+        tokens = self.document_tokens(" ".join(document))
+        self.documents[key] = document
+        self.doc_tokens[key] = tokens
+        if not bulk:
+            bisect.insort(self.sorted_keys, key)
+        for token in tokens:
+            keys = self.postings.get(token)
+            if keys is None:
+                keys = self.postings[token] = set()
+                if not bulk:
+                    bisect.insort(self.vocabulary, token)
+            keys.add(key)
+        if not bulk:
+            for prefix in self.prefixes(tokens):
+                keys = self.short_prefixes.get(prefix)
+                if keys is None:
+                    keys = self.short_prefixes[prefix] = set()
+                keys.add(key)
+
+    @staticmethod
+    def prefixes(tokens):
+        # a token shorter than n just repeats its shorter prefix, the set absorbs it
+        return {token[:n] for n in range(1, SHORT_PREFIX + 1) for token in tokens}
+
+    def remove(self, key, bulk=False):
+        if self.documents.pop(key, None) is None:
+            return
+        if not bulk:
+            del self.sorted_keys[bisect.bisect_left(self.sorted_keys, key)]
+        tokens = self.doc_tokens.pop(key)
+        if not bulk:
+            for prefix in self.prefixes(tokens):
+                keys = self.short_prefixes[prefix]
+                keys.discard(key)
+                if not keys:
+                    del self.short_prefixes[prefix]
+        for token in tokens:
+            keys = self.postings[token]
+            keys.discard(key)
+            if not keys:
+                del self.postings[token]
+                if not bulk:
+                    del self.vocabulary[bisect.bisect_left(self.vocabulary, token)]
+
+    def sync(self, items):
+        # items: {key: (name, desc, category)}, unchanged documents are skipped
+        stale = self.documents.keys() - items.keys()
+        fresh = [key for key, document in items.items() if self.documents.get(key) != document]
+        bulk = len(stale) + len(fresh) > BULK_SYNC
+        if not bulk:
+            for key in stale:
+                self.remove(key)
+            for key in fresh:
+                self.add(key, *items[key])
+            return
+
+        # the index is all sets of strings, nothing a collection pass could free, and the
+        # passes triggered by allocating tens of thousands of them cost more than the build
+        collecting = gc.isenabled()
+        gc.disable()
+        try:
+            for key in stale:
+                self.remove(key, bulk=True)
+            for key in fresh:
+                self.add(key, *items[key], bulk=True)
+            self.sorted_keys = sorted(self.documents)
+            self.vocabulary = sorted(self.postings)
+            self.short_prefixes = {}
+            for token, keys in self.postings.items():
+                for prefix in {token[:n] for n in range(1, SHORT_PREFIX + 1)}:
+                    existing = self.short_prefixes.get(prefix)
+                    if existing is None:
+                        self.short_prefixes[prefix] = set(keys)
+                    else:
+                        existing |= keys
+        finally:
+            if collecting:
+                gc.enable()
+
+    def prefix_range(self, prefix):
+        start = bisect.bisect_left(self.vocabulary, prefix)
+        end = bisect.bisect_left(self.vocabulary, prefix + "\uffff", start)
+        return start, end
+
+    def term_keys(self, is_prefix, term):
+        # every key matching the term; a long prefix is a union over its vocabulary range
+        if not is_prefix:
+            return self.postings.get(term, set())
+        if len(term) <= SHORT_PREFIX:
+            return self.short_prefixes.get(term, set())
+        start, end = self.prefix_range(term)
+        return set().union(*map(self.postings.__getitem__, self.vocabulary[start:end]))
+
+    def term_test(self, is_prefix, term):
+        # key -> bool without building the term's key set, for checking a few candidates
+        if not is_prefix or len(term) <= SHORT_PREFIX:
+            return self.term_keys(is_prefix, term).__contains__
+        start, end = self.prefix_range(term)
+        tokens = set(self.vocabulary[start:end])
+        return lambda key: not tokens.isdisjoint(self.doc_tokens[key])
+
+    def query_terms(self, query):
+        # (matching postings, is_prefix, term): cheapest terms narrow the candidates first
+        words, cjk = tokenize(query)
+        terms = []
+        for word in words:
+            if len(word) <= SHORT_PREFIX:
+                cost = len(self.short_prefixes.get(word, ()))
+            else:
+                start, end = self.prefix_range(word)
+                cost = sum(map(len, map(self.postings.__getitem__, self.vocabulary[start:end])))
+            terms.append((cost, True, word))
+        for run in cjk:
+            for term in cjk_terms(run):
+                terms.append((len(self.postings.get(term, ())), False, term))
+        return sorted(terms)
+
+    def matching(self, query):
+        # unordered set of matching keys, for callers that only filter their own ordering
+        terms = self.query_terms(query)
+        if not terms:
+            return set()
+        cost, is_prefix, term = terms[0]
+        candidates = set(self.term_keys(is_prefix, term))
+        for cost, is_prefix, term in terms[1:]:
+            if not candidates:
+                break
+            if is_prefix and len(term) > SHORT_PREFIX and len(candidates) * CANDIDATE_CHECK_COST < cost:
+                # cheaper to check the remaining candidates than to expand the prefix
+                test = self.term_test(is_prefix, term)
+                candidates = {key for key in candidates if test(key)}
+            else:
+                # a set intersection only walks the smaller side, it is the same check
+                candidates &= self.term_keys(is_prefix, term)
+        return candidates
+
+    def search(self, query, limit=None):
+        terms = self.query_terms(query)
+        if not terms:
+            return []
+
+        if limit is not None and terms[0][0] > len(self.documents) // 8:
+            # every term is common (e.g. a one letter prefix while typing), walking the
+            # keys in deadline order finds the first few hits sooner than any set union
+            tests = [self.term_test(is_prefix, term) for _, is_prefix, term in terms]
+            results = []
+            for key in self.sorted_keys:
+                if all(test(key) for test in tests):
+                    results.append(key)
+                    if len(results) == limit:
+                        break
+            return results
+
+        candidates = self.matching(query)
+        # keys start with the deadline, so sorting them gives deadline order
+        if limit is not None:
+            return heapq.nsmallest(limit, candidates)
+        if len(candidates) > len(self.documents) // 8:
+            # filtering the already sorted keys beats sorting a large share of them again
+            return [key for key in self.sorted_keys if key in candidates]
+        return sorted(candidates)
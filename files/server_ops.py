@@ -0,0 +1,668 @@
+"""
+    Tasky is a task deadline tracker application
+    Copyright (C) 2022-2025  Abhineet Kelley (AbhiK002)
+
+    This file is part of Tasky.
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import asyncio
+import http.client
+import json
+import socket
+from collections import deque
+from urllib.parse import urlsplit, parse_qs
+
+from .deadline_ops import UserStateTracker
+from .index_ops import TaskIndex
+from .recur_ops import parse_rule
+from .tasky_ops import Functions
+from .zone_ops import is_valid_zone
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 47321
+CHANGE_LOG_SIZE = 1000
+MAX_TASKS = 100
+LONG_POLL_TIMEOUT = 25
+LONG_POLL_MAX_TIMEOUT = 60
+FILE_WATCH_INTERVAL = 1.0
+
+HTTP_REASONS = {
+    200: "OK",
+    201: "Created",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    500: "Internal Server Error",
+}
+
+
+class TaskStore(Functions):
+    # keeps the parsed tasks and meta map resident, the files are only
+    # re-read when another process changed them behind our back
+    def __init__(self, workspace=None):
+        super(TaskStore, self).__init__(workspace)
+        self.tasks = []
+        self.meta_map = {}
+        self.file_stamp = None
+        self.revision = 0
+        self.changes = deque(maxlen=CHANGE_LOG_SIZE)
+        self.deadline_queue = UserStateTracker()
+        self.index = TaskIndex()
+        self.positions = None
+        self.load()
+
+    def load(self):
+        reloading = self.file_stamp is not None
+        old_snapshot = self.snapshot()
+        self.tasks = self.read_and_sort_tasks_file()
+        self.meta_map = self.read_meta_map()
+        self.file_stamp = self.stat_files()
+        self.deadline_queue = UserStateTracker.from_tasks(self.tasks, self.priorities())
+        self.positions = None
+        self.index.sync({self.task_identity(task): self.index_record(task) for task in self.tasks})
+        self.TL.info(f"task store loaded {len(self.tasks)} tasks")
+        if reloading:
+            self.record_diff(old_snapshot, self.snapshot())
+
+    def priorities(self):
+        return {key: meta.get("priority", "Medium") for key, meta in self.meta_map.items()}
+
+    def snapshot(self):
+        return {
+            self.task_identity(task): (i, task, dict(self.meta_map.get(self.task_identity(task), {})))
+            for i, task in enumerate(self.tasks)
+        }
+
+    def record_change(self, op, key, task=None, old_key=None):
+        self.revision += 1
+        change = {"revision": self.revision, "op": op, "key": key, "task": task}
+        if old_key is not None:
+            change["old_key"] = old_key
+        self.changes.append(change)
+        return change
+
+    def record_diff(self, old_snapshot, new_snapshot):
+        for key in old_snapshot.keys() - new_snapshot.keys():
+            self.record_change("delete", key)
+        for key, (i, task, meta) in new_snapshot.items():
+            if key not in old_snapshot:
+                self.record_change("add", key, self.task_details(i + 1, task, self.meta_map))
+            elif old_snapshot[key][1:] != (task, meta):
+                self.record_change("edit", key, self.task_details(i + 1, task, self.meta_map))
+
+    def changes_since(self, revision):
+        # None means the caller is too far behind the bounded log and has to resync
+        revision = int(revision)
+        if revision >= self.revision:
+            return []
+        if not self.changes or self.changes[0]["revision"] > revision + 1:
+            return None
+        return [c for c in self.changes if c["revision"] > revision]
+
+    def refresh_if_changed(self):
+        if self.stat_files() == self.file_stamp:
+            return False
+        self.TL.info("task files changed on disk, reloading task store")
+        self.load()
+        return True
+
+    def persist(self):
+        self.write_tasks(self.tasks)
+        self.write_meta_map(self.meta_map)
+        self.file_stamp = self.stat_files()
+
+    def index_record(self, task):
+        meta = self.meta_map.get(self.task_identity(task), {})
+        return (
+            task.split("\t", 1)[0],
+            meta.get("category", "General"),
+            meta.get("priority", "Medium"),
+            meta.get("status", "todo"),
+        )
+
+    def normalize(self):
+        self.tasks = self.remove_duplicates(self.strip_tasks(sorted(self.tasks)))[:MAX_TASKS]
+        self.positions = None
+        valid_keys = set(map(self.task_identity, self.tasks))
+        for key in list(self.meta_map.keys()):
+            if key not in valid_keys:
+                del self.meta_map[key]
+        for key in list(self.deadline_queue.deadlines.keys()):
+            if key not in valid_keys:
+                self.deadline_queue.remove(key)
+        for key in list(self.index.records.keys()):
+            if key not in valid_keys:
+                self.index.remove(key)
+
+    def index_of(self, num):
+        # tasks are addressed by list number or by their stable id
+        if not str(num).isdecimal():
+            key = self.ids_to_keys(self.meta_map).get(str(num))
+            if key is None:
+                raise IndexError(f"no task with id {num}")
+            return self.index_of_key(key)
+        index = int(num) - 1
+        if index not in range(len(self.tasks)):
+            raise IndexError(f"task {num} doesn't exist")
+        return index
+
+    def index_of_key(self, key):
+        if self.positions is None:
+            self.positions = {self.task_identity(task): i for i, task in enumerate(self.tasks)}
+        if key not in self.positions:
+            raise IndexError(f"task {key!r} doesn't exist")
+        return self.positions[key]
+
+    def build_task(self, deadline, name, desc, zone=""):
+        tt = self.parse_deadline_input(str(deadline).strip(), zone)
+        if tt is None:
+            raise ValueError(f"invalid deadline: {deadline}")
+        name = str(name).strip().replace("\t", " ")
+        desc = str(desc or "").strip().replace("\t", " ").replace("\n", " ")
+        task = f"{tt}\t{name}\t{desc}"
+        if not self.is_valid_task(task):
+            raise ValueError("invalid task, check name (1-30 chars), description (max 168 chars) and deadline")
+        return task
+
+    def parse_recur(self, recur, task, zone=""):
+        # checked before anything is changed, so a bad rule leaves the store untouched
+        if recur is None:
+            return None
+        rule = parse_rule(recur, self.parse_deadline_to_datetime(task.split("\t", 1)[0], zone))
+        if rule is None:
+            raise ValueError(f"invalid repeat rule: {recur}")
+        return rule
+
+    @staticmethod
+    def parse_zone(zone):
+        if zone is None:
+            return None
+        zone = str(zone).strip()
+        if not is_valid_zone(zone):
+            raise ValueError(f"unknown time zone: {zone}")
+        return zone
+
+    def apply_meta(self, key, category=None, priority=None, source=None, status=None, recur=None, zone=None):
+        if key not in self.meta_map:
+            self.meta_map[key] = self.default_meta()
+        meta = self.meta_map[key]
+        if recur is not None:
+            meta["recur"] = recur
+        if zone is not None:
+            meta["zone"] = zone
+        if category is not None:
+            meta["category"] = category
+        if priority is not None:
+            meta["priority"] = priority.title()
+        if source is not None:
+            meta["source"] = source
+        if status is not None:
+            meta["status"] = status
+        return meta
+
+    def list_tasks(self, category=None, priority=None, status=None, order="time"):
+        if (category, priority, status, order) == (None, None, None, "time"):
+            return [self.task_details(i + 1, task, self.meta_map) for i, task in enumerate(self.tasks)]
+        indexes = map(self.index_of_key, self.index.keys(category, priority, status, order))
+        return [self.task_details(i + 1, self.tasks[i], self.meta_map) for i in indexes]
+
+    def get_task(self, num):
+        index = self.index_of(num)
+        return self.task_details(index + 1, self.tasks[index], self.meta_map)
+
+    def add_task(self, name, deadline, desc="", category=None, priority=None, source="manual", recur=None, zone=None):
+        zone = self.parse_zone(zone)
+        task = self.build_task(deadline, name, desc, zone or "")
+        recur = self.parse_recur(recur, task, zone or "")
+        key = self.task_identity(task)
+        if len(self.tasks) >= MAX_TASKS and key not in self.meta_map:
+            # checked before anything changes, normalize() would otherwise drop the new task
+            raise ValueError(f"task list is full ({MAX_TASKS} tasks), complete or delete a task first")
+        self.tasks.append(task)
+        self.positions = None
+        meta = self.apply_meta(key, category, priority, source, recur=recur, zone=zone)
+        self.deadline_queue.push(key, self.parse_deadline_to_epoch(task.split("\t", 1)[0]), meta["priority"])
+        self.normalize()
+        self.index.add(key, self.index_record(task))
+        self.persist()
+        self.history.record("add", [], [[task, dict(meta)]])
+        self.TL.info(f"task store added task: {task}")
+        added = self.get_task(self.index_of_key(key) + 1)
+        self.record_change("add", key, added)
+        return added
+
+    def edit_task(self, num, name=None, deadline=None, desc=None, category=None, priority=None, status=None, recur=None, zone=None):
+        index = self.index_of(num)
+        old_task = self.tasks[index]
+        ttime, tname, tdesc = old_task.split("\t", 2)
+        zone = self.parse_zone(zone)
+        task_zone = self.meta_map.get(self.task_identity(old_task), {}).get("zone", "") if zone is None else zone
+        task = self.build_task(
+            ttime if deadline is None else deadline,
+            tname if name is None else name,
+            tdesc if desc is None else desc,
+            task_zone,
+        )
+        recur = self.parse_recur(recur, task, task_zone)
+        old_key, key = self.task_identity(old_task), self.task_identity(task)
+        old_meta = self.meta_map.get(old_key)
+        old_meta = dict(old_meta) if old_meta is not None else None
+        if old_key != key and old_key in self.meta_map:
+            self.meta_map[key] = self.meta_map.pop(old_key)
+        self.tasks[index] = task
+        self.positions = None
+        self.index.remove(old_key)
+        self.deadline_queue.remove(old_key)
+        meta = self.apply_meta(key, category, priority, status=status, recur=recur, zone=zone)
+        self.deadline_queue.push(key, self.parse_deadline_to_epoch(task.split("\t", 1)[0]), meta["priority"])
+        self.normalize()
+        self.index.add(key, self.index_record(task))
+        self.persist()
+        self.history.record("edit", [[old_task, old_meta]], [[task, dict(meta)]])
+        self.TL.info(f"task store edited task {num}: {old_task} -> {task}")
+        edited = self.get_task(self.index_of_key(key) + 1)
+        self.record_change("edit", key, edited, old_key if old_key != key else None)
+        return edited
+
+    def delete_task(self, num):
+        index = self.index_of(num)
+        removed = self.get_task(index + 1)
+        task = self.tasks.pop(index)
+        self.positions = None
+        self.index.remove(self.task_identity(task))
+        meta = self.meta_map.pop(self.task_identity(task), None)
+        self.deadline_queue.remove(self.task_identity(task))
+        self.persist()
+        self.history.record("delete", [[task, meta]], [])
+        self.TL.info(f"task store removed task {num}: {task}")
+        self.record_change("delete", self.task_identity(task))
+        return removed
+
+    def complete_task(self, num):
+        # done tasks leave the list straight away, clients see them as a delete
+        index = self.index_of(num)
+        completed = dict(self.get_task(index + 1), status="done")
+        following = self.following_occurrence(self.tasks[index], self.meta_map.get(self.task_identity(self.tasks[index]), {}))
+        if following is not None:
+            # a series stays in the list, moved on to its next deadline
+            task = self.tasks[index]
+            self.archive.append([self.archive_row(task, dict(self.meta_map[self.task_identity(task)], status="done"), "done")])
+            self.edit_task(index + 1, deadline=following.split("\t", 1)[0])
+            self.TL.info(f"task store completed an occurrence of task {num}: {task}")
+            return completed
+        task = self.tasks.pop(index)
+        key = self.task_identity(task)
+        self.positions = None
+        self.index.remove(key)
+        self.deadline_queue.remove(key)
+        meta = self.meta_map.pop(key, None) or self.default_meta()
+        self.archive.append([self.archive_row(task, dict(meta, status="done"), "done")])
+        self.persist()
+        self.history.record("complete", [[task, meta]], [])
+        self.TL.info(f"task store completed task {num}: {task}")
+        self.record_change("delete", key)
+        return completed
+
+    def analyze(self):
+        # running counts, moved forward over any risk band crossings since the last call
+        self.deadline_queue.advance()
+        return self.deadline_queue.state()
+
+    def upcoming(self):
+        next_due = self.deadline_queue.next_due()
+        crossing = self.deadline_queue.next_crossing()
+        return {
+            "next_due": next_due and {"key": next_due[0], "deadline": self.deadline_iso(next_due[1])},
+            "next_crossing": crossing and {
+                "key": crossing[1], "at": self.deadline_iso(int(crossing[0])), "hours_left": crossing[2],
+                "in_seconds": self.deadline_queue.seconds_until_next_crossing(),
+            },
+        }
+
+
+class TaskyServer:
+    def __init__(self, store=None, host=DEFAULT_HOST, port=DEFAULT_PORT, unix_path=None):
+        self.store = store if store is not None else TaskStore()
+        self.TL = self.store.TL
+        self.host = host
+        self.port = port
+        self.unix_path = unix_path
+        self.server = None
+        self.changed = None
+        self.watcher = None
+
+    async def start(self):
+        self.changed = asyncio.Condition()
+        self.watcher = asyncio.ensure_future(self.watch_files())
+        if self.unix_path:
+            self.server = await asyncio.start_unix_server(self.handle_client, path=str(self.unix_path))
+            self.TL.info(f"tasky server listening on unix socket {self.unix_path}")
+        else:
+            self.server = await asyncio.start_server(self.handle_client, self.host, self.port)
+            self.port = self.server.sockets[0].getsockname()[1]
+            self.TL.info(f"tasky server listening on http://{self.host}:{self.port}")
+        return self.server
+
+    async def serve_forever(self):
+        await self.start()
+        async with self.server:
+            await self.server.serve_forever()
+
+    async def watch_files(self):
+        # a single stat() per interval here is what lets every front-end stop polling the files
+        while True:
+            await asyncio.sleep(FILE_WATCH_INTERVAL)
+            try:
+                if self.store.refresh_if_changed():
+                    await self.notify()
+            except Exception as e:
+                self.TL.error(f"server failed to reload task files: {e}")
+
+    async def notify(self):
+        async with self.changed:
+            self.changed.notify_all()
+
+    async def wait_for_revision(self, revision, timeout):
+        async with self.changed:
+            try:
+                await asyncio.wait_for(self.changed.wait_for(lambda: self.store.revision > revision), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    def changes_payload(self, since):
+        changes = self.store.changes_since(since)
+        if changes is None:
+            return {"revision": self.store.revision, "reset": True, "tasks": self.store.list_tasks()}
+        return {"revision": self.store.revision, "reset": False, "changes": changes}
+
+    def run(self):
+        try:
+            asyncio.run(self.serve_forever())
+        except KeyboardInterrupt:
+            self.TL.info("tasky server stopped")
+
+    async def read_request(self, reader):
+        request_line = (await reader.readline()).decode("latin-1").strip()
+        if not request_line:
+            return None
+        method, target, _ = request_line.split(" ", 2)
+
+        headers = {}
+        while True:
+            line = (await reader.readline()).decode("latin-1").strip()
+            if not line:
+                break
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        body = b""
+        length = int(headers.get("content-length", 0) or 0)
+        if length:
+            body = await reader.readexactly(length)
+        return method.upper(), target, headers, body
+
+    async def write_response(self, writer, status, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        head = (
+            f"HTTP/1.1 {status} {HTTP_REASONS.get(status, 'OK')}\r\n"
+            "Content-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            "Connection: close\r\n\r\n"
+        )
+        writer.write(head.encode("latin-1") + body)
+        await writer.drain()
+
+    async def handle_client(self, reader, writer):
+        try:
+            request = await self.read_request(reader)
+            if request is None:
+                return
+            method, target, headers, body = request
+            if method == "GET" and urlsplit(target).path.rstrip("/") == "/events":
+                await self.stream_events(writer, target, headers)
+                return
+            status, payload = await self.dispatch(method, target, body)
+            await self.write_response(writer, status, payload)
+        except (ValueError, asyncio.IncompleteReadError) as e:
+            await self.write_response(writer, 400, {"error": f"malformed request: {e}"})
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def dispatch(self, method, target, body):
+        url = urlsplit(target)
+        parts = [p for p in url.path.split("/") if p]
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        self.TL.info(f"server request: {method} {target}")
+
+        try:
+            payload = json.loads(body.decode("utf-8")) if body else {}
+        except ValueError:
+            return 400, {"error": "request body is not valid JSON"}
+
+        try:
+            if parts == ["changes"] and method == "GET":
+                return 200, await self.long_poll(query)
+            revision = self.store.revision
+            result = self.route(method, parts, query, payload)
+            if self.store.revision != revision:
+                await self.notify()
+            return result
+        except IndexError as e:
+            return 404, {"error": str(e)}
+        except (ValueError, TypeError) as e:
+            return 400, {"error": str(e)}
+        except Exception as e:
+            self.TL.error(f"server failed to handle {method} {target}: {e}")
+            return 500, {"error": str(e)}
+
+    def route(self, method, parts, query, payload):
+        self.store.refresh_if_changed()
+
+        if parts == ["tasks"]:
+            if method == "GET":
+                tasks = self.store.list_tasks(
+                    query.get("category"), query.get("priority"), query.get("status"), query.get("order", "time")
+                )
+                return 200, {"revision": self.store.revision, "tasks": tasks}
+            if method == "POST":
+                return 201, {"task": self.store.add_task(
+                    payload.get("name", ""),
+                    payload.get("deadline", ""),
+                    payload.get("desc", ""),
+                    payload.get("category"),
+                    payload.get("priority"),
+                    payload.get("source", "manual"),
+                    payload.get("recur"),
+                    payload.get("zone"),
+                )}
+            return 405, {"error": f"{method} not allowed on /tasks"}
+
+        if len(parts) == 2 and parts[0] == "tasks":
+            num = parts[1]
+            if method == "GET":
+                return 200, {"task": self.store.get_task(num)}
+            if method in ("PUT", "PATCH") and payload.get("status") == "done":
+                return 200, {"task": self.store.complete_task(num)}
+            if method in ("PUT", "PATCH"):
+                fields = ("name", "deadline", "desc", "category", "priority", "status", "recur", "zone")
+                return 200, {"task": self.store.edit_task(num, **{f: payload.get(f) for f in fields})}
+            if method == "DELETE":
+                return 200, {"task": self.store.delete_task(num)}
+            return 405, {"error": f"{method} not allowed on /tasks/{num}"}
+
+        if parts == ["archive"] and method == "GET":
+            limit = query.get("limit", "50")
+            if not limit.isdecimal():
+                return 400, {"error": "limit must be a number"}
+            return 200, {"tasks": self.store.read_archive(int(limit))}
+
+        if parts == ["analyze"] and method == "GET":
+            return 200, self.store.analyze()
+
+        if parts == ["deadlines"] and method == "GET":
+            return 200, self.store.upcoming()
+
+        return 404, {"error": "no such endpoint"}
+
+    async def long_poll(self, query):
+        since = int(query.get("since", self.store.revision))
+        timeout = min(float(query.get("timeout", LONG_POLL_TIMEOUT)), LONG_POLL_MAX_TIMEOUT)
+        self.store.refresh_if_changed()
+        if self.store.revision <= since and timeout > 0:
+            await self.wait_for_revision(since, timeout)
+        return self.changes_payload(since)
+
+    async def stream_events(self, writer, target, headers):
+        query = {k: v[-1] for k, v in parse_qs(urlsplit(target).query).items()}
+        since = int(headers.get("last-event-id") or query.get("since", self.store.revision))
+        self.TL.info(f"server event stream opened at revision {since}")
+        writer.write((
+            "HTTP/1.1 200 OK\r\n"
+            "Content-Type: text/event-stream; charset=utf-8\r\n"
+            "Cache-Control: no-cache\r\n"
+            "Connection: close\r\n\r\n"
+        ).encode("latin-1"))
+        await writer.drain()
+
+        while True:
+            payload = self.changes_payload(since)
+            if payload["reset"]:
+                events = [("reset", payload["revision"], {"revision": payload["revision"], "tasks": payload["tasks"]})]
+            else:
+                events = [("change", c["revision"], c) for c in payload["changes"]]
+
+            chunk = "".join(
+                f"id: {rev}\nevent: {name}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+                for name, rev, data in events
+            ) or ": keepalive\n\n"
+            writer.write(chunk.encode("utf-8"))
+            await writer.drain()
+
+            since = payload["revision"]
+            await self.wait_for_revision(since, LONG_POLL_TIMEOUT)
+
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, unix_path, timeout=None):
+        super(UnixHTTPConnection, self).__init__("localhost", timeout=timeout)
+        self.unix_path = str(unix_path)
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.unix_path)
+
+
+class TaskyClient:
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT, unix_path=None, timeout=10):
+        self.host = host
+        self.port = port
+        self.unix_path = unix_path
+        self.timeout = timeout
+
+    def connection(self, timeout=None):
+        timeout = self.timeout if timeout is None else timeout
+        if self.unix_path:
+            return UnixHTTPConnection(self.unix_path, timeout=timeout)
+        return http.client.HTTPConnection(self.host, self.port, timeout=timeout)
+
+    def request(self, method, path, payload=None, timeout=None):
+        conn = self.connection(timeout)
+        try:
+            body = None if payload is None else json.dumps(payload, ensure_ascii=False).encode("utf-8")
+            headers = {"Content-Type": "application/json"} if body is not None else {}
+            conn.request(method, path, body=body, headers=headers)
+            response = conn.getresponse()
+            data = json.loads(response.read().decode("utf-8") or "{}")
+        finally:
+            conn.close()
+        if response.status >= 400:
+            raise RuntimeError(f"{method} {path} failed ({response.status}): {data.get('error')}")
+        return data
+
+    def list_tasks(self):
+        return self.request("GET", "/tasks")["tasks"]
+
+    def snapshot(self):
+        data = self.request("GET", "/tasks")
+        return data["revision"], {task_key(t): t for t in data["tasks"]}
+
+    def get_task(self, num):
+        return self.request("GET", f"/tasks/{num}")["task"]
+
+    def add_task(self, name, deadline, desc="", category=None, priority=None, recur=None, zone=None):
+        payload = {
+            "name": name, "deadline": deadline, "desc": desc, "category": category, "priority": priority,
+            "recur": recur, "zone": zone,
+        }
+        return self.request("POST", "/tasks", payload)["task"]
+
+    def edit_task(self, num, **fields):
+        return self.request("PUT", f"/tasks/{num}", fields)["task"]
+
+    def delete_task(self, num):
+        return self.request("DELETE", f"/tasks/{num}")["task"]
+
+    def complete_task(self, num):
+        return self.request("PATCH", f"/tasks/{num}", {"status": "done"})["task"]
+
+    def archive(self, limit=50):
+        return self.request("GET", f"/archive?limit={limit}")["tasks"]
+
+    def analyze(self):
+        return self.request("GET", "/analyze")
+
+    def changes(self, since, timeout=LONG_POLL_TIMEOUT):
+        return self.request("GET", f"/changes?since={int(since)}&timeout={timeout}", timeout=timeout + self.timeout)
+
+    def events(self, since):
+        conn = self.connection(timeout=LONG_POLL_TIMEOUT + self.timeout)
+        try:
+            conn.request("GET", f"/events?since={int(since)}")
+            response = conn.getresponse()
+            event, data = None, []
+            for raw in response:
+                line = raw.decode("utf-8").rstrip("\r\n")
+                if not line:
+                    if event and data:
+                        yield event, json.loads("\n".join(data))
+                    event, data = None, []
+                elif line.startswith("event:"):
+                    event = line[6:].strip()
+                elif line.startswith("data:"):
+                    data.append(line[5:].strip())
+        finally:
+            conn.close()
+
+    @staticmethod
+    def apply_changes(tasks_by_key, payload):
+        if payload.get("reset"):
+            tasks_by_key.clear()
+            tasks_by_key.update({task_key(t): t for t in payload["tasks"]})
+            return payload["revision"]
+        for change in payload.get("changes", []):
+            tasks_by_key.pop(change.get("old_key"), None)
+            if change["op"] == "delete":
+                tasks_by_key.pop(change["key"], None)
+            else:
+                tasks_by_key[change["key"]] = change["task"]
+        return payload["revision"]
+
+
+def task_key(task_data):
+    return f"{task_data['ttime']}\t{task_data['name'].strip()}"
@@ -0,0 +1,267 @@
+"""
+    Tasky is a task deadline tracker application
+    Copyright (C) 2022-2025  Abhineet Kelley (AbhiK002)
+
+    This file is part of Tasky.
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import hashlib
+import json
+import sys
+import time
+from pathlib import Path
+
+from .tasky_ops import Functions
+
+DEFAULT_SYNC_INTERVAL = 60
+STATE_FILE = "sync_state.json"
+
+
+class HybridClock:
+    # hybrid logical clock: wall milliseconds plus a counter, so stamps keep
+    # increasing across replicas even when their clocks disagree a little
+    def __init__(self, last=(0, 0)):
+        self.last = tuple(last)
+
+    def now(self):
+        ms = int(time.time() * 1000)
+        wall, counter = self.last
+        self.last = (ms, 0) if ms > wall else (wall, counter + 1)
+        return list(self.last)
+
+    def observe(self, remote):
+        ms = int(time.time() * 1000)
+        (wall, counter), (rwall, rcounter) = self.last, remote
+        top = max(ms, wall, rwall)
+        if top == wall == rwall:
+            counter = max(counter, rcounter) + 1
+        elif top == wall:
+            counter += 1
+        elif top == rwall:
+            counter = rcounter + 1
+        else:
+            counter = 0
+        self.last = (top, counter)
+
+
+def read_sync_settings(functions):
+    # ~/Tasky/sync.txt: dir=<shared folder>, interval=<seconds>; no dir means sync is off
+    settings = functions.read_settings_file(functions.taskymain_path / "sync.txt")
+    if not settings.get("dir"):
+        return None
+    try:
+        interval = max(5.0, float(settings.get("interval", DEFAULT_SYNC_INTERVAL)))
+    except ValueError:
+        interval = DEFAULT_SYNC_INTERVAL
+    return settings["dir"], interval
+
+
+class SyncEngine:
+    # two-way sync through a shared directory: every replica appends the tasks it
+    # changed (or deleted, as tombstones) to its own <replica>.log there and reads
+    # the other logs from where it stopped last time; the newest stamp wins per task id
+    def __init__(self, functions, directory):
+        self.functions = functions
+        self.TL = functions.TL
+        self.folder = Path(directory).expanduser() / functions.workspace
+        self.state_path = functions.store_path / STATE_FILE
+        self.state = self.load_state()
+        self.clock = HybridClock(self.state["clock"])
+
+    @classmethod
+    def from_settings(cls, functions):
+        settings = read_sync_settings(functions)
+        if settings is None:
+            return None
+        engine = cls(functions, settings[0])
+        engine.interval = settings[1]
+        return engine
+
+    def load_state(self):
+        try:
+            with open(self.state_path, encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            state = {}
+        state.setdefault("replica", self.functions.new_task_id())
+        state.setdefault("clock", [0, 0])
+        # task id -> [wall, counter, replica, digest]; digest None marks a tombstone
+        state.setdefault("versions", {})
+        # replica -> bytes of its log already applied
+        state.setdefault("offsets", {})
+        # id -> id it was merged into, when the same task was created on two replicas
+        state.setdefault("superseded", {})
+        return state
+
+    def save_state(self):
+        self.state["clock"] = list(self.clock.last)
+        tmp = self.state_path.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.state, f, separators=(",", ":"))
+        tmp.replace(self.state_path)
+
+    def digest(self, task, meta):
+        row = "\t".join([task] + [str(meta.get(f, "")) for f in self.functions.META_FIELDS])
+        return hashlib.blake2b(row.encode("utf-8"), digest_size=8).hexdigest()
+
+    def local_changes(self, tasks, meta_map):
+        # entries for every task whose line or meta changed since the last sync, plus tombstones
+        versions = self.state["versions"]
+        entries, present = [], set()
+        for task in tasks:
+            meta = meta_map.get(self.functions.task_identity(task))
+            if not meta or not meta.get("id"):
+                continue
+            tid = meta["id"]
+            present.add(tid)
+            digest = self.digest(task, meta)
+            version = versions.get(tid)
+            if version is None or version[3] != digest:
+                entries.append({"id": tid, "task": task, "meta": {f: meta.get(f, "") for f in self.functions.META_FIELDS}})
+        for tid, version in versions.items():
+            if version[3] is not None and tid not in present:
+                entries.append({"id": tid, "task": None})
+        for entry in entries:
+            entry["stamp"] = self.clock.now()
+            entry["replica"] = self.state["replica"]
+            digest = None if entry["task"] is None else self.digest(entry["task"], entry["meta"])
+            versions[entry["id"]] = entry["stamp"] + [entry["replica"], digest]
+        return entries
+
+    def push(self, entries):
+        if not entries:
+            return
+        self.folder.mkdir(parents=True, exist_ok=True)
+        data = "".join(json.dumps(e, ensure_ascii=False, separators=(",", ":")) + "\n" for e in entries)
+        with open(self.folder / f"{self.state['replica']}.log", "a", encoding="utf-8") as f:
+            f.write(data)
+
+    def pull(self):
+        # new entries of the other replicas, only complete lines past the stored offsets
+        entries = []
+        if not self.folder.is_dir():
+            return entries
+        offsets = self.state["offsets"]
+        for log in sorted(self.folder.glob("*.log")):
+            replica = log.stem
+            if replica == self.state["replica"]:
+                continue
+            with open(log, "rb") as f:
+                f.seek(offsets.get(replica, 0))
+                data = f.read()
+            end = data.rfind(b"\n") + 1
+            for line in data[:end].splitlines():
+                try:
+                    entries.append(json.loads(line))
+                except ValueError:
+                    self.TL.error(f"sync: skipped a broken line in {log}")
+            offsets[replica] = offsets.get(replica, 0) + end
+        return entries
+
+    def apply(self, entries, tasks, meta_map):
+        # last writer wins on (wall, counter, replica); returns True if the local store changed
+        versions = self.state["versions"]
+        superseded = self.state["superseded"]
+        identity = self.functions.task_identity
+        keys_by_id = self.functions.ids_to_keys(meta_map)
+        tasks_by_key = {identity(task): task for task in tasks}
+        changed = False
+        for entry in entries:
+            self.clock.observe(entry["stamp"])
+            tid = entry["id"]
+            if tid in superseded:
+                if entry["task"] is None:
+                    # the other replica dropping its copy of a merged twin, not a delete
+                    continue
+                tid = superseded[tid]
+            stamp = entry["stamp"] + [entry["replica"]]
+            version = versions.get(tid)
+            if version is not None and version[:3] >= stamp:
+                continue
+
+            if entry["task"] is not None:
+                twin_id = meta_map.get(identity(entry["task"]), {}).get("id")
+                if twin_id is not None and twin_id != tid:
+                    # the same task created on two replicas: the larger id wins on both, the
+                    # other one is forgotten rather than tombstoned
+                    loser, winner = sorted((tid, twin_id))
+                    superseded[loser] = winner
+                    versions.pop(loser, None)
+                    if winner == twin_id:
+                        continue
+                    keys_by_id.pop(twin_id, None)
+
+            digest = None if entry["task"] is None else self.digest(entry["task"], entry["meta"])
+            versions[tid] = stamp + [digest]
+
+            old_key = keys_by_id.pop(tid, None)
+            if old_key is not None:
+                tasks_by_key.pop(old_key, None)
+                meta_map.pop(old_key, None)
+                changed = True
+            if entry["task"] is None:
+                continue
+            key = identity(entry["task"])
+            tasks_by_key[key] = entry["task"]
+            meta_map[key] = dict(self.functions.META_DEFAULTS, **entry["meta"], id=tid)
+            keys_by_id[tid] = key
+            changed = True
+        return sorted(tasks_by_key.values()), changed
+
+    def sync(self):
+        # returns (sent, received) counts; the task files are only written when a remote change applied
+        functions = self.functions
+        tasks = functions.read_and_sort_tasks_file()
+        meta_map = functions.read_meta_map()
+        sent = self.local_changes(tasks, meta_map)
+        self.push(sent)
+        received = self.pull()
+        tasks, changed = self.apply(received, tasks, meta_map)
+        if changed:
+            functions.write_tasks(tasks)
+            functions.write_meta_map(meta_map)
+        self.save_state()
+        self.TL.info(f"sync with {self.folder}: sent {len(sent)}, received {len(received)} changes")
+        return len(sent), len(received)
+
+
+if __name__ == "__main__":
+    # python -m files.sync_ops [DIR] [--workspace NAME] [--watch]
+    import argparse
+
+    parser = argparse.ArgumentParser(prog="python -m files.sync_ops", description="sync a Tasky workspace through a shared folder")
+    parser.add_argument("dir", nargs="?", help="shared folder (default: dir= in ~/Tasky/sync.txt)")
+    parser.add_argument("--workspace", type=str.lower, help="workspace to sync instead of the default one")
+    parser.add_argument("--watch", action="store_true", help="keep syncing every interval seconds")
+    args = parser.parse_args()
+
+    backend = Functions(args.workspace)
+    if args.dir:
+        engine = SyncEngine(backend, args.dir)
+        engine.interval = DEFAULT_SYNC_INTERVAL
+    else:
+        engine = SyncEngine.from_settings(backend)
+    if engine is None:
+        sys.exit("no sync folder: pass one or set dir= in ~/Tasky/sync.txt")
+    try:
+        while True:
+            sent, received = engine.sync()
+            print(f"synced {backend.workspace} with {engine.folder}: sent {sent}, received {received}")
+            if not args.watch:
+                break
+            time.sleep(engine.interval)
+    except KeyboardInterrupt:
+        sys.exit(0)
@@ -19,12 +19,23 @@
 """
 
 from pathlib import Path
+from collections import deque
+import functools
 import os
 import sys
-import subprocess
+import time
 import datetime
-import csv
+from .archive_ops import ArchiveStore, DEFAULT_RETENTION_DAYS
+from .backup_ops import DEFAULT_BACKUP_INTERVAL, DEFAULT_KEEP_DAILY, DEFAULT_KEEP_LAST, SnapshotStore
+from .graph_ops import TaskGraph, parse_depends
+from .history_ops import OperationLog
+from .recur_ops import add_months, next_occurrence
 from .taskylog import TaskyLog
+from .workspace_ops import DEFAULT_WORKSPACE, is_valid_workspace, workspace_path
+from .zone_ops import (
+    LEGACY_DEADLINE_FORMAT, MAX_DEADLINE_YEAR, format_epoch, is_epoch_deadline, is_valid_zone, upgrade_deadline,
+    zone_offsets,
+)
 
 
 class AboutTasky:
@@ -38,6 +49,102 @@ class AboutTasky:
     # ---------------------------------------------------- #
 
 
+class PerfStats:
+    # call counts, total time and latency percentiles per operation; off unless
+    # switched on with 'tasky-debug perf on' or TASKY_PERF=1
+    SAMPLES = 1024
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.stats = {}
+        self.profiler = None
+
+    def record(self, name, seconds):
+        entry = self.stats.get(name)
+        if entry is None:
+            entry = self.stats[name] = [0, 0.0, deque(maxlen=self.SAMPLES)]
+        entry[0] += 1
+        entry[1] += seconds
+        entry[2].append(seconds)
+
+    def reset(self):
+        self.stats.clear()
+
+    def report(self):
+        rows = []
+        for name, (calls, total, samples) in self.stats.items():
+            # percentiles cover the most recent SAMPLES calls
+            ordered = sorted(samples)
+            row = {"name": name, "calls": calls, "total": total, "mean": total / calls, "max": ordered[-1]}
+            for p in (50, 90, 99):
+                row[f"p{p}"] = ordered[min(len(ordered) - 1, p * len(ordered) // 100)]
+            rows.append(row)
+        return sorted(rows, key=lambda row: row["total"], reverse=True)
+
+    def format_report(self):
+        lines = [f"{'operation':<28}{'calls':>7}{'total ms':>11}{'mean':>9}{'p50':>9}{'p90':>9}{'p99':>9}"]
+        for row in self.report():
+            lines.append(
+                f"{row['name'][:27]:<28}{row['calls']:>7}{row['total'] * 1000:>11.1f}"
+                + "".join(f"{row[k] * 1000:>9.2f}" for k in ("mean", "p50", "p90", "p99"))
+            )
+        return "\n".join(lines)
+
+    def start_profile(self):
+        import cProfile
+
+        if self.profiler is None:
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+
+    def stop_profile(self, path):
+        # dumps pstats for everything that ran since start_profile, returns the top entries as text
+        if self.profiler is None:
+            return None
+        self.profiler.disable()
+
+        import io
+        import pstats
+
+        self.profiler.dump_stats(path)
+        out = io.StringIO()
+        pstats.Stats(self.profiler, stream=out).sort_stats("cumulative").print_stats(15)
+        self.profiler = None
+        return out.getvalue()
+
+
+class IOStats:
+    # reads and writes per task file, always on: one dict update per file operation
+    def __init__(self):
+        self.counts = {}
+
+    def record(self, op, path, size):
+        entry = self.counts.get((op, path.name))
+        if entry is None:
+            entry = self.counts[(op, path.name)] = [0, 0]
+        entry[0] += 1
+        entry[1] += size
+
+
+IO_STATS = IOStats()
+PERF = PerfStats(enabled=os.environ.get("TASKY_PERF", "") not in ("", "0"))
+
+
+def timed(name):
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not PERF.enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                PERF.record(name, time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+
 class OSFunctions:
     @staticmethod
     def is_windows_system():
@@ -53,6 +160,9 @@ class OSFunctions:
 
     @staticmethod
     def open_file(path):
+        # subprocess and csv are imported where used, they cost more at startup than the rest of this module
+        import subprocess
+
         if OSFunctions.is_windows_system():
             os.startfile(path)
         elif OSFunctions.is_system_mac():
@@ -89,6 +199,78 @@ class OSFunctions:
             sys.stdout.flush()
 
 
+class EditSession:
+    # stages task list and meta changes in memory; nothing touches the files
+    # until commit(), which writes each file at most once, discard() drops it all
+    def __init__(self, backend, tasks):
+        self.backend = backend
+        self.tasks = list(tasks)
+        self.original_tasks = list(tasks)
+        self.meta_map = None
+        self.original_meta = None
+        self.changed = False
+        self.meta_changed = False
+
+    def meta(self):
+        if self.meta_map is None:
+            self.meta_map = self.backend.read_meta_map()
+            self.original_meta = {key: dict(meta) for key, meta in self.meta_map.items()}
+        return self.meta_map
+
+    def add(self, task, **meta_fields):
+        self.tasks.append(task)
+        self.changed = True
+        if meta_fields:
+            self.update_meta(task, **meta_fields)
+
+    def replace(self, index, task):
+        old_key, key = self.backend.task_identity(self.tasks[index]), self.backend.task_identity(task)
+        self.tasks[index] = task
+        self.changed = True
+        if old_key != key and old_key in self.meta():
+            self.meta_map[key] = self.meta_map.pop(old_key)
+            self.meta_changed = True
+
+    def update_meta(self, task, category=None, priority=None, source=None, status=None, recur=None, zone=None, depends=None):
+        key = self.backend.task_identity(task)
+        existing = self.meta().get(key) or self.backend.default_meta()
+        fields = (
+            ("category", category), ("priority", priority), ("source", source), ("status", status),
+            ("recur", recur), ("zone", zone), ("depends", depends),
+        )
+        for field, value in fields:
+            if value is not None:
+                existing[field] = value.title() if field == "priority" else value
+        self.meta_map[key] = existing
+        self.meta_changed = True
+
+    def commit(self):
+        if not self.changed and not self.meta_changed:
+            return False
+        if self.changed:
+            self.backend.write_tasks(self.tasks)
+        # adds default rows for new tasks and drops stale ones in the same single write
+        meta_map = self.backend.sync_meta_with_tasks(self.tasks, (self.meta(), self.meta_changed))
+        self.record_history(meta_map)
+        self.changed = self.meta_changed = False
+        return True
+
+    def record_history(self, meta_map):
+        # only the rows whose task line or meta changed go into the undo log
+        identity = self.backend.task_identity
+        before = {task: self.original_meta.get(identity(task)) for task in self.original_tasks}
+        after = {task: meta_map.get(identity(task)) for task in self.tasks}
+        removed = [[task, meta] for task, meta in before.items() if task not in after or after[task] != meta]
+        added = [[task, meta] for task, meta in after.items() if task not in before or before[task] != meta]
+        op = "add" if not removed else "edit"
+        self.backend.history.record(op, removed, added)
+
+    def discard(self):
+        self.tasks = []
+        self.meta_map = None
+        self.changed = self.meta_changed = False
+
+
 class Functions:
     PRIORITY_SCORES = {
         "low": 1,
@@ -97,15 +279,40 @@ class Functions:
         "critical": 4,
     }
 
-    def __init__(self):
+    # (hours left, base risk) bands used by calculate_risk_score
+    RISK_BANDS = (
+        (24, 85),
+        (72, 65),
+        (168, 45),
+    )
+    HIGH_RISK_SCORE = 75
+
+    # todo -> done (user action) -> archived (moved out of newtasks.txt into the archive store)
+    STATUSES = ("todo", "done", "archived")
+
+    # columns of tasks_meta.txt after "<task id>\t<deadline>\t<name>"
+    # recur holds a recur_ops rule for repeating tasks, "" for one-shot deadlines
+    # zone is the IANA zone the deadline was set in, "" for the viewer's local zone
+    # depends lists the ids of prerequisite tasks, comma separated
+    META_FIELDS = ("category", "priority", "source", "status", "recur", "zone", "depends")
+    META_DEFAULTS = {
+        "category": "General",
+        "priority": "Medium",
+        "source": "manual",
+        "status": "todo",
+        "recur": "",
+        "zone": "",
+        "depends": "",
+    }
+
+    def __init__(self, workspace=None):
         self.TL = TaskyLog()
         self.TL.info("Tasky's functions accessed")
 
+        # settings and logs are shared, the task store belongs to the active workspace
         self.taskymain_path = Path.home() / "Tasky"
-        self.tasks_path = self.taskymain_path / "newtasks.txt"
-        self.old_tasks_path = self.taskymain_path / 'tasks.txt'
-        self.meta_tasks_path = self.taskymain_path / 'tasks_meta.txt'
-        self.check_tasks_txt()
+        self.retention_days = None
+        self.set_workspace(workspace or DEFAULT_WORKSPACE)
 
         self.old_tasks = []
 
@@ -159,22 +366,52 @@ class Functions:
 
     @staticmethod
     def return_datetime_now_parts():
-        return datetime.datetime.now().strftime("%y %m %d %H %M").split()
+        return datetime.datetime.now().strftime("%Y %m %d %H %M").split()
+
+    def set_workspace(self, name):
+        if not is_valid_workspace(name):
+            raise ValueError(f"invalid workspace name: {name}")
+        self.workspace = name
+        self.store_path = workspace_path(self.taskymain_path, name)
+        self.tasks_path = self.store_path / "newtasks.txt"
+        self.old_tasks_path = self.store_path / 'tasks.txt'
+        self.meta_tasks_path = self.store_path / 'tasks_meta.txt'
+        self.archive = ArchiveStore(self.store_path / 'archive.tsv.gz')
+        self.history = OperationLog(self.store_path / 'history.txt')
+        self.backups = SnapshotStore(self.store_path / 'backups')
+        self.backup_stamp = None
+        self.task_graph = TaskGraph()
+        self.check_tasks_txt()
+        self.TL.info(f"workspace: {name} ({self.store_path})")
 
     def check_tasks_txt(self):
-        self.taskymain_path.mkdir(parents=True, exist_ok=True)
+        self.store_path.mkdir(parents=True, exist_ok=True)
         open(self.tasks_path, "a", encoding="utf-8").close()
         open(self.old_tasks_path, "a", encoding="utf-8").close()
         open(self.meta_tasks_path, "a", encoding="utf-8").close()
 
+    def stat_files(self):
+        # (mtime, size) of both task files, cheap enough to check before every read
+        stamps = []
+        for path in (self.tasks_path, self.meta_tasks_path):
+            try:
+                st = path.stat()
+                stamps.append((st.st_mtime_ns, st.st_size))
+            except OSError:
+                stamps.append(None)
+        return tuple(stamps)
+
     def _read_text_compatible(self, path):
         for enc in ("utf-8", "utf-8-sig", "gbk", "cp1252", "latin-1"):
             try:
                 with open(path, "r", encoding=enc) as f:
-                    return f.read()
+                    text = f.read()
+                    IO_STATS.record("read", path, os.fstat(f.fileno()).st_size)
+                    return text
             except UnicodeDecodeError:
                 continue
         with open(path, "r", encoding="utf-8", errors="replace") as f:
+            IO_STATS.record("read", path, os.fstat(f.fileno()).st_size)
             return f.read()
 
     def read_tasks_file(self):
@@ -189,44 +426,38 @@ class Functions:
     def is_leap(year):
         return int(year) % 4 == 0 and (int(year) % 100 != 0 or int(year) % 400 == 0)
 
-    def timediff(self, tt, diff_of: list = False, tasky_output=True):
+    @staticmethod
+    def calendar_diff(start, end):
+        # years and months on the viewer's wall clock, the rest in real elapsed time,
+        # so a DST change in between never shifts a countdown by an hour
+        local = zone_offsets()
+        start_wall, end_wall = local.to_local(start), local.to_local(end)
+        months = (end_wall.year - start_wall.year) * 12 + end_wall.month - start_wall.month
+        anchor = add_months(start_wall, months, start_wall.day)
+        if anchor > end_wall:
+            months -= 1
+            anchor = add_months(start_wall, months, start_wall.day)
+        minutes = max(0, end - local.from_local(anchor)) // 60
+        days, minutes = divmod(minutes, 1440)
+        return [months // 12, months % 12, days, minutes // 60, minutes % 60]
+
+    @timed("timediff")
+    def timediff(self, tt, now=None, tasky_output=True):
         self.TL.function(f"timediff({tt})")
 
-        if not diff_of:
-            tny, tnm, tnd, tnh, tnmin = self.return_datetime_now_parts()
-        else:
-            tny, tnm, tnd, tnh, tnmin = diff_of
-
-        tty, ttm, ttd, tth, ttmin = tt.split(":")
-
-        diffy = int(tty) - int(tny)
-        diffm = int(ttm) - int(tnm)
-        diffd = int(ttd) - int(tnd)
-        diffh = int(tth) - int(tnh)
-        diffmin = int(ttmin) - int(tnmin)
-
-        if diffmin < 0:
-            diffmin += 60
-            diffh -= 1
+        now = int(time.time() if now is None else now)
+        now -= now % 60
+        target = int(tt)
 
-        if diffh < 0:
-            diffh += 24
-            diffd -= 1
-
-        if diffd < 0:
-            diffd += self.months.get(tnm)
-            if int(tnm) == 2 and not self.is_leap(tny):
-                diffd -= 1
-            diffm -= 1
-
-        if diffm < 0:
-            diffm += 12
-            diffy -= 1
+        if target < now:
+            diffy, diffm, diffd, diffh, diffmin = (-part for part in self.calendar_diff(target, now))
+        else:
+            diffy, diffm, diffd, diffh, diffmin = self.calendar_diff(now, target)
 
         if not tasky_output:
             return [diffy, diffm, diffd, diffh, diffmin]
 
-        if diffy < 0:
+        if target < now:
             output = "Task Expired".rjust(19)
         else:
             output = (
@@ -244,6 +475,10 @@ class Functions:
         return output
 
     def clear_tasks(self):
+        self.check_tasks_txt()
+        tasks = list(filter(self.is_valid_task, map(self.upgrade_task, self._read_text_compatible(self.tasks_path).split('\n'))))
+        meta_map = self.read_meta_map()
+        self.history.record("clear", [[task, meta_map.get(self.task_identity(task))] for task in tasks], [])
         open(self.tasks_path, 'w', encoding="utf-8").close()
         open(self.meta_tasks_path, 'w', encoding="utf-8").close()
         self.TL.function("all current tasks cleared")
@@ -261,8 +496,7 @@ class Functions:
                 not all((ttime, tname.strip())),
                 not 1 <= len(tname.strip()) <= 30,
                 len(tdesc.strip()) > 168,
-                len(ttime) != 14,
-                not str(self.current_year)[-2:] <= ttime[:2] <= '99',
+                not is_epoch_deadline(ttime),
             )
         except IndexError:
             self.TL.error("GIVEN TASK STRING IS INVALID (index error)")
@@ -272,78 +506,193 @@ class Functions:
             self.TL.error("GIVEN TASK STRING IS INVALID (any cond1)")
             return False
 
-        try:
-            datetime.datetime.strptime(ttime, "%y:%m:%d:%H:%M")
-        except ValueError:
-            self.TL.error("GIVEN TASK STRING IS INVALID (date conversion)")
-            return False
-
         return True
 
+    @staticmethod
+    def upgrade_task(task):
+        ttime, sep, rest = task.partition("\t")
+        return f"{upgrade_deadline(ttime)}{sep}{rest}"
+
+    def edit_session(self, tasks):
+        return EditSession(self, tasks)
+
     @staticmethod
     def task_identity(task):
         ttime, tname, _ = task.split("\t", 2)
         return f"{ttime}\t{tname.strip()}"
 
-    def parse_deadline_to_datetime(self, tt):
-        return datetime.datetime.strptime(tt, "%y:%m:%d:%H:%M")
+    @staticmethod
+    def parse_deadline_to_epoch(tt):
+        # deadlines are stored as UTC epoch seconds, compare these rather than wall-clock times
+        return int(tt)
 
-    def read_meta_map(self):
-        self.check_tasks_txt()
-        meta_map = {}
-        for raw in self._read_text_compatible(self.meta_tasks_path).splitlines():
+    @staticmethod
+    def parse_deadline_to_datetime(tt, zone=""):
+        # naive wall-clock time of the deadline in `zone`, the viewer's local zone by default
+        return zone_offsets(zone).to_local(int(tt))
+
+    @staticmethod
+    def deadline_from_datetime(dt, zone=""):
+        return format_epoch(zone_offsets(zone).from_local(dt))
+
+    @staticmethod
+    def deadline_iso(tt, zone=""):
+        offsets = zone_offsets(zone)
+        offset = datetime.timezone(datetime.timedelta(seconds=offsets.utc_offset(int(tt))))
+        return offsets.to_local(int(tt)).replace(tzinfo=offset).isoformat(timespec="minutes")
+
+    @staticmethod
+    def parse_deadline_input(deadline, zone=""):
+        # wall-clock formats are read in `zone` (local if empty), ISO 8601 with an offset as given
+        deadline = str(deadline).strip()
+        if is_epoch_deadline(deadline):
+            return deadline
+        for fmt in (LEGACY_DEADLINE_FORMAT, "%Y-%m-%d %H:%M", "%Y/%m/%d %H:%M", "%Y-%m-%d", "%Y/%m/%d"):
             try:
-                key, category, priority, source, status = raw.split("\t", 4)
+                parsed = datetime.datetime.strptime(deadline, fmt)
             except ValueError:
                 continue
-            meta_map[key] = {
-                "category": category or "General",
-                "priority": (priority or "Medium").title(),
-                "source": source or "manual",
-                "status": status or "todo",
-            }
-        return meta_map
+            if "%H:%M" not in fmt:
+                parsed = parsed.replace(hour=23, minute=59)
+            return Functions.deadline_from_datetime(parsed, zone)
+        try:
+            parsed = datetime.datetime.fromisoformat(deadline.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+        if parsed.tzinfo is None:
+            return Functions.deadline_from_datetime(parsed, zone)
+        return format_epoch(parsed.timestamp())
+
+    @staticmethod
+    def read_settings_file(path):
+        # key=value lines, '#' starts a comment; a missing file means all defaults
+        settings = {}
+        try:
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    key, sep, value = line.partition("=")
+                    if sep and not key.strip().startswith("#"):
+                        settings[key.strip().lower()] = value.strip()
+        except OSError:
+            pass
+        return settings
+
+    @staticmethod
+    def new_task_id():
+        # same shape as uuid4().hex[:12] (those 48 bits are all random) without importing uuid
+        return os.urandom(6).hex()
 
+    def default_meta(self):
+        meta = dict(self.META_DEFAULTS)
+        meta["id"] = self.new_task_id()
+        return meta
+
+    def parse_meta_text(self, text):
+        meta_map = {}
+        migrated = False
+        for raw in text.splitlines():
+            parts = raw.split("\t")
+            if len(parts) < 3:
+                continue
+            if len(parts[0]) == 14 and parts[0].count(":") == 4:
+                # row from before task ids existed, it starts with the deadline
+                parts.insert(0, self.new_task_id())
+                migrated = True
+            tid, ttime, tname, *values = parts
+            if upgrade_deadline(ttime) != ttime:
+                ttime = upgrade_deadline(ttime)
+                migrated = True
+            meta = dict(self.META_DEFAULTS)
+            for field, value in zip(self.META_FIELDS, values):
+                if value:
+                    meta[field] = value
+            meta["priority"] = meta["priority"].title()
+            if not is_valid_zone(meta["zone"]):
+                # e.g. synced from a machine with a newer tz database
+                meta["zone"] = ""
+            meta["id"] = tid
+            meta_map[f"{ttime}\t{tname}"] = meta
+        return meta_map, migrated
+
+    def read_meta_map(self):
+        self.check_tasks_txt()
+        return self.parse_meta_text(self._read_text_compatible(self.meta_tasks_path))[0]
+
+    @timed("write_meta_map")
     def write_meta_map(self, meta_map):
         rows = []
         for key, meta in sorted(meta_map.items()):
-            rows.append(
-                f"{key}\t{meta.get('category', 'General')}\t{meta.get('priority', 'Medium')}\t"
-                f"{meta.get('source', 'manual')}\t{meta.get('status', 'todo')}"
-            )
+            tid = meta.setdefault("id", self.new_task_id())
+            rows.append("\t".join([tid, key] + [str(meta.get(f, self.META_DEFAULTS[f])) for f in self.META_FIELDS]))
+        data = "\n".join(rows)
         with open(self.meta_tasks_path, "w", encoding="utf-8") as meta_file:
-            meta_file.write("\n".join(rows))
+            meta_file.write(data)
+        IO_STATS.record("write", self.meta_tasks_path, len(data.encode("utf-8")))
 
-    def sync_meta_with_tasks(self, tasks):
-        meta_map = self.read_meta_map()
-        valid_keys = set()
-        for task in tasks:
-            key = self.task_identity(task)
-            valid_keys.add(key)
-            if key not in meta_map:
-                meta_map[key] = {
-                    "category": "General",
-                    "priority": "Medium",
-                    "source": "manual",
-                    "status": "todo",
-                }
+    @staticmethod
+    def ids_to_keys(meta_map):
+        return {meta["id"]: key for key, meta in meta_map.items() if meta.get("id")}
+
+    def sync_meta_with_tasks(self, tasks, parsed_meta=None):
+        # parsed_meta: (meta_map, migrated) from parse_meta_text when the caller already read the file
+        if parsed_meta is None:
+            self.check_tasks_txt()
+            parsed_meta = self.parse_meta_text(self._read_text_compatible(self.meta_tasks_path))
+        meta_map, changed = parsed_meta
+        valid_keys = set(map(self.task_identity, tasks))
+        unmatched = [key for key in valid_keys if key not in meta_map]
+        if unmatched:
+            changed = True
+            self.adopt_orphaned_meta(unmatched, meta_map, valid_keys)
+            for key in unmatched:
+                if key not in meta_map:
+                    meta_map[key] = self.default_meta()
 
         for key in list(meta_map.keys()):
             if key not in valid_keys:
                 del meta_map[key]
+                changed = True
 
-        self.write_meta_map(meta_map)
+        # ids keep meta attached across edits, so an unchanged task list needs no rewrite
+        if changed:
+            self.write_meta_map(meta_map)
         return meta_map
 
-    def update_task_meta(self, task, category=None, priority=None, source=None, status=None):
+    def adopt_orphaned_meta(self, unmatched, meta_map, valid_keys):
+        # the id lives only in the meta file, so a task edited outside the app comes back
+        # under a new deadline+name key. a new key takes over the one orphaned row with
+        # the same name (deadline moved) or else the same deadline (renamed); if both
+        # changed, or the match is ambiguous, the task starts with fresh meta
+        orphans = [key for key in meta_map if key not in valid_keys]
+        for part in (1, 0):
+            by_part = {}
+            for key in orphans:
+                by_part.setdefault(key.split("\t", 1)[part], []).append(key)
+            wanted = {}
+            for key in unmatched:
+                if key not in meta_map:
+                    wanted.setdefault(key.split("\t", 1)[part], []).append(key)
+            for value, keys in wanted.items():
+                candidates = by_part.get(value, [])
+                if len(keys) == 1 and len(candidates) == 1:
+                    meta_map[keys[0]] = meta_map.pop(candidates[0])
+                    orphans.remove(candidates[0])
+                    self.TL.info(f"task {meta_map[keys[0]]['id']} re-keyed: {candidates[0]!r} -> {keys[0]!r}")
+
+    def rename_task_meta(self, old_task, new_task):
+        old_key, new_key = self.task_identity(old_task), self.task_identity(new_task)
+        if old_key == new_key:
+            return
+        meta_map = self.read_meta_map()
+        if old_key in meta_map:
+            meta_map[new_key] = meta_map.pop(old_key)
+            self.write_meta_map(meta_map)
+            self.TL.info(f"task {meta_map[new_key]['id']} re-keyed: {old_key!r} -> {new_key!r}")
+
+    def update_task_meta(self, task, category=None, priority=None, source=None, status=None, recur=None, zone=None, depends=None):
         meta_map = self.read_meta_map()
         key = self.task_identity(task)
-        existing = meta_map.get(key, {
-            "category": "General",
-            "priority": "Medium",
-            "source": "manual",
-            "status": "todo",
-        })
+        existing = meta_map.get(key) or self.default_meta()
         if category is not None:
             existing["category"] = category
         if priority is not None:
@@ -352,11 +701,21 @@ class Functions:
             existing["source"] = source
         if status is not None:
             existing["status"] = status
+        if recur is not None:
+            existing["recur"] = recur
+        if zone is not None:
+            existing["zone"] = zone
+        if depends is not None:
+            existing["depends"] = depends
         meta_map[key] = existing
         self.write_meta_map(meta_map)
 
     def import_tasks_from_csv(self, csv_path):
-        tasks = self.read_and_sort_tasks_file()
+        import csv
+
+        # staged like an edit from the app, so the import is one undoable change
+        session = self.edit_session(self.read_and_sort_tasks_file())
+        positions = {self.task_identity(task): i for i, task in enumerate(session.tasks)}
         imported = 0
         with open(csv_path, newline='', encoding="utf-8-sig") as csv_file:
             reader = csv.DictReader(csv_file)
@@ -370,36 +729,28 @@ class Functions:
                 if not name or not deadline:
                     continue
 
-                parsed = None
-                for fmt in ("%Y-%m-%d %H:%M", "%Y/%m/%d %H:%M", "%Y-%m-%d", "%Y/%m/%d"):
-                    try:
-                        parsed = datetime.datetime.strptime(deadline, fmt)
-                        if " %H:%M" not in fmt:
-                            parsed = parsed.replace(hour=23, minute=59)
-                        break
-                    except ValueError:
-                        continue
-                if parsed is None:
+                tt = self.parse_deadline_input(deadline)
+                if tt is None:
                     continue
 
-                tt = parsed.strftime("%y:%m:%d:%H:%M")
                 task_string = f"{tt}\t{name[:30]}\t{desc[:168]}"
-                if self.is_valid_task(task_string):
-                    tasks.append(task_string)
-                    imported += 1
+                if not self.is_valid_task(task_string):
+                    continue
+                task_string = self.strip_tasks([task_string])[0]
+                key = self.task_identity(task_string)
+                if key in positions:
+                    # a repeated task keeps its meta, a new description still wins as in remove_duplicates
+                    if task_string.split("\t", 2)[2]:
+                        session.replace(positions[key], task_string)
+                        imported += 1
+                    continue
+                if len(session.tasks) >= 100:
+                    continue
+                positions[key] = len(session.tasks)
+                session.add(task_string, category=category, priority=priority, source="import")
+                imported += 1
 
-        tasks = self.remove_duplicates(self.strip_tasks(tasks))[:100]
-        self.write_tasks(tasks)
-        meta_map = self.sync_meta_with_tasks(tasks)
-        for task in tasks:
-            key = self.task_identity(task)
-            if meta_map[key].get("source") == "manual":
-                meta_map[key]["source"] = "import"
-                if meta_map[key].get("category") == "General":
-                    meta_map[key]["category"] = category if 'category' in locals() else "General"
-                if meta_map[key].get("priority") == "Medium":
-                    meta_map[key]["priority"] = priority if 'priority' in locals() else "Medium"
-        self.write_meta_map(meta_map)
+        session.commit()
         return imported
 
     def strip_tasks(self, tlist):
@@ -408,32 +759,189 @@ class Functions:
             tlist[i] = f"{ttime}\t{tname.strip()}\t{tdesc.strip()}"
         return tlist
 
+    @timed("write_tasks")
     def write_tasks(self, last):
+        data = '\n'.join(last)
         with open(self.tasks_path, "w", encoding="utf-8") as taskfile:
-            taskfile.write('\n'.join(last))
+            taskfile.write(data)
+        IO_STATS.record("write", self.tasks_path, len(data.encode("utf-8")))
 
-    def read_and_sort_tasks_file(self):
+    @timed("read_and_sort_tasks_file")
+    def read_and_sort_tasks_file(self, with_meta=False):
+        # with_meta: also return the synced meta map, saving the caller another read
         self.check_tasks_txt()
-        read_data = self._read_text_compatible(self.tasks_path).split('\n')
+        text = self._read_text_compatible(self.tasks_path)
+        read_data = map(self.upgrade_task, text.split('\n'))
         taskslist = sorted(filter(self.is_valid_task, read_data))
 
         if not self.converted():
             self.get_old_tasks()
             taskslist = sorted(set(taskslist) | set(self.old_tasks))
-            check_path = self.taskymain_path / 'old_checked'
+            check_path = self.store_path / 'old_checked'
             check_path.mkdir(parents=True, exist_ok=True)
 
         taskslist = self.remove_duplicates(self.strip_tasks(taskslist))
+        parsed_meta = self.parse_meta_text(self._read_text_compatible(self.meta_tasks_path))
+        taskslist, advanced = self.advance_recurring_tasks(taskslist, parsed_meta[0])
+        parsed_meta = (parsed_meta[0], parsed_meta[1] or advanced)
+        taskslist = self.archive_finished_tasks(taskslist, parsed_meta[0])
 
         if len(taskslist) > 100:
             taskslist = taskslist[:100]
 
-        self.write_tasks(taskslist)
-        self.sync_meta_with_tasks(taskslist)
-        return taskslist
+        # an already normalized file is left alone, so its stat stamp stays valid
+        if '\n'.join(taskslist) != text:
+            self.write_tasks(taskslist)
+        meta_map = self.sync_meta_with_tasks(taskslist, parsed_meta)
+        return (taskslist, meta_map) if with_meta else taskslist
+
+    def next_task_occurrence(self, task, rule, after, zone=""):
+        # the same task moved to the series' next deadline after the epoch `after`; the
+        # series follows the wall clock of its zone, so 09:00 stays 09:00 across DST changes
+        ttime, rest = task.split("\t", 1)
+        offsets = zone_offsets(zone)
+        due = next_occurrence(rule, offsets.to_local(int(ttime)), offsets.to_local(int(after)))
+        if due is None or due.year > MAX_DEADLINE_YEAR:
+            return None
+        return f"{self.deadline_from_datetime(due, zone)}\t{rest}"
+
+    def advance_recurring_tasks(self, tasks, meta_map):
+        # a series keeps one row: once its deadline passed, the row moves to the next occurrence
+        import bisect
+
+        now = int(time.time())
+        passed = bisect.bisect_left(tasks, format_epoch(now))
+        advanced = False
+        for i in range(passed):
+            key = self.task_identity(tasks[i])
+            meta = meta_map.get(key, {})
+            if not meta.get("recur"):
+                continue
+            task = self.next_task_occurrence(tasks[i], meta["recur"], now, meta.get("zone", ""))
+            if task is None:
+                continue
+            meta_map[self.task_identity(task)] = meta_map.pop(key)
+            tasks[i] = task
+            advanced = True
+        if advanced:
+            tasks.sort()
+            self.TL.info("moved passed recurring tasks to their next occurrence")
+        return tasks, advanced
+
+    def archive_row(self, task, meta, outcome):
+        ttime, tname, tdesc = task.split("\t", 2)
+        row = {"ttime": ttime, "name": tname.strip(), "desc": tdesc.strip(), "outcome": outcome}
+        for field in ("id",) + self.META_FIELDS:
+            row[field] = meta.get(field, self.META_DEFAULTS.get(field, ""))
+        return row
+
+    def archive_finished_tasks(self, tasks, meta_map):
+        # tasks are sorted by deadline, so the long-expired ones are a prefix found by bisect
+        import bisect
+
+        if self.retention_days is None:
+            settings = self.read_settings_file(self.taskymain_path / "archive.txt")
+            try:
+                self.retention_days = float(settings.get("retention_days", DEFAULT_RETENTION_DAYS))
+            except ValueError:
+                self.TL.error("archive.txt: retention_days is not a number, using the default")
+                self.retention_days = DEFAULT_RETENTION_DAYS
+        if self.retention_days < 0:
+            return tasks
+
+        cutoff = format_epoch(time.time() - self.retention_days * 86400)
+        expired = bisect.bisect_left(tasks, cutoff)
+        done = [i for i in range(expired, len(tasks)) if meta_map.get(self.task_identity(tasks[i]), {}).get("status") == "done"]
+        if not expired and not done:
+            return tasks
+
+        rows = []
+        for i in list(range(expired)) + done:
+            meta = meta_map.pop(self.task_identity(tasks[i]), None) or self.META_DEFAULTS
+            rows.append(self.archive_row(tasks[i], meta, "done" if meta.get("status") == "done" else "expired"))
+        self.archive.append(rows)
+        self.TL.info(f"archived {len(rows)} tasks ({len(done)} done, {len(rows) - len(done)} expired)")
+        done = set(done)
+        return [task for i, task in enumerate(tasks[expired:], expired) if i not in done]
+
+    def complete_task(self, num, last_copy):
+        # marks task num done and moves it to the archive straight away
+        try:
+            task = last_copy.pop(int(num) - 1)
+        except IndexError:
+            return None
+
+        meta_map = self.read_meta_map()
+        meta = meta_map.pop(self.task_identity(task), None) or self.default_meta()
+        self.archive.append([self.archive_row(task, dict(meta, status="done"), "done")])
+        following = self.following_occurrence(task, meta)
+        if following is not None:
+            last_copy.append(following)
+            last_copy.sort()
+            meta_map[self.task_identity(following)] = meta
+        self.write_tasks(last_copy)
+        self.write_meta_map(meta_map)
+        # undo brings the task back to the list, its archive row stays
+        self.history.record("complete", [[task, meta]], [[following, meta]] if following is not None else [])
+        self.TL.info(f"task completed and archived: {task}")
+        return task
+
+    def following_occurrence(self, task, meta):
+        # a finished occurrence of a series is replaced by the next one, even if it was done early
+        if not meta.get("recur"):
+            return None
+        due = int(task.split("\t", 1)[0])
+        return self.next_task_occurrence(task, meta["recur"], max(due, int(time.time())), meta.get("zone", ""))
+
+    def read_archive(self, limit=None):
+        return self.archive.read(limit)
+
+    def backup_settings(self):
+        # ~/Tasky/backup.txt: interval (minutes), keep (newest snapshots), daily (days with one kept), enabled
+        settings = self.read_settings_file(self.taskymain_path / "backup.txt")
+        result = {"enabled": settings.get("enabled", "yes").lower() not in ("no", "false", "off", "0")}
+        for key, default in (("interval", DEFAULT_BACKUP_INTERVAL), ("keep", DEFAULT_KEEP_LAST), ("daily", DEFAULT_KEEP_DAILY)):
+            try:
+                result[key] = max(0, int(settings.get(key, default)))
+            except ValueError:
+                self.TL.error(f"backup.txt: {key} is not a whole number, using {default}")
+                result[key] = default
+        return result
+
+    def backup_now(self, force=False):
+        # snapshots the store only if the files changed since the last backup;
+        # returns the new snapshot entry or None
+        stamp = self.stat_files()
+        if not force and stamp == self.backup_stamp:
+            return None
+        self.check_tasks_txt()
+        with open(self.tasks_path, "rb") as f:
+            tasks_data = f.read()
+        with open(self.meta_tasks_path, "rb") as f:
+            meta_data = f.read()
+        entry = self.backups.snapshot(tasks_data, meta_data)
+        self.backup_stamp = stamp
+        if entry is not None:
+            settings = self.backup_settings()
+            pruned = self.backups.prune(max(1, settings["keep"]), settings["daily"])
+            self.TL.info(f"backup snapshot taken at {entry[0]}, {pruned} old snapshots pruned")
+        return entry
+
+    def list_backups(self):
+        return self.backups.entries()[::-1]
+
+    def restore_backup(self, entry):
+        # the current state is snapshotted first, so a restore can itself be undone by restoring
+        self.backup_now(force=True)
+        tasks_data, meta_data = self.backups.restore(entry)
+        with open(self.tasks_path, "wb") as f:
+            f.write(tasks_data)
+        with open(self.meta_tasks_path, "wb") as f:
+            f.write(meta_data)
+        self.TL.info(f"restored backup snapshot from {entry[0]}")
 
     def converted(self):
-        check_path = self.taskymain_path / 'old_checked'
+        check_path = self.store_path / 'old_checked'
         return check_path.exists()
 
     def get_old_tasks(self):
@@ -442,7 +950,7 @@ class Functions:
         if not read_data:
             self.old_tasks = []
             return
-        converted_data = list(map(lambda task: '\t'.join(task.split("=", 2) + ['']), read_data))
+        converted_data = list(map(lambda task: self.upgrade_task('\t'.join(task.split("=", 2) + [''])), read_data))
         self.old_tasks = sorted(filter(self.is_valid_task, converted_data))
 
     def remove_duplicates(self, tlist):
@@ -472,84 +980,162 @@ class Functions:
 
         self.write_tasks(last)
         meta_map = self.read_meta_map()
+        self.history.record("delete", [[target, meta_map.get(key)]], [])
         if key in meta_map:
             del meta_map[key]
             self.write_meta_map(meta_map)
 
+    def apply_history(self, remove_rows, add_rows):
+        tasks = self.read_and_sort_tasks_file()
+        meta_map = self.read_meta_map()
+        # rows logged before deadlines became epochs are upgraded like the task files
+        remove_rows = [(self.upgrade_task(task), meta) for task, meta in remove_rows]
+        add_rows = [(self.upgrade_task(task), meta) for task, meta in add_rows]
+        for task, meta in remove_rows:
+            if task in tasks:
+                tasks.remove(task)
+                meta_map.pop(self.task_identity(task), None)
+        for task, meta in add_rows:
+            if task not in tasks:
+                tasks.append(task)
+            meta_map[self.task_identity(task)] = meta or self.default_meta()
+        tasks.sort()
+        self.write_tasks(tasks)
+        self.write_meta_map(meta_map)
+
+    def undo(self):
+        # returns the name of the undone operation, None when there is nothing to undo
+        entry = self.history.undo()
+        if entry is None:
+            return None
+        self.apply_history(entry["added"], entry["removed"])
+        self.TL.info(f"undid {entry['op']}: -{len(entry['added'])} +{len(entry['removed'])} tasks")
+        return entry["op"]
+
+    def redo(self):
+        entry = self.history.redo()
+        if entry is None:
+            return None
+        self.apply_history(entry["removed"], entry["added"])
+        self.TL.info(f"redid {entry['op']}: -{len(entry['removed'])} +{len(entry['added'])} tasks")
+        return entry["op"]
+
+    @timed("calculate_risk_score")
     def calculate_risk_score(self, task_time, priority="Medium"):
         try:
-            deadline = self.parse_deadline_to_datetime(task_time)
+            deadline = int(task_time)
         except ValueError:
             return 0
 
-        now = datetime.datetime.now()
-        remaining_hours = (deadline - now).total_seconds() / 3600
-        priority_weight = self.PRIORITY_SCORES.get(priority.lower(), 2)
+        return self.risk_for_hours((deadline - time.time()) / 3600, priority)
 
+    @classmethod
+    def risk_for_hours(cls, remaining_hours, priority="Medium"):
         if remaining_hours <= 0:
             return 100
-        if remaining_hours <= 24:
-            base = 85
-        elif remaining_hours <= 72:
-            base = 65
-        elif remaining_hours <= 168:
-            base = 45
-        else:
-            base = 25
+        priority_weight = cls.PRIORITY_SCORES.get(priority.lower(), 2)
+        base = 25
+        for band_hours, band_base in cls.RISK_BANDS:
+            if remaining_hours <= band_hours:
+                base = band_base
+                break
 
         return min(100, int(base + priority_weight * 4))
 
-    def return_deadlines_with_meta(self, given_tasks_list=False):
+    def return_deadlines_with_meta(self, given_tasks_list=False, meta_map=None):
+        # meta_map: already synced with the tasks, e.g. from read_and_sort_tasks_file(with_meta=True)
         tasks = given_tasks_list if given_tasks_list else self.read_and_sort_tasks_file()
-        meta_map = self.sync_meta_with_tasks(tasks)
+        meta_map = self.sync_meta_with_tasks(tasks) if meta_map is None else meta_map
         deadlines = []
 
         for i, task in enumerate(tasks):
-            ttime, tname, tdesc = task.split("\t", 2)
-            key = self.task_identity(task)
-            meta = meta_map.get(key, {
-                "category": "General",
-                "priority": "Medium",
-                "source": "manual",
-                "status": "todo",
-            })
-            deadline = self.timediff(ttime)
-            risk = self.calculate_risk_score(ttime, meta.get("priority", "Medium"))
-
-            deadlines.append({
-                "num": str(i + 1),
-                "deadline_text": deadline,
-                "name": tname,
-                "desc": tdesc,
-                "ttime": ttime,
-                "category": meta.get("category", "General"),
-                "priority": meta.get("priority", "Medium"),
-                "source": meta.get("source", "manual"),
-                "status": meta.get("status", "todo"),
-                "risk": risk,
-            })
-
-        return deadlines
+            deadlines.append(self.task_details(i + 1, task, meta_map))
+
+        return self.apply_task_graph(deadlines)
+
+    def apply_task_graph(self, details, graph=None):
+        # adds blocked state, inherited urgency and critical path to task_details dicts;
+        # the graph only recomputes tasks whose deadline, risk or prerequisites changed
+        graph = self.task_graph if graph is None else graph
+        graph.sync({d["id"]: (int(d["ttime"]), d["risk"], tuple(d["depends"])) for d in details if d["id"]})
+        nums = {d["id"]: d["num"] for d in details}
+        for d in details:
+            tid = d["id"]
+            if tid not in graph.nodes:
+                continue
+            d["blocked_by"] = sorted((nums[p] for p in graph.prerequisites(tid)), key=int)
+            d["blocks"] = sorted((nums[p] for p in graph.blocks(tid)), key=int)
+            d["blocked"] = bool(d["blocked_by"])
+            d["urgency"] = graph.urgency[tid]
+            d["due_by"] = format_epoch(graph.due_by[tid])
+            d["critical_path"] = [nums[p] for p in graph.critical_path(tid)]
+            d["order"] = graph.rank[tid]
+        return details
+
+    def dependency_error(self, task, prerequisites, meta_map):
+        # None when task may depend on the given tasks, otherwise the reason it can't
+        tid = meta_map.get(self.task_identity(task), {}).get("id")
+        ids = [meta_map.get(self.task_identity(p), {}).get("id") for p in prerequisites]
+        if tid is None or None in ids:
+            return "unknown task"
+        graph = TaskGraph()
+        graph.sync({
+            meta["id"]: (0, 0, parse_depends(meta.get("depends", ""))) for meta in meta_map.values() if meta.get("id")
+        })
+        if graph.creates_cycle(tid, ids):
+            return "a task can't (even indirectly) depend on itself"
+        return None
+
+    def task_details(self, num, task, meta_map):
+        ttime, tname, tdesc = task.split("\t", 2)
+        key = self.task_identity(task)
+        meta = meta_map.get(key, self.META_DEFAULTS)
+        deadline = self.timediff(ttime)
+        risk = self.calculate_risk_score(ttime, meta.get("priority", "Medium"))
+
+        return {
+            "num": str(num),
+            "id": meta.get("id", ""),
+            "deadline_text": deadline,
+            "name": tname,
+            "desc": tdesc,
+            "ttime": ttime,
+            "category": meta.get("category", "General"),
+            "priority": meta.get("priority", "Medium"),
+            "source": meta.get("source", "manual"),
+            "status": meta.get("status", "todo"),
+            "recur": meta.get("recur", ""),
+            "zone": meta.get("zone", ""),
+            "due": self.deadline_iso(ttime, meta.get("zone", "")),
+            "depends": list(parse_depends(meta.get("depends", ""))),
+            "risk": risk,
+        }
 
     def return_deadlines(self, given_tasks_list=False):
         data = self.return_deadlines_with_meta(given_tasks_list)
         return [(d["num"], d["deadline_text"], d["name"], d["desc"]) for d in data]
 
-    def analyze_user_state(self):
-        tasks = self.return_deadlines_with_meta()
-        if not tasks:
+    @timed("analyze_user_state")
+    def analyze_user_state(self, tasks):
+        # tasks: task_details dicts the caller already has; kept state lives in UserStateTracker
+        overdue = sum(t["deadline_text"].strip() == "Task Expired" for t in tasks)
+        high_risk = sum(t["risk"] >= self.HIGH_RISK_SCORE for t in tasks)
+        return self.summarize_user_state(len(tasks), overdue, high_risk)
+
+    @staticmethod
+    def summarize_user_state(total, overdue, high_risk):
+        # O(1) from the counts, so running aggregates (deadline_ops.UserStateTracker) can reuse it
+        if not total:
             return {
                 "focus_score": 100,
                 "overdue_ratio": 0.0,
+                "overdue_count": 0,
                 "high_risk_count": 0,
                 "nudge": "今天没有待办，保持节奏即可。",
             }
 
-        overdue = [t for t in tasks if t["deadline_text"].strip() == "Task Expired"]
-        high_risk = [t for t in tasks if t["risk"] >= 75]
-
-        overdue_ratio = len(overdue) / len(tasks)
-        risk_ratio = len(high_risk) / len(tasks)
+        overdue_ratio = overdue / total
+        risk_ratio = high_risk / total
         focus_score = max(0, int(100 - overdue_ratio * 50 - risk_ratio * 35))
 
         if overdue_ratio > 0.35:
@@ -562,6 +1148,7 @@ class Functions:
         return {
             "focus_score": focus_score,
             "overdue_ratio": round(overdue_ratio, 2),
-            "high_risk_count": len(high_risk),
+            "overdue_count": overdue,
+            "high_risk_count": high_risk,
             "nudge": nudge,
         }
@@ -23,6 +23,10 @@ import datetime
 
 
 class TaskyLog:
+    # totals across every TaskyLog in the process, exported as metrics
+    lines_written = 0
+    bytes_written = 0
+
     _default_file_name = datetime.datetime.now().strftime("%Y_%m_%d__%H%M") + ".log"
     _default_file_path = Path.home() / "Tasky" / "taskylogs"
 
@@ -33,11 +37,19 @@ class TaskyLog:
         self.filepath.mkdir(parents=True, exist_ok=True)
         self.file = filepath / filename
         self.now = datetime.datetime.now
+        # quiet mode keeps only these levels, the per-call lines would otherwise skew perf timings
+        self.quiet = False
+        self.quiet_levels = ("error", "exit", "debug", "perf")
 
     def writelog(self, level, *args):
+        if self.quiet and level not in self.quiet_levels:
+            return
         self.filepath.mkdir(parents=True, exist_ok=True)
+        line = f"{str(self.now())[:-4]} >> [{level.upper()}] {' '.join(map(str, args))}\n"
+        TaskyLog.lines_written += 1
+        TaskyLog.bytes_written += len(line.encode())
         with open(self.file, 'a') as lf:
-            lf.write(f"{str(self.now())[:-4]} >> [{level.upper()}] {' '.join(map(str, args))}\n")
+            lf.write(line)
             lf.close()
 
     def info(self, *text):
@@ -0,0 +1,76 @@
+"""
+    Tasky is a task deadline tracker application
+    Copyright (C) 2022-2025  Abhineet Kelley (AbhiK002)
+
+    This file is part of Tasky.
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import re
+from collections import OrderedDict
+
+# the default workspace is the Tasky folder itself, so existing stores keep working;
+# named ones live in Tasky/workspaces/<name> with their own tasks, meta, archive and history
+DEFAULT_WORKSPACE = "default"
+WORKSPACE_NAME_RE = re.compile(r"^[a-z0-9_-]{1,40}$")
+RECENT_WORKSPACES = 4
+
+
+def is_valid_workspace(name):
+    return bool(WORKSPACE_NAME_RE.match(str(name)))
+
+
+def workspace_path(root, name):
+    if name == DEFAULT_WORKSPACE:
+        return root
+    return root / "workspaces" / name
+
+
+def list_workspaces(root):
+    folder = root / "workspaces"
+    names = sorted(p.name for p in folder.iterdir() if p.is_dir() and is_valid_workspace(p.name)) if folder.is_dir() else []
+    return [DEFAULT_WORKSPACE] + [n for n in names if n != DEFAULT_WORKSPACE]
+
+
+def workspace_from_argv(argv):
+    # --workspace NAME or --workspace=NAME, None when not given; names are lowercase
+    for i, arg in enumerate(argv):
+        if arg == "--workspace" and i + 1 < len(argv):
+            name = argv[i + 1].lower()
+        elif arg.startswith("--workspace="):
+            name = arg.split("=", 1)[1].lower()
+        else:
+            continue
+        if not is_valid_workspace(name):
+            raise SystemExit(f"invalid workspace name: {name!r} (letters, digits, '-' and '_', up to 40 characters)")
+        return name
+    return None
+
+
+class RecentWorkspaces:
+    # parsed state of the last few workspaces, so switching back needs no reload
+    # as long as their files did not change meanwhile
+    def __init__(self, capacity=RECENT_WORKSPACES):
+        self.capacity = capacity
+        self.entries = OrderedDict()
+
+    def put(self, name, state):
+        self.entries[name] = state
+        self.entries.move_to_end(name)
+        while len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)
+
+    def pop(self, name):
+        return self.entries.pop(name, None)
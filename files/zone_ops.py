@@ -0,0 +1,147 @@
+"""
+    Tasky is a task deadline tracker application
+    Copyright (C) 2022-2025  Abhineet Kelley (AbhiK002)
+
+    This file is part of Tasky.
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import bisect
+import datetime
+import time
+
+# deadlines are stored as UTC epoch seconds, always 10 digits so sorting the task
+# lines as text keeps them in deadline order (10 digits last until November 2286)
+EPOCH_DIGITS = 10
+MAX_DEADLINE_YEAR = 2285
+LEGACY_DEADLINE_FORMAT = "%y:%m:%d:%H:%M"
+
+EPOCH = datetime.datetime(1970, 1, 1)
+DAY = 86400
+# offsets are tabulated per span of 2**25 seconds (about 388 days), sampled once a day
+SPAN = 1 << 25
+
+
+class ZoneOffsets:
+    # UTC offset transitions of one zone ("" = the viewer's local zone), found once
+    # per span and kept sorted, so converting a batch of deadlines is a bisect each
+    def __init__(self, name=""):
+        self.name = name
+        self.zone = load_zone(name) if name else None
+        self.tables = {}
+
+    def raw_offset(self, epoch):
+        if self.zone is None:
+            return time.localtime(epoch).tm_gmtoff
+        return int(datetime.datetime.fromtimestamp(epoch, self.zone).utcoffset().total_seconds())
+
+    def build(self, start):
+        starts, offsets = [start], [self.raw_offset(start)]
+        for sample in list(range(start + DAY, start + SPAN, DAY)) + [start + SPAN - 1]:
+            offset = self.raw_offset(sample)
+            if offset == offsets[-1]:
+                continue
+            # the change happened within the last day, bisect it down to the second
+            low, high = max(starts[-1], sample - DAY), sample
+            while high - low > 1:
+                middle = (low + high) // 2
+                if self.raw_offset(middle) == offsets[-1]:
+                    low = middle
+                else:
+                    high = middle
+            starts.append(high)
+            offsets.append(offset)
+        return starts, offsets
+
+    def utc_offset(self, epoch):
+        bucket = epoch // SPAN
+        table = self.tables.get(bucket)
+        if table is None:
+            table = self.tables[bucket] = self.build(bucket * SPAN)
+        starts, offsets = table
+        return offsets[bisect.bisect_right(starts, epoch) - 1]
+
+    def to_local(self, epoch):
+        # naive wall-clock datetime in this zone
+        return EPOCH + datetime.timedelta(seconds=epoch + self.utc_offset(epoch))
+
+    def from_local(self, dt):
+        # a repeated wall time (clocks going back) gives the earlier instant, a skipped
+        # one (clocks going forward) is read with the offset from before the change
+        wall = int((dt.replace(tzinfo=None) - EPOCH).total_seconds())
+        before, after = self.utc_offset(wall - DAY), self.utc_offset(wall + DAY)
+        candidates = sorted(wall - offset for offset in {before, after})
+        for epoch in candidates:
+            if epoch + self.utc_offset(epoch) == wall:
+                return epoch
+        return wall - before
+
+    def label(self, epoch):
+        offset = self.utc_offset(epoch)
+        sign = "-" if offset < 0 else "+"
+        hours, minutes = divmod(abs(offset) // 60, 60)
+        return f"UTC{sign}{hours:02d}:{minutes:02d}"
+
+
+ZONES = {}
+
+
+def zone_offsets(name=""):
+    offsets = ZONES.get(name)
+    if offsets is None:
+        offsets = ZONES[name] = ZoneOffsets(name)
+    return offsets
+
+
+def load_zone(name):
+    # zoneinfo takes a few ms to import, so it waits until a task names a zone;
+    # on python < 3.9 it is missing and only the local zone is available
+    from zoneinfo import ZoneInfo
+
+    return ZoneInfo(name)
+
+
+def is_valid_zone(name):
+    if not name:
+        return True
+    try:
+        zone_offsets(name)
+    except (ImportError, ValueError, OSError, LookupError):
+        # ZoneInfoNotFoundError is a KeyError, names like "../x" raise ValueError
+        return False
+    return True
+
+
+def format_epoch(epoch):
+    return str(int(epoch)).zfill(EPOCH_DIGITS)
+
+
+def is_epoch_deadline(ttime):
+    return len(ttime) == EPOCH_DIGITS and ttime.isdecimal()
+
+
+def is_legacy_deadline(ttime):
+    return len(ttime) == 14 and ttime.count(":") == 4
+
+
+def upgrade_deadline(ttime):
+    # yy:mm:dd:HH:MM deadlines from older versions were local wall-clock times
+    if not is_legacy_deadline(ttime):
+        return ttime
+    try:
+        wall = datetime.datetime.strptime(ttime, LEGACY_DEADLINE_FORMAT)
+    except ValueError:
+        return ttime
+    return format_epoch(zone_offsets().from_local(wall))
@@ -18,8 +18,12 @@
     along with this program.  If not, see <https://www.gnu.org/licenses/>.
 """
 
+import sys
+
 from files.console_ops import ConsoleFunctions, OSFunctions
+from files.notify_ops import DeadlineNotifier, DesktopSink, StdoutSink
 from files.tasky_ops import AboutTasky
+from files.workspace_ops import workspace_from_argv
 
 
 class App(ConsoleFunctions):
@@ -31,13 +35,24 @@ class App(ConsoleFunctions):
         self.info_bar("enter 'help' to view valid commands", False)
         n = 0  # used variable, do not remove :D
 
+        # reminders go through the screen renderer, a print from the timer thread would
+        # throw off its in-place repaint
+        stdout_sink = StdoutSink(self.screen.notice)
+        notifier = DeadlineNotifier.from_settings(self, DesktopSink(fallback=stdout_sink), stdout_sink)
+        if notifier is not None:
+            notifier.run_in_background()
+            self.TL.info(f"deadline reminders enabled, offsets: {notifier.offsets}")
+
         while True:
-            task_list = self.read_and_sort_tasks_file()
+            self.backup_if_due()
+            task_list = self.current_tasks()
             total_tasks = len(task_list)
+            if notifier is not None:
+                notifier.sync_tasks(task_list)
             self.TL.info(f"current total number of tasks: {total_tasks}")
 
             self.TL.waiting(f"FOR MAIN USER INPUT")
-            user_inp = input(f"\n  >  ").lower().strip()
+            user_inp = self.ask(f"\n  >  ").lower().strip()
 
             self.TL.info(f"user input: {user_inp}")
             words = user_inp.split()
@@ -64,8 +79,15 @@ class App(ConsoleFunctions):
                     f"{'Add a New Task'.ljust(20)} --  add / new / create",
                     f"{'Delete Task N'.ljust(20)} --  delete N / del N / remove N / rem N",
                     f"{'Delete All Tasks'.ljust(20)} --  delete-all / remove-all",
+                    f"{'Complete Task N'.ljust(20)} --  done N / complete N",
+                    f"{'Archived Tasks'.ljust(20)} --  history / history N",
+                    f"{'Undo / Redo'.ljust(20)} --  undo / redo",
+                    f"{'Workspaces'.ljust(20)} --  workspace / workspace NAME",
+                    f"{'Sync'.ljust(20)} --  sync",
+                    f"{'Backups'.ljust(20)} --  backups / restore N",
                     f"{'Edit Task N'.ljust(20)} --  edit N / ed N / change N",
                     f"{'View Task Details'.ljust(20)} --  ENTER TASK NUMBER",
+                    f"{'Search Tasks'.ljust(20)} --  search WORDS / find WORDS",
                     f"{'Open Help Menu'.ljust(20)} --  help / h",
                     f"{'About Tasky'.ljust(20)} --  version / about",
                     f"{'Exit Tasky'.ljust(20)} --  quit / bye",
@@ -84,7 +106,7 @@ class App(ConsoleFunctions):
 
             elif user_inp in ("add", "new", "create"):
                 self.TL.info(f"user requested to add a new task")
-                tasks_copy = self.read_and_sort_tasks_file()
+                tasks_copy = task_list.copy()
                 self.info_bar("type '/cancel' to stop task addition")
                 print(
                     "-" * 60,
@@ -110,7 +132,6 @@ class App(ConsoleFunctions):
                             n = 0
                         else:
                             self.TL.info(f"cancelled")
-                            self.write_tasks(tasks_copy)
                             self.info_bar("task removal cancelled")
                     else:
                         self.TL.error(
@@ -121,6 +142,59 @@ class App(ConsoleFunctions):
                     self.TL.error(f"command used incorrectly: {user_inp}")
                     self.info_bar(f"error! try again like '{words[0]} 1'")
 
+            elif words[0] in ("done", "complete"):
+                if len(words) == 2 and words[1].isdecimal() and int(words[1]) in range(1, total_tasks + 1):
+                    self.TL.info(f"user marked task {words[1]} as done")
+                    self.complete_task(words[1], task_list.copy())
+                    self.info_bar(f"task {int(words[1])} done and moved to the archive")
+                    n = 0
+                else:
+                    self.TL.error(f"command used incorrectly: {user_inp}")
+                    self.info_bar(f"error! try again like '{words[0]} 1'")
+
+            elif words[0] == "history":
+                if len(words) == 1 or (len(words) == 2 and words[1].isdecimal()):
+                    limit = int(words[1]) if len(words) == 2 else 20
+                    self.TL.info(f"user requested the last {limit} archived tasks")
+                    self.info_bar("viewing archived tasks")
+                    self.show_history(limit)
+                else:
+                    self.TL.error(f"command used incorrectly: {user_inp}")
+                    self.info_bar(f"error! try again like '{words[0]} 10'")
+
+            elif words[0] == "workspace":
+                self.TL.info(f"user requested workspace command: {user_inp}")
+                self.workspace_command(words[1:])
+                n = 0
+
+            elif user_inp == "backups":
+                self.TL.info("user requested the list of backups")
+                self.info_bar("viewing backups")
+                self.show_backups()
+
+            elif words[0] == "restore":
+                if len(words) == 2 and words[1].isdecimal():
+                    self.TL.info(f"user requested to restore backup {words[1]}")
+                    self.restore_command(int(words[1]))
+                    n = 0
+                else:
+                    self.TL.error(f"command used incorrectly: {user_inp}")
+                    self.info_bar(f"error! try again like '{words[0]} 1'")
+
+            elif user_inp == "sync":
+                self.TL.info("user requested a sync")
+                self.sync_command()
+                n = 0
+
+            elif user_inp in ("undo", "redo"):
+                op = self.undo() if user_inp == "undo" else self.redo()
+                self.TL.info(f"user requested {user_inp}, result: {op}")
+                if op is None:
+                    self.info_bar(f"nothing to {user_inp}")
+                else:
+                    self.info_bar(f"{user_inp} {op}: done")
+                n = 0
+
             elif words[0] in ("edit", "ed", "change"):
                 if len(words) == 2 and words[1].isdecimal():
                     self.TL.info(
@@ -142,13 +216,23 @@ class App(ConsoleFunctions):
                     self.TL.error(f"command used incorrectly: {user_inp}")
                     self.info_bar(f"error! try again like '{words[0]} 4'")
 
+            elif words[0] in ("search", "find"):
+                if len(words) > 1:
+                    query = user_inp.split(None, 1)[1]
+                    self.TL.info(f"user searched for: {query}")
+                    self.info_bar(f"search results for '{query}'")
+                    self.search_tasks(query, task_list)
+                else:
+                    self.TL.error(f"command used incorrectly: {user_inp}")
+                    self.info_bar(f"error! try again like '{words[0]} report'")
+
             elif user_inp in ("delete-all", "remove-all"):
                 if total_tasks == 0:
                     self.info_bar("no tasks available to delete")
                     continue
                 self.TL.info("user requested to delete all tasks/clear tasks")
                 confirm = self.is_confirmed(
-                    "\nWARNING: Clear all existing tasks? (Cannot be undone)\n\t(Enter y/n) :  ",
+                    "\nWARNING: Clear all existing tasks? ('undo' brings them back)\n\t(Enter y/n) :  ",
                     last=task_list
                 )
                 if confirm:
@@ -226,6 +310,10 @@ class App(ConsoleFunctions):
                 self.TL.info(f"Special Input: {words[0]}")
                 self.info_bar(words[0].upper())
 
+            elif words[0] == "tasky-debug" and words[1:2] == ["perf"]:
+                self.TL.writelog("debug", f"perf command: {user_inp}")
+                self.perf_command(words[2:])
+
             elif user_inp == "tasky-debug":
                 self.TL.writelog("debug", "opening logs folder for debugging")
                 self.info_bar("request for logs folder")
@@ -239,5 +327,5 @@ class App(ConsoleFunctions):
 
 
 if __name__ == "__main__":
-    app = App()
+    app = App(workspace_from_argv(sys.argv))
     app.console_loop()
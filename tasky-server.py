@@ -0,0 +1,45 @@
+"""
+    Tasky is a task deadline tracker application
+    Copyright (C) 2022-2025  Abhineet Kelley (AbhiK002)
+
+    This file is part of Tasky.
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import argparse
+
+from files.server_ops import TaskStore, TaskyServer, DEFAULT_HOST, DEFAULT_PORT
+from files.tasky_ops import AboutTasky
+from files.workspace_ops import is_valid_workspace
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(prog="tasky-server", description="Tasky local JSON API server")
+    parser.add_argument("--host", default=DEFAULT_HOST, help=f"address to listen on (default {DEFAULT_HOST})")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"port to listen on (default {DEFAULT_PORT})")
+    parser.add_argument("--unix", metavar="PATH", help="listen on a unix socket instead of TCP")
+    parser.add_argument("--workspace", type=str.lower, help="serve this workspace instead of the default one")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    print(AboutTasky.startup_message)
+    if args.workspace is not None and not is_valid_workspace(args.workspace):
+        raise SystemExit(f"invalid workspace name: {args.workspace!r}")
+    server = TaskyServer(TaskStore(args.workspace), host=args.host, port=args.port, unix_path=args.unix)
+    where = args.unix or f"http://{args.host}:{args.port}"
+    print(f"Tasky server serving {len(server.store.tasks)} tasks on {where} (Ctrl+C to stop)")
+    server.run()
@@ -3,15 +3,23 @@
     Copyright (C) 2022-2025  Abhineet Kelley (AbhiK002)
 """
 
+import datetime
 import sys
+import time
 
 from PyQt5 import QtWidgets
-from PyQt5.QtGui import QIcon, QCursor
-from PyQt5.QtWidgets import QApplication, QWidget, QFileDialog
-from PyQt5.QtCore import Qt, QTimer, QSize
+from PyQt5.QtGui import QIcon, QCursor, QKeySequence
+from PyQt5.QtWidgets import QApplication, QWidget, QFileDialog, QShortcut
+from PyQt5.QtCore import Qt, QTimer, QSize, QObject, QThread, pyqtSignal, pyqtSlot
 
+from files.deadline_ops import UserStateTracker
+from files.graph_ops import TaskGraph
 from files.gui_ops import TaskyStyle
-from files.tasky_ops import Functions
+from files.index_ops import TaskIndex
+from files.recur_ops import describe_rule, parse_rule
+from files.tasky_ops import Functions, PERF
+from files.workspace_ops import RecentWorkspaces, is_valid_workspace, list_workspaces, workspace_from_argv
+from files.zone_ops import MAX_DEADLINE_YEAR, is_valid_zone
 
 PRIORITY_ITEMS = ["Low", "Medium", "High", "Critical"]
 CATEGORY_ITEMS = ["General", "Work", "Study", "Health", "Personal", "Research"]
@@ -21,6 +29,8 @@ I18N = {
         "window_title": "Tasky - Deadline Accelerator",
         "heading": "DEADLINE ACCELERATOR",
         "view": "View",
+        "workspace": "Workspace",
+        "bad_workspace": "Workspace names use letters, digits, '-' and '_' (up to 40 characters).",
         "category": "Category",
         "new_task": " New Task",
         "import_csv": " Import CSV",
@@ -31,6 +41,7 @@ I18N = {
         "by_category": "By Category",
         "by_priority": "By Priority",
         "all": "All",
+        "search": "Search tasks...",
         "focus": "Focus",
         "high_risk": "High Risk",
         "clear_all": "CLEAR ALL TASKS",
@@ -41,12 +52,20 @@ I18N = {
         "delete_confirm": "Delete Confirmation",
         "delete_confirm_msg": "Are you sure you want to delete Task {num}?\n\nTask Name: {name}\n",
         "clear_confirm": "Clear All Confirmation",
-        "clear_confirm_msg": "Do you want to DELETE ALL tasks?\n\n(You cannot undo this)",
+        "clear_confirm_msg": "Do you want to DELETE ALL tasks?\n\n(Ctrl+Z brings them back)",
+        "history": " History",
+        "history_title": "Archived Tasks",
+        "history_empty": "No archived tasks yet.",
+        "history_done": "Done",
+        "history_expired": "Expired",
+        "blocked": "Blocked",
     },
     "zh": {
         "window_title": "Tasky - 截止加速器",
         "heading": "截止加速器",
         "view": "视图",
+        "workspace": "工作区",
+        "bad_workspace": "工作区名称只能包含字母、数字、'-' 和 '_'（最多 40 个字符）。",
         "category": "分类",
         "new_task": " 新建任务",
         "import_csv": " 导入 CSV",
@@ -57,6 +76,7 @@ I18N = {
         "by_category": "按分类",
         "by_priority": "按优先级",
         "all": "全部",
+        "search": "搜索任务…",
         "focus": "专注分",
         "high_risk": "高风险",
         "clear_all": "清空全部任务",
@@ -67,15 +87,55 @@ I18N = {
         "delete_confirm": "删除确认",
         "delete_confirm_msg": "确认删除任务 {num} 吗？\n\n任务名：{name}\n",
         "clear_confirm": "清空确认",
-        "clear_confirm_msg": "是否删除全部任务？\n\n（此操作不可撤销）",
+        "clear_confirm_msg": "是否删除全部任务？\n\n（按 Ctrl+Z 可恢复）",
+        "history": " 历史",
+        "history_title": "已归档任务",
+        "history_empty": "暂无已归档任务。",
+        "history_done": "已完成",
+        "history_expired": "已过期",
+        "blocked": "受阻",
     }
 }
 
 TStyle = TaskyStyle()
-TBackEnd = Functions()
+TBackEnd = Functions(workspace_from_argv(sys.argv))
+
+
+def load_task_snapshot():
+    # runs on the storage thread, everything that touches the task files happens here
+    # each file is read once, the dependency graph is applied here too, and the stat stamp
+    # taken afterwards is what refresh_gui polls instead of re-reading the files
+    tasks_list, meta_map = TBackEnd.read_and_sort_tasks_file(with_meta=True)
+    details = TBackEnd.return_deadlines_with_meta(tasks_list, meta_map)
+    return {
+        "tasks_list": tasks_list,
+        "details": details,
+        "stamp": TBackEnd.stat_files(),
+        "workspace": TBackEnd.workspace,
+    }
+
+
+def apply_task_graph(details):
+    # storage thread: the backend's graph only ever changes here and in load_task_snapshot
+    return TBackEnd.apply_task_graph(details)
+
+
+class StorageWorker(QObject):
+    job_done = pyqtSignal(object, object)
+
+    @pyqtSlot(object, object)
+    def run_job(self, job, callback):
+        try:
+            result = job()
+        except Exception as e:
+            TBackEnd.TL.error(f"storage job {getattr(job, '__name__', job)} failed: {e}")
+            result = e
+        self.job_done.emit(callback, result)
 
 
 class App(QWidget):
+    submit_job = pyqtSignal(object, object)
+
     def tr(self, key, **kwargs):
         return I18N[self.language][key].format(**kwargs)
 
@@ -102,11 +162,25 @@ class App(QWidget):
         self.tasks_parted_list = []
         self.tasks_list = []
         self.task_boxes = []
-        self.last_read = ''
-        self.last_meta_read = ''
         self.current_view_mode = "time"
         self.current_category_filter = "All"
         self.task_window = None
+        self.state_tracker = UserStateTracker()
+        self.task_index = TaskIndex()
+        self.search_index = None
+        self.task_details = {}
+        self.current_search = ""
+        self.user_state = None
+        self.load_in_flight = False
+        self.load_pending = False
+        self.check_in_flight = False
+        self.workspace = TBackEnd.workspace
+        self.snapshot = None
+        self.recent_workspaces = RecentWorkspaces()
+
+        self.notifier = None
+        self.tray_icon = None
+        self.metrics = None
 
         self.add_top_frame()
         self.add_tasks_container()
@@ -119,13 +193,107 @@ class App(QWidget):
         self.gui_refresh_timer = QTimer()
         self.gui_refresh_timer.timeout.connect(self.refresh_gui)
         self.gui_refresh_timer.setInterval(600)
-        self.gui_refresh_timer.start()
-
-        self.refresh_tasks()
 
+        # paint the empty window first, the tasks, tray icon and reminders follow on the event loop
         self.show()
+        QTimer.singleShot(0, self.finish_startup)
         sys.exit(app.exec_())
 
+    def finish_startup(self):
+        from files.search_ops import SearchIndex
+
+        self.search_index = SearchIndex()
+        self.add_storage_worker()
+        self.add_shortcuts()
+        self.refresh_tasks()
+        self.gui_refresh_timer.start()
+        self.add_notifier()
+        self.add_metrics()
+        self.add_sync()
+        self.add_backups()
+
+    def add_storage_worker(self):
+        self.io_thread = QThread(self)
+        self.io_worker = StorageWorker()
+        self.io_worker.moveToThread(self.io_thread)
+        self.submit_job.connect(self.io_worker.run_job)
+        self.io_worker.job_done.connect(self.finish_job)
+        self.io_thread.start()
+
+    def run_in_background(self, job, callback=None):
+        # jobs run one at a time on the storage thread, callbacks come back on the UI thread
+        self.submit_job.emit(job, callback)
+
+    def finish_job(self, callback, result):
+        if isinstance(result, Exception):
+            result = None
+        if callback is not None:
+            callback(result)
+
+    def add_notifier(self):
+        # notify_ops pulls in subprocess and threading, nothing on the first frame needs them
+        from files.notify_ops import DeadlineNotifier
+
+        tray_sink = None
+        if QtWidgets.QSystemTrayIcon.isSystemTrayAvailable():
+            self.tray_icon = QtWidgets.QSystemTrayIcon(QIcon(TStyle.tlogo_path), self)
+            self.tray_icon.setToolTip("Tasky")
+            self.tray_icon.show()
+            tray_sink = TraySink(self.tray_icon)
+
+        self.notifier = DeadlineNotifier.from_settings(TBackEnd, desktop_sink=tray_sink)
+        if self.notifier is None:
+            return
+
+        # the wheel only needs its hand moved, it never touches the task files
+        self.notifier_timer = QTimer(self)
+        self.notifier_timer.timeout.connect(self.notifier.tick)
+        self.notifier_timer.setInterval(int(self.notifier.wheel.tick * 1000))
+        self.notifier_timer.start()
+
+    def add_metrics(self):
+        from files.metrics_ops import TaskyMetrics
+
+        self.metrics = TaskyMetrics.from_settings(TBackEnd)
+        if self.metrics is None:
+            return
+        self.metrics.serve()
+        if self.metrics.textfile is not None:
+            self.metrics_timer = QTimer(self)
+            self.metrics_timer.timeout.connect(lambda: self.run_in_background(self.metrics.write_textfile))
+            self.metrics_timer.setInterval(int(self.metrics.interval * 1000))
+            self.metrics_timer.start()
+
+    def add_backups(self):
+        settings = TBackEnd.backup_settings()
+        if not settings["enabled"]:
+            return
+        # snapshots are taken on the storage thread and skipped while the files are unchanged
+        self.backup_timer = QTimer(self)
+        self.backup_timer.timeout.connect(lambda: self.run_in_background(TBackEnd.backup_now))
+        self.backup_timer.setInterval(max(1, settings["interval"]) * 60 * 1000)
+        self.backup_timer.start()
+        self.run_in_background(TBackEnd.backup_now)
+
+    def add_sync(self):
+        from files.sync_ops import SyncEngine, read_sync_settings
+
+        settings = read_sync_settings(TBackEnd)
+        if settings is None:
+            return
+        folder, interval = settings
+        # built per run on the storage thread, so it always follows the active workspace
+        job = lambda: SyncEngine(TBackEnd, folder).sync()
+        self.sync_timer = QTimer(self)
+        self.sync_timer.timeout.connect(lambda: self.run_in_background(job, self.synced))
+        self.sync_timer.setInterval(int(interval * 1000))
+        self.sync_timer.start()
+        self.run_in_background(job, self.synced)
+
+    def synced(self, result):
+        if result is not None and result[1]:
+            self.refresh_tasks()
+
     def add_top_frame(self):
         self.tasks_frame = QWidget(self)
         self.tasks_frame.setObjectName("TasksFrame")
@@ -149,15 +317,32 @@ class App(QWidget):
         self.category_combo.addItems(CATEGORY_ITEMS)
         self.category_combo.currentTextChanged.connect(self.change_category_filter)
 
+        # editable: typing a new name and pressing enter creates that workspace
+        self.workspace_combo = QtWidgets.QComboBox(self.controls_frame)
+        self.workspace_combo.setEditable(True)
+        self.workspace_combo.addItems(list_workspaces(TBackEnd.taskymain_path))
+        self.workspace_combo.setCurrentText(self.workspace)
+        self.workspace_combo.activated[str].connect(self.switch_workspace)
+
         self.view_label = QtWidgets.QLabel(self.tr("view"))
         self.category_label = QtWidgets.QLabel(self.tr("category"))
+        self.workspace_label = QtWidgets.QLabel(self.tr("workspace"))
 
+        self.search_entry = QtWidgets.QLineEdit(self.controls_frame)
+        self.search_entry.setPlaceholderText(self.tr("search"))
+        self.search_entry.setClearButtonEnabled(True)
+        self.search_entry.textChanged.connect(self.change_search)
+
+        controls_layout.addWidget(self.workspace_label)
+        controls_layout.addWidget(self.workspace_combo)
+        controls_layout.addSpacing(16)
         controls_layout.addWidget(self.view_label)
         controls_layout.addWidget(self.view_mode_combo)
         controls_layout.addSpacing(16)
         controls_layout.addWidget(self.category_label)
         controls_layout.addWidget(self.category_combo)
         controls_layout.addStretch()
+        controls_layout.addWidget(self.search_entry)
 
         self.analysis_label = QtWidgets.QLabel("")
         self.analysis_label.setAlignment(Qt.AlignCenter)
@@ -195,6 +380,10 @@ class App(QWidget):
         self.import_button.setObjectName("NewTaskButton")
         self.import_button.clicked.connect(self.import_csv_tasks)
 
+        self.history_button = QtWidgets.QPushButton(self.tr("history"))
+        self.history_button.setObjectName("NewTaskButton")
+        self.history_button.clicked.connect(self.show_history)
+
         self.switch_mode_button = QtWidgets.QPushButton(f" {'Dark' if TStyle.theme == 'light' else 'Light'}{self.tr('theme')}")
         self.switch_mode_button.setIcon(QIcon(TStyle.switch_mode_icon))
         self.switch_mode_button.setObjectName("SwitchModeButton")
@@ -213,6 +402,7 @@ class App(QWidget):
         self.buttons_layout.addStretch()
         self.buttons_layout.addWidget(self.new_task_button)
         self.buttons_layout.addWidget(self.import_button)
+        self.buttons_layout.addWidget(self.history_button)
         self.buttons_layout.addWidget(self.switch_mode_button)
         self.buttons_layout.addWidget(self.language_button)
         self.buttons_layout.addStretch()
@@ -223,8 +413,11 @@ class App(QWidget):
         self.heading_label.setText(self.tr("heading"))
         self.view_label.setText(self.tr("view"))
         self.category_label.setText(self.tr("category"))
+        self.workspace_label.setText(self.tr("workspace"))
+        self.search_entry.setPlaceholderText(self.tr("search"))
         self.new_task_button.setText(self.tr("new_task"))
         self.import_button.setText(self.tr("import_csv"))
+        self.history_button.setText(self.tr("history"))
         self.switch_mode_button.setText(f" {TStyle.theme.title()}{self.tr('theme')}")
         self.language_button.setText(self.tr("language_btn"))
         self.about_tasky.setToolTip(self.tr("about"))
@@ -244,14 +437,15 @@ class App(QWidget):
         self.category_combo.setCurrentText(cur_filter if cur_filter != "All" else self.tr("all"))
         self.category_combo.blockSignals(False)
 
-        self.refresh_tasks()
+        self.show_user_state()
+        self.render_tasks()
 
     def toggle_language(self):
         self.language = "en" if self.language == "zh" else "zh"
         self.apply_language()
 
     def show_about_tasky(self):
-        state = TBackEnd.analyze_user_state()
+        state = self.user_state or TBackEnd.analyze_user_state([])
         text = (
             f"<FONT>{TBackEnd.tasky_version(1, link=True)}"
             f"<br><br><b>Focus Score</b>: {state['focus_score']}/100"
@@ -265,28 +459,118 @@ class App(QWidget):
             self.tr("by_category"): "category",
             self.tr("by_priority"): "priority",
         }.get(text, "time")
-        self.refresh_tasks()
+        self.render_tasks()
 
     def change_category_filter(self, text):
         self.current_category_filter = "All" if text == self.tr("all") else text
-        self.refresh_tasks()
+        self.render_tasks()
 
-    def get_sorted_filtered_tasks(self):
-        data = TBackEnd.return_deadlines_with_meta()
-        if self.current_category_filter != "All":
-            data = [d for d in data if d["category"] == self.current_category_filter]
-
-        if self.current_view_mode == "category":
-            data.sort(key=lambda d: (d["category"], d["ttime"]))
-        elif self.current_view_mode == "priority":
-            order = {"Critical": 0, "High": 1, "Medium": 2, "Low": 3}
-            data.sort(key=lambda d: (order.get(d["priority"], 2), d["ttime"]))
-        else:
-            data.sort(key=lambda d: d["ttime"])
+    def change_search(self, text):
+        self.current_search = text.strip()
+        self.render_tasks()
 
-        return data
+    def get_sorted_filtered_tasks(self):
+        category = None if self.current_category_filter == "All" else self.current_category_filter
+        keys = self.task_index.keys(category=category, order=self.current_view_mode)
+        if self.current_view_mode == "priority":
+            # by inherited urgency, so a blocker of a critical task shows up with it, and
+            # a blocker ahead of the tasks it blocks
+            keys.sort(key=lambda k: (-self.task_details[k].get("urgency", 0), self.task_details[k].get("order", 0)))
+        if self.current_search and self.search_index is not None:
+            # only membership is needed, the view's own order is kept
+            found = self.search_index.matching(self.current_search)
+            keys = [key for key in keys if key in found]
+        return [self.task_details[key] for key in keys]
 
     def refresh_tasks(self):
+        # a burst of refresh requests collapses into the load in flight plus at most one more
+        if self.load_in_flight:
+            self.load_pending = True
+            return
+        self.load_in_flight = True
+        self.refresh_started = time.perf_counter()
+        self.run_in_background(load_task_snapshot, self.apply_snapshot)
+
+    def apply_snapshot(self, snapshot):
+        # the pending load is only issued after this one is measured, it resets refresh_started
+        started = self.refresh_started
+        self.load_in_flight = False
+        if snapshot is not None and snapshot["workspace"] == self.workspace:
+            self.show_snapshot(snapshot)
+            # request to rendered list, including the time the load spent on the storage thread
+            elapsed = time.perf_counter() - started
+            if PERF.enabled:
+                PERF.record("App.refresh_tasks", elapsed)
+            if self.metrics is not None:
+                self.metrics.observe_refresh(elapsed)
+                self.metrics.update_tasks(self.task_index.counts(), self.user_state)
+        elif snapshot is not None:
+            # loaded just before a workspace switch
+            self.load_pending = True
+
+        if self.load_pending:
+            self.load_pending = False
+            self.refresh_tasks()
+
+    def show_snapshot(self, snapshot):
+        self.snapshot = snapshot
+        self.tasks_list = snapshot["tasks_list"]
+        if self.notifier is not None:
+            self.notifier.sync_tasks(self.tasks_list)
+
+        details = snapshot["details"]
+        self.task_details = {TBackEnd.task_identity(task): d for task, d in zip(self.tasks_list, details)}
+        self.state_tracker.sync({
+            key: (TBackEnd.parse_deadline_to_epoch(d["ttime"]), d["priority"]) for key, d in self.task_details.items()
+        })
+        self.task_index.sync({key: TaskIndex.record_of(d) for key, d in self.task_details.items()})
+        self.search_index.sync({key: (d["name"], d["desc"], d["category"]) for key, d in self.task_details.items()})
+        self.last_datetime = TBackEnd.return_datetime_now_parts()
+
+        self.user_state = self.state_tracker.state()
+        self.show_user_state()
+        self.render_tasks()
+
+    def switch_workspace(self, name):
+        name = name.strip().lower()
+        if name == self.workspace:
+            return
+        if not is_valid_workspace(name):
+            QtWidgets.QMessageBox.warning(self, self.tr("workspace"), self.tr("bad_workspace"))
+            self.workspace_combo.setCurrentText(self.workspace)
+            return
+
+        if self.snapshot is not None:
+            self.recent_workspaces.put(self.workspace, self.snapshot)
+        self.workspace = name
+        self.run_in_background(lambda: TBackEnd.set_workspace(name))
+        if self.workspace_combo.findText(name) < 0:
+            self.workspace_combo.addItem(name)
+        self.workspace_combo.setCurrentText(name)
+
+        cached = self.recent_workspaces.pop(name)
+        if cached is None:
+            self.refresh_tasks()
+            return
+        # recently used: show it right away, the file check reloads it if it changed meanwhile
+        for d in cached["details"]:
+            d["deadline_text"] = TBackEnd.timediff(d["ttime"])
+            d["risk"] = TBackEnd.calculate_risk_score(d["ttime"], d["priority"])
+        self.show_snapshot(cached)
+        self.reapply_task_graph()
+        self.check_in_flight = True
+        self.run_in_background(TBackEnd.stat_files, self.files_checked)
+
+    def show_user_state(self):
+        state = self.user_state
+        if state is None:
+            return
+        self.analysis_label.setText(
+            f"{self.tr('focus')} {state['focus_score']}/100 | {self.tr('high_risk')} {state['high_risk_count']} | {state['nudge']}"
+        )
+
+    def render_tasks(self):
+        start = time.perf_counter()
         self.gui_refresh_timer.stop()
 
         while self.tasks_layout.count():
@@ -295,16 +579,7 @@ class App(QWidget):
                 child.widget().deleteLater()
 
         self.task_boxes.clear()
-
-        self.tasks_list = TBackEnd.read_and_sort_tasks_file()
         self.tasks_parted_list = self.get_sorted_filtered_tasks()
-        self.last_read = TBackEnd.read_tasks_file()
-        self.last_meta_read = TBackEnd.read_meta_tasks_file()
-
-        state = TBackEnd.analyze_user_state()
-        self.analysis_label.setText(
-            f"{self.tr('focus')} {state['focus_score']}/100 | {self.tr('high_risk')} {state['high_risk_count']} | {state['nudge']}"
-        )
 
         for task in self.tasks_parted_list:
             task_box = TaskBox(task, self)
@@ -328,38 +603,107 @@ class App(QWidget):
         self.tasks_layout.addStretch()
 
         self.gui_refresh_timer.start()
+        if PERF.enabled:
+            PERF.record("App.render_tasks", time.perf_counter() - start)
 
     def refresh_gui(self):
-        if TBackEnd.read_tasks_file() != self.last_read or TBackEnd.read_meta_tasks_file() != self.last_meta_read:
-            self.refresh_tasks()
-            return
+        if not (self.check_in_flight or self.load_in_flight):
+            self.check_in_flight = True
+            self.run_in_background(TBackEnd.stat_files, self.files_checked)
 
         time_now = TBackEnd.return_datetime_now_parts()
         if self.last_datetime == time_now:
             return
 
         self.last_datetime = time_now
-        self.refresh_tasks()
+        crossed = self.state_tracker.advance()
+        if crossed:
+            # only the tasks that entered a new risk band or expired need a new score
+            for _, key, _ in crossed:
+                d = self.task_details.get(key)
+                if d is not None:
+                    d["risk"] = TBackEnd.calculate_risk_score(d["ttime"], d["priority"])
+                    d["deadline_text"] = TBackEnd.timediff(d["ttime"])
+            self.user_state = self.state_tracker.state()
+            self.show_user_state()
+            if self.metrics is not None:
+                self.metrics.update_tasks(self.task_index.counts(), self.user_state)
+            # only the rescored tasks and their prerequisites get a new inherited urgency,
+            # the list is redrawn once that arrives
+            self.reapply_task_graph()
+            return
+
+        for task_box in self.task_boxes:
+            task_box.td.setText(TBackEnd.timediff(task_box.ttime).strip())
+
+    def files_checked(self, stamp):
+        self.check_in_flight = False
+        if self.snapshot is None or (not isinstance(stamp, Exception) and stamp != self.snapshot["stamp"]):
+            self.refresh_tasks()
+
+    def reapply_task_graph(self):
+        # urgency and critical paths are recomputed on the storage thread, on copies, and
+        # swapped in unless a newer snapshot arrived meanwhile
+        snapshot = self.snapshot
+        keys = list(self.task_details)
+        details = [dict(self.task_details[key]) for key in keys]
+
+        def applied(result):
+            if self.snapshot is not snapshot or isinstance(result, Exception):
+                return
+            self.task_details = dict(zip(keys, result))
+            self.render_tasks()
+
+        self.run_in_background(lambda: apply_task_graph(details), applied)
 
     def import_csv_tasks(self):
         csv_path, _ = QFileDialog.getOpenFileName(self, self.tr("select_csv"), "", "CSV Files (*.csv)")
         if not csv_path:
             return
 
-        imported = TBackEnd.import_tasks_from_csv(csv_path)
-        QtWidgets.QMessageBox.information(self, self.tr("import_done"), self.tr("import_done_msg", count=imported))
+        self.import_button.setEnabled(False)
+        self.run_in_background(lambda: TBackEnd.import_tasks_from_csv(csv_path), self.csv_imported)
+
+    def csv_imported(self, imported):
+        self.import_button.setEnabled(True)
+        QtWidgets.QMessageBox.information(self, self.tr("import_done"), self.tr("import_done_msg", count=imported or 0))
         self.refresh_tasks()
 
+    def add_shortcuts(self):
+        # Ctrl+Z, and Ctrl+Shift+Z / Ctrl+Y depending on the platform's redo key
+        QShortcut(QKeySequence.Undo, self, lambda: self.run_in_background(TBackEnd.undo, self.history_applied))
+        QShortcut(QKeySequence.Redo, self, lambda: self.run_in_background(TBackEnd.redo, self.history_applied))
+
+    def history_applied(self, op):
+        if op is not None:
+            self.refresh_tasks()
+
+    def show_history(self):
+        # the archive is only decompressed when asked for, off the GUI thread
+        self.history_button.setEnabled(False)
+        self.run_in_background(lambda: TBackEnd.read_archive(50), self.history_loaded)
+
+    def history_loaded(self, rows):
+        self.history_button.setEnabled(True)
+        if not rows:
+            QtWidgets.QMessageBox.information(self, self.tr("history_title"), self.tr("history_empty"))
+            return
+        lines = [
+            f"{row['archived_at']}  {self.tr('history_' + row['outcome'])}  {row['name']}  [{row['category']}]"
+            for row in rows
+        ]
+        QtWidgets.QMessageBox.information(self, self.tr("history_title"), "\n".join(lines))
+
     def open_task(self, num=False):
+        # the task window is built once and refilled on every open
         if self.task_window is None:
-            self.gui_refresh_timer.stop()
-            self.setEnabled(False)
-            self.task_window = TaskWindow(num, self)
-            win_timer = QTimer(self.task_window)
-            win_timer.setSingleShot(True)
-            win_timer.timeout.connect(self.task_window.show)
-            win_timer.setInterval(200)
-            win_timer.start()
+            self.task_window = TaskWindow(self)
+        elif self.task_window.isVisible():
+            return
+        self.gui_refresh_timer.stop()
+        self.setEnabled(False)
+        self.task_window.load_task(num)
+        self.task_window.show()
 
     def direct_delete(self, tasknum, tlist):
         if tasknum - 1 in range(len(tlist)):
@@ -368,7 +712,9 @@ class App(QWidget):
             decision = QtWidgets.QMessageBox.question(self, self.tr("delete_confirm"), display_text,
                                                       QtWidgets.QMessageBox.Yes | QtWidgets.QMessageBox.No)
             if decision == QtWidgets.QMessageBox.Yes:
-                TBackEnd.remove(tasknum, tlist)
+                tlist = tlist.copy()
+                self.run_in_background(lambda: TBackEnd.remove(tasknum, tlist), lambda _: self.refresh_tasks())
+                return
         self.refresh_tasks()
 
     def clear_all_tasks(self):
@@ -377,10 +723,18 @@ class App(QWidget):
             QtWidgets.QMessageBox.Yes | QtWidgets.QMessageBox.No,
         )
         if decision == QtWidgets.QMessageBox.Yes:
-            TBackEnd.clear_tasks()
+            self.run_in_background(TBackEnd.clear_tasks, lambda _: self.refresh_tasks())
+            return
         self.refresh_tasks()
 
     def closeEvent(self, e):
+        if PERF.stats:
+            TBackEnd.TL.writelog("perf", "\n" + PERF.format_report())
+        if self.metrics is not None:
+            self.metrics.close()
+        if hasattr(self, "io_thread"):
+            self.io_thread.quit()
+            self.io_thread.wait(3000)
         sys.exit()
 
     def switch_theme(self):
@@ -394,13 +748,21 @@ class App(QWidget):
 
         self.new_task_button.setIcon(QIcon(TStyle.new_task_icon))
         self.switch_mode_button.setIcon(QIcon(TStyle.switch_mode_icon))
-        self.refresh_tasks()
+        self.render_tasks()
+
+
+class TraySink:
+    def __init__(self, tray_icon):
+        self.tray_icon = tray_icon
+
+    def send(self, title, message):
+        self.tray_icon.showMessage(title, message, QIcon(TStyle.tlogo_path), 10000)
 
 
 class TaskBox(QtWidgets.QPushButton):
     def __init__(self, task_data, mainwindow: App):
         super(TaskBox, self).__init__()
-        self.setStyleSheet(TStyle.stylesheet())
+        self.ttime = task_data["ttime"]
 
         task_lay = QtWidgets.QHBoxLayout(self)
         task_lay.setContentsMargins(0, 0, 0, 0)
@@ -413,7 +775,12 @@ class TaskBox(QtWidgets.QPushButton):
         self.td.setAlignment(Qt.AlignRight | Qt.AlignVCenter)
         self.td.setObjectName("TaskDead")
 
-        label_text = f"[{task_data['priority']}] {task_data['name']} ({task_data['category']}) | Risk {task_data['risk']}"
+        risk = task_data["risk"]
+        if task_data.get("urgency", risk) > risk:
+            risk = f"{risk}→{task_data['urgency']}"
+        label_text = f"[{task_data['priority']}] {task_data['name']} ({task_data['category']}) | Risk {risk}"
+        if task_data.get("blocked"):
+            label_text = f"[{mainwindow.tr('blocked')}: {', '.join(task_data['blocked_by'])}] {label_text}"
         tn = QtWidgets.QLabel(label_text)
         tn.setAlignment(Qt.AlignCenter | Qt.AlignVCenter)
         tn.setObjectName("TaskName")
@@ -455,21 +822,14 @@ class TaskBox(QtWidgets.QPushButton):
 
 
 class TaskWindow(QWidget):
-    def __init__(self, task_num=False, mainWindow: App = None):
+    def __init__(self, mainWindow: App = None):
         super(TaskWindow, self).__init__()
         self.window_style = TStyle.twindow_stylesheet()
         self.mainWindow = mainWindow
 
-        self.task_number = task_num
-        self.tlist = mainWindow.tasks_list.copy()
-
-        if task_num in range(1, len(self.tlist) + 1):
-            title = f"Edit Task {task_num}"
-        else:
-            title = "New Task"
-            self.task_number = False
+        self.task_number = False
+        self.tlist = []
 
-        self.setWindowTitle(title)
         self.setWindowIcon(QIcon(TStyle.tlogo_path))
         self.setStyleSheet(self.window_style)
         self.setMinimumSize(650, 660)
@@ -478,7 +838,7 @@ class TaskWindow(QWidget):
 
         self.win_layout = QtWidgets.QVBoxLayout(self)
 
-        self.win_title = QtWidgets.QLabel(title, self)
+        self.win_title = QtWidgets.QLabel(self)
         self.win_title.setAlignment(Qt.AlignCenter | Qt.AlignVCenter)
         self.win_title.setObjectName("TaskWindowTitle")
 
@@ -525,6 +885,12 @@ class TaskWindow(QWidget):
         self.ttif_layout.addWidget(self.ttf_hours_entry)
         self.ttif_layout.addWidget(QtWidgets.QLabel("Mins"))
         self.ttif_layout.addWidget(self.ttf_mins_entry)
+        # editable, any IANA zone name (e.g. America/New_York) can be typed in
+        self.ttf_zone_combo = QtWidgets.QComboBox(self.task_time_frame)
+        self.ttf_zone_combo.setEditable(True)
+        self.ttf_zone_combo.addItems(["Local", "UTC"])
+        self.ttif_layout.addWidget(QtWidgets.QLabel("Zone"))
+        self.ttif_layout.addWidget(self.ttf_zone_combo, 1)
 
         self.task_meta_frame = QWidget(self.win_items)
         self.meta_layout = QtWidgets.QHBoxLayout(self.task_meta_frame)
@@ -537,6 +903,20 @@ class TaskWindow(QWidget):
         self.meta_layout.addStretch()
         self.meta_layout.addWidget(QtWidgets.QLabel("Priority"))
         self.meta_layout.addWidget(self.priority_combo)
+        # editable, so rules like "every 3 days" can be typed in
+        self.repeat_combo = QtWidgets.QComboBox(self.task_meta_frame)
+        self.repeat_combo.setEditable(True)
+        self.repeat_combo.addItems(["Never", "Daily", "Weekdays", "Weekly", "Monthly"])
+        self.meta_layout.addStretch()
+        self.meta_layout.addWidget(QtWidgets.QLabel("Repeat"))
+        self.meta_layout.addWidget(self.repeat_combo)
+
+        self.task_after_frame = QWidget(self.win_items)
+        self.after_layout = QtWidgets.QHBoxLayout(self.task_after_frame)
+        self.after_entry = QtWidgets.QLineEdit(self.task_after_frame)
+        self.after_entry.setPlaceholderText("Task numbers, e.g. 2, 5")
+        self.after_layout.addWidget(QtWidgets.QLabel("Done after tasks"))
+        self.after_layout.addWidget(self.after_entry, 1)
 
         self.task_desc_frame = QWidget(self.win_items)
         self.task_desc_layout = QtWidgets.QHBoxLayout(self.task_desc_frame)
@@ -550,6 +930,7 @@ class TaskWindow(QWidget):
         self.items_layout.addWidget(self.task_date_frame)
         self.items_layout.addWidget(self.task_time_frame)
         self.items_layout.addWidget(self.task_meta_frame)
+        self.items_layout.addWidget(self.task_after_frame)
         self.items_layout.addWidget(self.task_desc_frame)
 
         self.buttons_frame = QWidget(self)
@@ -562,8 +943,11 @@ class TaskWindow(QWidget):
         self.delete_button.setCursor(QCursor(Qt.PointingHandCursor))
         self.delete_button.clicked.connect(self.delete_task)
         self.delete_button.setToolTip("Delete Task")
-        if not self.task_number:
-            self.delete_button.setEnabled(False)
+
+        self.done_button = QtWidgets.QPushButton("Done")
+        self.done_button.setObjectName("SaveButton")
+        self.done_button.clicked.connect(self.complete_task)
+        self.done_button.setToolTip("Mark as done and move to the archive")
 
         self.save_task_button = QtWidgets.QPushButton("Save")
         self.save_task_button.setObjectName("SaveButton")
@@ -574,6 +958,7 @@ class TaskWindow(QWidget):
         self.cancel_button.clicked.connect(self.close)
 
         self.buttons_layout.addWidget(self.delete_button)
+        self.buttons_layout.addWidget(self.done_button)
         self.buttons_layout.addStretch()
         self.buttons_layout.addWidget(self.save_task_button)
         self.buttons_layout.addWidget(self.cancel_button)
@@ -583,25 +968,53 @@ class TaskWindow(QWidget):
         self.win_layout.addWidget(self.win_items, 1)
         self.win_layout.addWidget(self.buttons_frame)
 
+    def load_task(self, task_num=False):
+        self.task_number = task_num
+        self.tlist = self.mainWindow.tasks_list.copy()
+
+        if task_num in range(1, len(self.tlist) + 1):
+            title = f"Edit Task {task_num}"
+        else:
+            title = "New Task"
+            self.task_number = False
+
+        self.setWindowTitle(title)
+        self.win_title.setText(title)
+        self.delete_button.setEnabled(bool(self.task_number))
+        self.done_button.setEnabled(bool(self.task_number))
+        self.setEnabled(True)
         self.fill_task_details()
 
     def fill_task_details(self):
         yy, mm, dd, HH, MM = TBackEnd.return_datetime_now_parts()
         self.tnf_entry.setPlaceholderText(f"Task {len(self.tlist) + 1}")
+        self.tnf_entry.clear()
+        self.tdesc_entry.clear()
+        self.category_combo.setCurrentText("General")
+        self.priority_combo.setCurrentText("Medium")
+        self.repeat_combo.setCurrentText("Never")
+        self.ttf_zone_combo.setCurrentText("Local")
+        self.after_entry.clear()
 
         if self.task_number:
             task = self.tlist[self.task_number - 1]
             ttime, name, desc = task.split("\t", 2)
-            yy, mm, dd, HH, MM = ttime.split(":")
             self.tnf_entry.setText(name.strip())
             self.tdesc_entry.setText(desc)
 
-            meta_map = TBackEnd.read_meta_map()
-            meta = meta_map.get(TBackEnd.task_identity(task), {})
+            meta = self.mainWindow.task_details.get(TBackEnd.task_identity(task), {})
             self.category_combo.setCurrentText(meta.get("category", "General"))
             self.priority_combo.setCurrentText(meta.get("priority", "Medium"))
-
-        self.tdf_year_entry.setText(str(int(yy) + 2000))
+            if meta.get("recur"):
+                self.repeat_combo.setCurrentText(describe_rule(meta["recur"]).title())
+            # the deadline is edited on the wall clock of the zone it was set in
+            if meta.get("zone"):
+                self.ttf_zone_combo.setCurrentText(meta["zone"])
+            nums = {d["id"]: d["num"] for d in self.mainWindow.task_details.values()}
+            self.after_entry.setText(", ".join(nums[tid] for tid in meta.get("depends", ()) if tid in nums))
+            yy, mm, dd, HH, MM = TBackEnd.parse_deadline_to_datetime(ttime, meta.get("zone", "")).strftime("%Y %m %d %H %M").split()
+
+        self.tdf_year_entry.setText(yy)
         self.tdf_month_entry.setCurrentText(TBackEnd.month_names[int(mm)].title())
         self.tdf_date_entry.setText(dd)
         self.ttf_hours_entry.setText(HH)
@@ -619,7 +1032,15 @@ class TaskWindow(QWidget):
 
         if not tdate.isdecimal() or int(tdate) not in range(1, days_in_month + 1):
             return False
-        if not tyear.isdecimal() or int(tyear) not in range(TBackEnd.current_year, 2100):
+        if not tyear.isdecimal() or int(tyear) not in range(TBackEnd.current_year, MAX_DEADLINE_YEAR + 1):
+            return False
+        try:
+            datetime.datetime(int(tyear), int(tmonth_num), int(tdate))
+        except ValueError:
+            return False
+        if not is_valid_zone(self.task_zone()):
+            return False
+        if self.task_prerequisites() is None:
             return False
         if not thour.isdecimal() or int(thour) not in range(0, 24):
             return False
@@ -627,38 +1048,70 @@ class TaskWindow(QWidget):
             return False
         if len(tdesc) > 168:
             return False
+        if parse_rule(self.repeat_combo.currentText(), datetime.datetime.now()) is None:
+            return False
         return True
 
+    def task_prerequisites(self):
+        # the 'Done after' task numbers as a depends value, None if invalid or cyclic
+        nums = self.after_entry.text().replace(",", " ").split()
+        if not all(n.isdecimal() and int(n) in range(1, len(self.tlist) + 1) for n in nums):
+            return None
+        details = self.mainWindow.task_details
+        ids = {details.get(TBackEnd.task_identity(self.tlist[int(n) - 1]), {}).get("id") for n in nums}
+        if None in ids:
+            return None
+        if self.task_number:
+            tid = details.get(TBackEnd.task_identity(self.tlist[self.task_number - 1]), {}).get("id")
+            graph = TaskGraph()
+            graph.sync({d["id"]: (0, 0, tuple(d["depends"])) for d in details.values() if d["id"]})
+            if graph.creates_cycle(tid, ids):
+                return None
+        return ",".join(sorted(ids))
+
+    def task_zone(self):
+        zone = self.ttf_zone_combo.currentText().strip()
+        return "" if zone.lower() in ("", "local") else zone
+
     def save_task(self):
         if not self.validate_entries():
-            QtWidgets.QMessageBox.warning(self, "Invalid Input", "Please check date/time/description inputs.")
+            QtWidgets.QMessageBox.warning(
+                self, "Invalid Input", "Please check date/time/zone/description/repeat/prerequisite inputs."
+            )
             return
 
         tname = self.tnf_entry.text().strip() or (f"Task {self.task_number}" if self.task_number else f"Task {len(self.tlist) + 1}")
         task_date = self.tdf_date_entry.text().strip().zfill(2)
         task_month = str(TBackEnd.month_name_to_num[self.tdf_month_entry.currentText().lower()]).zfill(2)
-        task_year = self.tdf_year_entry.text().strip()[-2:]
+        task_year = self.tdf_year_entry.text().strip()
         task_hours = self.ttf_hours_entry.text().strip().zfill(2)
         task_mins = self.ttf_mins_entry.text().strip().zfill(2)
         task_desc = self.tdesc_entry.toPlainText().strip().replace('\n', ' ')
+        zone = self.task_zone()
+
+        wall = datetime.datetime(int(task_year), int(task_month), int(task_date), int(task_hours), int(task_mins))
+        task_string = f"{TBackEnd.deadline_from_datetime(wall, zone)}\t{tname}\t{task_desc}"
+
+        task_number = self.task_number
+        category = self.category_combo.currentText()
+        priority = self.priority_combo.currentText()
+        recur = parse_rule(self.repeat_combo.currentText(), wall)
+        depends = self.task_prerequisites()
+        session = TBackEnd.edit_session(self.tlist)
+
+        def save():
+            if task_number:
+                session.replace(task_number - 1, task_string)
+            else:
+                session.add(task_string)
+            session.update_meta(
+                task_string, category=category, priority=priority, source="manual", status="todo", recur=recur, zone=zone,
+                depends=depends,
+            )
+            session.commit()
 
-        task_string = f"{task_year}:{task_month}:{task_date}:{task_hours}:{task_mins}\t{tname}\t{task_desc}"
-
-        if self.task_number:
-            self.tlist[self.task_number - 1] = task_string
-        else:
-            self.tlist.append(task_string)
-
-        TBackEnd.write_tasks(self.tlist)
-        TBackEnd.sync_meta_with_tasks(self.tlist)
-        TBackEnd.update_task_meta(
-            task_string,
-            category=self.category_combo.currentText(),
-            priority=self.priority_combo.currentText(),
-            source="manual",
-            status="todo",
-        )
-        self.close()
+        self.setEnabled(False)
+        self.mainWindow.run_in_background(save, lambda _: self.close())
 
     def delete_task(self):
         if not self.task_number:
@@ -674,11 +1127,19 @@ class TaskWindow(QWidget):
                 QtWidgets.QMessageBox.Yes | QtWidgets.QMessageBox.No
             )
             if decision == QtWidgets.QMessageBox.Yes:
-                TBackEnd.remove(self.task_number, self.tlist)
-                self.close()
+                task_number, tlist = self.task_number, self.tlist.copy()
+                self.setEnabled(False)
+                self.mainWindow.run_in_background(lambda: TBackEnd.remove(task_number, tlist), lambda _: self.close())
+
+    def complete_task(self):
+        if not self.task_number:
+            return
+
+        task_number, tlist = self.task_number, self.tlist.copy()
+        self.setEnabled(False)
+        self.mainWindow.run_in_background(lambda: TBackEnd.complete_task(task_number, tlist), lambda _: self.close())
 
     def closeEvent(self, e):
-        self.mainWindow.task_window = None
         self.mainWindow.setEnabled(True)
         self.mainWindow.refresh_tasks()
 